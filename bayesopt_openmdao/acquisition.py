@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+"""Acquisition functions and their optimization for the driver-side loop.
+
+Acquisition functions take the posterior mean and variance of the surrogate
+and return a score to be maximized. All design points are in the unit
+hypercube.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+from scipy.optimize import minimize
+from scipy.stats import norm
+
+from bayesopt_openmdao.sampling import sobol
+
+# Forward-difference step for acquisition gradients, in unit-hypercube
+# coordinates.
+_FD_STEP = 1e-6
+
+
+def expected_improvement(mean, var, best):
+    """Expected improvement over `best` for a minimization problem.
+
+    Args
+    ----
+    mean : ndarray
+        Posterior mean at the candidate points.
+
+    var : ndarray
+        Posterior variance at the candidate points.
+
+    best : float
+        Best (lowest) objective value observed so far.
+
+    Returns
+    -------
+    ndarray
+        Expected improvement at each candidate point.
+    """
+    std = np.sqrt(np.maximum(var, 1e-18))
+    improvement = best - mean
+    z = improvement / std
+    return np.maximum(improvement * norm.cdf(z) + std * norm.pdf(z), 0.0)
+
+
+def maximize_acquisition(acq, ndim, n_candidates, rng, n_local=3, incumbents=None):
+    """Maximize an acquisition function over the unit hypercube.
+
+    A candidate set is scored in a single vectorized call: a scrambled
+    Sobol sequence over the whole hypercube and, if incumbents are given,
+    as many perturbations of them, which keep the search effective in
+    high dimensions where space-filling candidates thin out. The best few
+    candidates are then refined together by a single L-BFGS-B run over
+    their stacked coordinates. Each of its steps scores all of them, and
+    the forward-difference steps for their gradients, in one call of `acq`.
+
+    Args
+    ----
+    acq : callable
+        Maps an (n, ndim) array of points to an (n,) array of scores.
+
+    ndim : int
+        Number of design dimensions.
+
+    n_candidates : int
+        Number of candidates to score.
+
+    rng : `numpy.random.RandomState`
+        Source of the random candidates.
+
+    n_local : int, optional
+        Number of top candidates to refine locally.
+
+    incumbents : ndarray, optional
+        Good points seen so far, shape (m, ndim), to perturb for half of
+        the candidates.
+
+    Returns
+    -------
+    ndarray
+        The best point found, shape (ndim,).
+    """
+    n = max(n_candidates, 1)
+    n_near = n // 2 if incumbents is not None and len(incumbents) else 0
+    candidates = sobol(n - n_near, ndim, rng)
+    if n_near:
+        candidates = np.vstack([candidates, _perturb(incumbents, n_near, rng)])
+    scores = acq(candidates)
+    order = np.argsort(-scores)[:max(n_local, 1)]
+
+    best_x = candidates[order[0]]
+    best_score = scores[order[0]]
+    if n_local < 1:
+        return best_x
+
+    k = len(order)
+    eye = np.eye(ndim)
+
+    def neg_acq(z):
+        Z = z.reshape(k, ndim)
+        # Step inwards at the upper bound so every point stays feasible.
+        step = np.where(Z + _FD_STEP <= 1.0, _FD_STEP, -_FD_STEP)
+        points = np.repeat(Z[:, None, :], ndim + 1, axis=1)
+        points[:, 1:, :] += step[:, None, :] * eye[None, :, :]
+        values = acq(points.reshape(-1, ndim)).reshape(k, ndim + 1)
+        grad = (values[:, 1:] - values[:, :1]) / step
+        return -values[:, 0].sum(), -grad.ravel()
+
+    res = minimize(neg_acq, candidates[order].ravel(), jac=True, method='L-BFGS-B',
+                   bounds=[(0.0, 1.0)] * (k * ndim))
+    refined = np.clip(res.x.reshape(k, ndim), 0.0, 1.0)
+    refined_scores = acq(refined)
+    i = np.argmax(refined_scores)
+    if refined_scores[i] > best_score:
+        best_x = refined[i]
+
+    return best_x
+
+
+def _perturb(incumbents, n, rng, scale=0.1):
+    """Gaussian perturbations of randomly chosen incumbents. In high
+    dimensions only about 20 coordinates of each are moved, as in TuRBO
+    (Eriksson et al., 2019)."""
+    incumbents = np.atleast_2d(incumbents)
+    ndim = incumbents.shape[1]
+    points = incumbents[rng.randint(len(incumbents), size=n)].copy()
+    moved = rng.uniform(size=(n, ndim)) < min(1.0, 20.0 / ndim)
+    moved[np.arange(n), rng.randint(ndim, size=n)] = True
+    points += moved * rng.normal(scale=scale, size=(n, ndim))
+    return np.clip(points, 0.0, 1.0)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+
+"""Surrogate backends, looked up by the driver's `backend` option.
+
+The registry maps each backend name to the dotted path of its class, as
+"module:Class". The module is only imported when the backend is first
+used, so importing the driver does not import the engines it does not
+run, such as the compiled BayesOpt library, and new engines can be added
+with `register_backend` without changing the driver.
+
+A backend serves the driver-side loop through the operations:
+
+  * `make_model` - a new, empty surrogate, one for the objective and one
+    per scalar constraint. Surrogates are observed with `fit(X, y)` and
+    `add(x, y)`, relearn their hyperparameters with `learn(rng=...)` or
+    take saved ones with `set_hyperparameters`, and `predict(X)` returns
+    the posterior mean and variance; `copy` and `mean_gradient` complete
+    the interface (see `GaussianProcess`).
+  * `propose` - the next points to evaluate, given the surrogates.
+
+A backend that runs the whole optimization itself instead, calling back
+into the model, sets `external_loop` and implements `optimize`. The
+driver options in `DRIVER_LOOP_OPTIONS` need the driver-side loop; when
+any of them is set, such a backend's surrogates are used in that loop
+instead (see `Backend.needs_driver_loop`).
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import importlib
+from collections import OrderedDict
+
+from six import string_types
+
+from bayesopt_openmdao.batch import propose_batch
+from bayesopt_openmdao.gp import GaussianProcess
+from bayesopt_openmdao.rff import RandomFeatureGP
+
+BACKENDS = OrderedDict([
+    ('bayesopt', 'bayesopt_openmdao.bayesopt_backend:BayesOptBackend'),
+    ('numpy', 'bayesopt_openmdao.backends:NumpyBackend'),
+    ('rff', 'bayesopt_openmdao.backends:RandomFeatureBackend'),
+])
+
+# Driver options that only the driver-side loop implements, with the value
+# that leaves each one off.
+DRIVER_LOOP_OPTIONS = OrderedDict([
+    ('batch_size', 1),
+    ('async_evaluation', False),
+    ('work_queue', ''),
+    ('isolate_evaluations', False),
+    ('evaluation_timeout', 0.0),
+    ('use_gradients', False),
+    ('vectorize', False),
+    ('embedding_dim', 0),
+    ('cost_aware', False),
+    ('warm_start', ''),
+])
+
+
+def register_backend(name, backend):
+    """Make a backend available to the driver's `backend` option.
+
+    Args
+    ----
+    name : str
+        Value of the `backend` option that selects the backend.
+
+    backend : str or class
+        `Backend` subclass, or its dotted path as "module:Class" to import
+        it on first use.
+    """
+    BACKENDS[name] = backend
+
+
+def load_backend(name):
+    """The backend class registered under a name, importing it if needed.
+
+    Args
+    ----
+    name : str
+        Registered backend name.
+
+    Returns
+    -------
+    class
+        `Backend` subclass.
+    """
+    if name not in BACKENDS:
+        raise ValueError("Unknown backend '{}'. Expected one of {}."
+                         .format(name, list(BACKENDS)))
+    backend = BACKENDS[name]
+    if isinstance(backend, string_types):
+        module, _, attr = backend.partition(':')
+        backend = getattr(importlib.import_module(module), attr)
+        BACKENDS[name] = backend
+    return backend
+
+
+class Backend(object):
+    """Base class of the surrogate backends.
+
+    Args
+    ----
+    options : `OptionsDictionary`
+        The driver's options.
+
+    Attributes
+    ----------
+    external_loop : bool
+        True if the backend runs the optimization loop itself through
+        `optimize`.
+    """
+
+    external_loop = False
+
+    def __init__(self, options):
+        self.options = options
+
+    def needs_driver_loop(self, options):
+        """Whether a run with these options uses the driver-side loop rather
+        than `optimize`: always, unless the backend has `external_loop`,
+        and otherwise if any option in `DRIVER_LOOP_OPTIONS` is set.
+
+        Args
+        ----
+        options : `OptionsDictionary`
+            The driver's options.
+
+        Returns
+        -------
+        bool
+            True for the driver-side loop.
+        """
+        if not self.external_loop:
+            return True
+        return any(options[name] != off for name, off in DRIVER_LOOP_OPTIONS.items())
+
+    def make_model(self, ndim, rng):
+        """A new surrogate with no observations.
+
+        Args
+        ----
+        ndim : int
+            Number of dimensions of the unit hypercube it is defined on.
+
+        rng : `numpy.random.RandomState`
+            Source of randomness.
+        """
+        raise NotImplementedError()
+
+    def propose(self, gp, q, rng, best=None, feasibility=None, incumbents=None,
+                pending=None, cost=None):
+        """Propose `q` points to evaluate, by maximizing expected improvement
+        as set by the `batch_strategy` and `n_inner_iterations` options.
+        The arguments and return value are those of `propose_batch`."""
+        return propose_batch(gp, q, self.options['batch_strategy'],
+                             self.options['n_inner_iterations'], rng, best=best,
+                             feasibility=feasibility, incumbents=incumbents,
+                             pending=pending, cost=cost)
+
+    def optimize(self, objfunc, ndim, lower, upper, params):
+        """Run the whole optimization, for backends with `external_loop`.
+
+        Args
+        ----
+        objfunc : callable
+            Maps a design vector to the value to minimize.
+
+        ndim : int
+            Length of the design vector.
+
+        lower : ndarray
+            Lower bounds of the design vector.
+
+        upper : ndarray
+            Upper bounds of the design vector.
+
+        params : dict
+            BayesOpt-style settings built from the driver's options and
+            `opt_settings`.
+
+        Returns
+        -------
+        tuple
+            Lowest value found and the design vector it was found at.
+        """
+        raise NotImplementedError()
+
+
+class NumpyBackend(Backend):
+    """The built-in NumPy Gaussian process."""
+
+    def make_model(self, ndim, rng):
+        return GaussianProcess(ndim, noise=self.options['noise'])
+
+
+class RandomFeatureBackend(Backend):
+    """Random-feature approximation of the Gaussian process, with
+    `n_features` features."""
+
+    def make_model(self, ndim, rng):
+        return RandomFeatureGP(ndim, noise=self.options['noise'],
+                               n_features=self.options['n_features'], rng=rng)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+"""Strategies for proposing several design points per iteration.
+
+All strategies select points one at a time by maximizing expected
+improvement, and differ in how the points already selected for the batch
+are accounted for before the next one is chosen:
+
+  * `constant_liar` - pretend each selected point returned the best value
+    seen so far and condition a copy of the surrogate on it.
+  * `kriging_believer` - pretend each selected point returned the surrogate
+    mean at that point.
+  * `local_penalization` - leave the surrogate alone and multiply the
+    acquisition by a penalty around each selected point, sized from an
+    estimate of the objective's Lipschitz constant.
+
+Points still being evaluated from earlier proposals (as in asynchronous
+mode) are accounted for in the same way before the first point is chosen.
+
+With constraints, expected improvement is weighted by the probability of
+feasibility, which is not fantasized. With a cost model, it is divided by
+the predicted cost of evaluating the point.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+from scipy.stats import norm
+
+from bayesopt_openmdao.acquisition import expected_improvement, maximize_acquisition
+
+BATCH_STRATEGIES = ['constant_liar', 'kriging_believer', 'local_penalization']
+
+
+def propose_batch(gp, q, strategy, n_candidates, rng, best=None,
+                  feasibility=None, incumbents=None, pending=None, cost=None):
+    """Propose `q` design points to evaluate concurrently.
+
+    Args
+    ----
+    gp : `GaussianProcess`
+        Surrogate conditioned on all completed evaluations.
+
+    q : int
+        Number of points to propose.
+
+    strategy : str
+        One of `BATCH_STRATEGIES`.
+
+    n_candidates : int
+        Number of random candidates scored per acquisition maximization.
+
+    rng : `numpy.random.RandomState`
+        Source of randomness.
+
+    best : float, optional
+        Value to improve on. Defaults to the lowest observed value.
+
+    feasibility : callable, optional
+        Maps an (n, ndim) array of points to their probability of
+        feasibility. Omit for unconstrained problems.
+
+    incumbents : ndarray, optional
+        Best points seen so far, shape (m, ndim), around which half of the
+        candidates are drawn. Defaults to the five with the lowest observed
+        values.
+
+    pending : ndarray, optional
+        Points whose evaluation is in progress, shape (m, ndim). They are
+        treated like points already selected for the batch.
+
+    cost : callable, optional
+        Maps an (n, ndim) array of points to the predicted cost of
+        evaluating each, to maximize expected improvement per unit cost.
+
+    Returns
+    -------
+    ndarray
+        Proposed points in the unit hypercube, shape (q, ndim).
+    """
+    if strategy not in BATCH_STRATEGIES:
+        raise ValueError("Unknown batch strategy '{}'. Expected one of {}."
+                         .format(strategy, BATCH_STRATEGIES))
+
+    if best is None:
+        best = float(np.min(gp.y))
+    if incumbents is None and gp.n_obs > 0:
+        incumbents = gp.X[np.argsort(gp.y)[:5]]
+
+    if pending is None:
+        pending = np.empty((0, gp.ndim))
+
+    if strategy == 'local_penalization':
+        return _propose_penalized(gp, q, n_candidates, rng, best, feasibility,
+                                  incumbents, pending, cost)
+
+    def fantasize(model, x):
+        if strategy == 'constant_liar':
+            lie = best
+        else:
+            lie = float(model.predict(x[None, :])[0][0])
+        model.add(x, lie)
+
+    fantasy = gp.copy() if q > 1 or len(pending) else gp
+    for x in pending:
+        fantasize(fantasy, x)
+    batch = []
+    for i in range(q):
+        x = maximize_acquisition(_weighted_ei(fantasy, best, feasibility, cost),
+                                 gp.ndim, n_candidates, rng, incumbents=incumbents)
+        batch.append(x)
+        if i < q - 1:
+            fantasize(fantasy, x)
+
+    return np.array(batch)
+
+
+def _weighted_ei(gp, best, feasibility, cost=None):
+    """Expected improvement, times the probability of feasibility and
+    divided by the cost, if given."""
+    def acq(X):
+        score = expected_improvement(*gp.predict(X), best=best)
+        if feasibility is not None:
+            score = score * feasibility(X)
+        if cost is not None:
+            score = score / cost(X)
+        return score
+    return acq
+
+
+def _propose_penalized(gp, q, n_candidates, rng, best, feasibility, incumbents,
+                       pending, cost=None):
+    """Local penalization (Gonzalez et al., 2016) around the pending points
+    and those already selected for the batch."""
+    acq = _weighted_ei(gp, best, feasibility, cost)
+
+    # Estimate the Lipschitz constant from the mean gradient on a sample.
+    sample = rng.uniform(size=(max(n_candidates, 1), gp.ndim))
+    lipschitz = float(np.max(np.linalg.norm(gp.mean_gradient(sample), axis=1)))
+    lipschitz = max(lipschitz, 1e-7)
+
+    batch = []
+    centers = np.array(pending, dtype=float).reshape(-1, gp.ndim)
+    mean, var = gp.predict(centers) if len(centers) else (np.empty(0), np.empty(0))
+
+    def penalized(X):
+        return acq(X) * _penalty(X, centers, mean, var, lipschitz, best)
+
+    for _ in range(q):
+        x = maximize_acquisition(penalized, gp.ndim, n_candidates, rng,
+                                 incumbents=incumbents)
+        batch.append(x)
+
+        mean_x, var_x = gp.predict(x[None, :])
+        centers = np.vstack([centers, x])
+        mean = np.append(mean, mean_x[0])
+        var = np.append(var, var_x[0])
+
+    return np.array(batch)
+
+
+def _penalty(X, centers, mean, var, lipschitz, best):
+    """Local penalty of Gonzalez et al. (2016) for minimization: the
+    probability that each point lies outside the ball around each center in
+    which a function with Lipschitz constant `lipschitz` cannot reach
+    `best`, of radius (mean - best) / lipschitz, multiplied over centers."""
+    if not len(centers):
+        return np.ones(X.shape[0])
+    dist = np.sqrt(((X[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2))
+    z = (lipschitz * dist - mean[None, :] + best) / (np.sqrt(var)[None, :] + 1e-12)
+    return norm.cdf(z).prod(axis=1)
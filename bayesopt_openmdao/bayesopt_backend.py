@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+"""The compiled BayesOpt library as a backend.
+
+BayesOpt runs the optimization loop itself, calling back into the model,
+so it cannot be given prior observations, batches or constraint models.
+Runs that need those use the built-in Gaussian process instead.
+
+This module imports `bayesopt`, and is only imported when the backend is
+selected.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import bayesopt
+
+from bayesopt_openmdao.backends import NumpyBackend
+
+
+class BayesOptBackend(NumpyBackend):
+    """Runs `bayesopt.optimize`, with the surrogates of `NumpyBackend` for
+    runs that need the driver-side loop."""
+
+    external_loop = True
+
+    def optimize(self, objfunc, ndim, lower, upper, params):
+        min_value, xout, error = bayesopt.optimize(objfunc, ndim, lower, upper, params)
+        return min_value, xout
@@ -4,17 +4,57 @@ from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import division
 
-import bayesopt
+import json
+import os
+import traceback
 
 from six import itervalues, iteritems
 from six.moves import range
 
 import numpy as np
+from scipy.optimize import minimize
 
 from openmdao.core.driver import Driver
 from openmdao.util.record_util import create_local_meta, update_local_meta
 from collections import OrderedDict
 
+from bayesopt_openmdao.bulk_recording import BulkRecorder, recording_layout
+from bayesopt_openmdao.cache import EvaluationCache
+from bayesopt_openmdao.checkpoint import BAYESOPT_STATE_FILE, CheckpointWriter, \
+     load_checkpoint
+from bayesopt_openmdao.constraints import ConstraintModel, constraint_bounds, \
+     violation
+from bayesopt_openmdao.cost import CostModel
+from bayesopt_openmdao.acquisition import expected_improvement
+from bayesopt_openmdao.backends import BACKENDS, DRIVER_LOOP_OPTIONS, load_backend
+from bayesopt_openmdao.batch import BATCH_STRATEGIES
+from bayesopt_openmdao.embedding import HashingEmbedding
+from bayesopt_openmdao.gradient_gp import GradientEnhancedGP
+from bayesopt_openmdao.history import History
+from bayesopt_openmdao.isolation import IsolatedEvaluator
+from bayesopt_openmdao.layout import DesvarLayout
+from bayesopt_openmdao.parallel import EvaluationFailure, ProcessPoolEvaluator
+from bayesopt_openmdao.relearn import BackgroundRelearner
+from bayesopt_openmdao.sampling import latin_hypercube
+from bayesopt_openmdao.screening import ConstraintScreen
+from bayesopt_openmdao.stopping import ConvergenceMonitor
+from bayesopt_openmdao.surrogates import Surrogates
+from bayesopt_openmdao.timing import IterationTimer, cpu_time, wall_time
+from bayesopt_openmdao.vectorized import VectorizedModel
+from bayesopt_openmdao.warmstart import load_warm_start
+from bayesopt_openmdao.work_queue import FileQueueEvaluator
+
+
+class _PolishBudgetSpent(Exception):
+    """ Raised to end the local polish once its evaluations are used up. """
+    pass
+
+
+class _PolishFailed(Exception):
+    """ Raised to end the local polish at a failed evaluation. """
+    pass
+
+
 class BayesoptOptimizer(Driver):
     def __init__(self):
         """Initialize the ScipyOptimizer."""
@@ -41,25 +81,207 @@ class BayesoptOptimizer(Driver):
                                 desc='Number of iterations.')
         self.options.add_option('noise', 1e-6, lower=0,
                                 desc='Noise')
+        self.options.add_option('random_seed', -1,
+                                desc='Seed for BayesOpt and the built-in '
+                                'surrogates. Negative values seed from the '
+                                'clock.')
         self.options.add_option('disp', True,
                                 desc='Set to False to prevent printing of Scipy '
                                 'convergence messages')
+        self.options.add_option('backend', 'bayesopt',
+                                desc='Surrogate engine, by name in the backend '
+                                'registry: the compiled BayesOpt library '
+                                '(bayesopt), the built-in NumPy Gaussian '
+                                'process (numpy), or its random-feature '
+                                'approximation for runs with thousands of '
+                                'evaluations (rff). One of {}, or a name added '
+                                'with register_backend. The options that need '
+                                'the driver-side loop ({}) use the numpy '
+                                'surrogates when backend is bayesopt.'.format(
+                                    list(BACKENDS), ', '.join(DRIVER_LOOP_OPTIONS)))
+        self.options.add_option('n_features', 500, lower=1,
+                                desc='Number of random features used by the '
+                                'rff backend.')
+        self.options.add_option('batch_size', 1, lower=1,
+                                desc='Number of points proposed per iteration.')
+        self.options.add_option('batch_strategy', 'constant_liar',
+                                values=BATCH_STRATEGIES,
+                                desc='How points within a batch are kept apart.')
+        self.options.add_option('n_workers', 1, lower=1,
+                                desc='Number of worker processes used to '
+                                'evaluate a batch. Requires problem_factory '
+                                'when greater than 1.')
+        self.options.add_option('async_evaluation', False,
+                                desc='Set to True to give each worker a new point '
+                                'as soon as it finishes one, instead of '
+                                'evaluating in batches. Requires n_workers > 1 '
+                                'or work_queue.')
+        self.options.add_option('work_queue', '',
+                                desc='Directory of a work queue to evaluate '
+                                'points in, by workers started separately with '
+                                '"python -m bayesopt_openmdao.work_queue" on any '
+                                'host that shares it. Replaces n_workers.')
+        self.options.add_option('heartbeat_timeout', 60.0, lower=0.0,
+                                desc='Seconds without a heartbeat after which '
+                                'a work_queue worker is presumed lost and its '
+                                'points are given to other workers.')
+        self.options.add_option('isolate_evaluations', False,
+                                desc='Set to True to run every evaluation in a '
+                                'worker process built with problem_factory, '
+                                'which is replaced if the model crashes it.')
+        self.options.add_option('evaluation_timeout', 0.0, lower=0.0,
+                                desc='Seconds an evaluation may run before its '
+                                'worker process is terminated and the point '
+                                'fails. Implies isolate_evaluations. 0 for no '
+                                'limit.')
+        self.options.add_option('tolerate_failures', False,
+                                desc='Set to True to record evaluations that '
+                                'raise an error, crash their worker or time '
+                                'out as failures and carry on, instead of '
+                                'ending the run.')
+        self.options.add_option('use_gradients', False,
+                                desc='Set to True to compute the objective '
+                                'gradient at every evaluated point with '
+                                'calc_gradient and model the objective with a '
+                                'gradient-enhanced Gaussian process.')
+        self.options.add_option('background_relearn', False,
+                                desc='Set to True to relearn the built-in '
+                                'surrogates\' hyperparameters on a background '
+                                'thread while the model runs. Runs are then not '
+                                'reproducible with random_seed.')
+        self.options.add_option('vectorize', False,
+                                desc='Set to True to evaluate initial designs '
+                                'and batches in one call of the solve_nonlinear_batch '
+                                'method of the component computing the objective.')
+        self.options.add_option('embedding_dim', 0, lower=0,
+                                desc='Number of dimensions of a random embedding '
+                                'of the design space (HeSBO) in which the '
+                                'surrogate and the acquisition work, for problems '
+                                'with many desvars. 0 disables.')
+        self.options.add_option('cost_aware', False,
+                                desc='Set to True to model the log wall-clock '
+                                'time of evaluations over the design space and '
+                                'maximize expected improvement per unit of '
+                                'predicted time, spending the budget on cheap '
+                                'points first.')
+
+        self.options.add_option('cache_size', 0, lower=0,
+                                desc='Maximum number of evaluations remembered, '
+                                'with copies of all unknowns, so repeated points '
+                                'skip the model. 0 disables the cache.')
+        self.options.add_option('cache_tol', 0.0, lower=0.0,
+                                desc='Tolerance, relative to each desvar range, '
+                                'within which two points count as the same.')
+        self.options.add_option('checkpoint_dir', '',
+                                desc='Directory where evaluations and surrogate '
+                                'state are saved so the run can be resumed. '
+                                'Empty disables checkpointing.')
+        self.options.add_option('checkpoint_interval', 10, lower=1,
+                                desc='Number of evaluations between writes to '
+                                'the checkpoint directory.')
+        self.options.add_option('resume_from', '',
+                                desc='Checkpoint directory of an interrupted '
+                                'run to continue from. Its evaluations are '
+                                'not repeated.')
+        self.options.add_option('warm_start', '',
+                                desc='Case recorder file or .npz file of an '
+                                'earlier study whose observations seed the '
+                                'surrogate. Empty disables.')
+        self.options.add_option('record_dir', '',
+                                desc='Directory where every evaluation is '
+                                'recorded in memory-mappable .npy chunks, '
+                                'written in the background. Empty disables.')
+        self.options.add_option('record_chunk_size', 1000, lower=1,
+                                desc='Number of evaluations per chunk in '
+                                'record_dir.')
+        self.options.add_option('record_timings', False,
+                                desc='Set to True to pass the timings of the '
+                                'current iteration to the recorders, as JSON '
+                                'in the iteration message.')
+        self.options.add_option('min_ei', 0.0, lower=0.0,
+                                desc='Stop when the expected improvement of the '
+                                'next proposal falls below this value. Only '
+                                'used by the built-in surrogates. 0 disables.')
+        self.options.add_option('max_stall', 0, lower=0,
+                                desc='Stop after this many evaluations without '
+                                'improvement. 0 disables.')
+        self.options.add_option('target_value', -float('inf'),
+                                desc='Stop once the objective reaches this value.')
+        self.options.add_option('max_time', 0.0, lower=0.0,
+                                desc='Wall-clock budget for the run, in seconds. '
+                                '0 disables.')
+        self.options.add_option('max_evaluations', 0, lower=0,
+                                desc='Budget of model evaluations, including '
+                                'those of a resumed run. 0 disables.')
+        self.options.add_option('polish', '', values=['', 'SLSQP', 'L-BFGS-B'],
+                                desc='Local optimizer refining the best point '
+                                'with OpenMDAO gradients after the global search. '
+                                'L-BFGS-B only honors the desvar bounds. Empty '
+                                'disables.')
+        self.options.add_option('polish_evaluations', 50, lower=1,
+                                desc='Budget of model evaluations for the local '
+                                'polish, not counting gradient evaluations.')
+        self.options.add_option('polish_tol', 1e-8, lower=0.0,
+                                desc='Convergence tolerance of the local polish.')
+        self.options.add_option('equality_tol', 1e-4, lower=0.0,
+                                desc='Distance from an equality constraint '
+                                'target that still counts as feasible.')
+        self.options.add_option('constraint_penalty', 1e3, lower=0.0,
+                                desc='Objective penalty per unit of constraint '
+                                'violation. Only used by the bayesopt backend, '
+                                'which cannot model constraints.')
+        self.options.add_option('screen_constraints', False,
+                                desc='Set to True to run only the subsystems the '
+                                'constraints depend on before each evaluation, '
+                                'and skip the rest of the model at points that '
+                                'violate them by more than screen_margin.')
+        self.options.add_option('screen_margin', 0.0, lower=0.0,
+                                desc='Total constraint violation above which '
+                                'screen_constraints skips the rest of the model.')
 
         # The user places optimizer-specific settings in here.
         self.opt_settings = OrderedDict()
 
+        # Picklable callable returning a fresh copy of the Problem, used to
+        # build one model per worker process when n_workers > 1.
+        self.problem_factory = None
+
         self.metadata = None
         self._problem = None
         self.result = None
         self.exit_flag = 0
         self.grad_cache = None
         self.con_cache = None
-        self.con_idx = OrderedDict()
         self.cons = None
         self.objs = None
+        self.eval_cache = None
+        self._checkpoint = None
+        self._bulk_recorder = None
+        self._layout = None
+        self._vectorized = None
+        self._screen = None
+        self._backend = None
+
+        # Flattened constraint bounds, set at the start of a run.
+        self._con_lower = None
+        self._con_upper = None
+
+        # Per-iteration phase timings and counters of the last run.
+        self.timings = IterationTimer()
+        self._bopt_clock = None
+        self._bopt_best = None
+        self._bopt_worst = None
+
+        # Every evaluation of the last run, as NumPy arrays.
+        self.history = None
+
+        # Why the last run stopped early, or None if it used its full budget.
+        self.stop_reason = None
+        self._monitor = None
 
     def _setup(self):
         super(BayesoptOptimizer, self)._setup()
+        self._layout = DesvarLayout(self)
 
     def run(self, problem):
         """Optimize the problem using your choice of Scipy optimizer.
@@ -74,6 +296,8 @@ class BayesoptOptimizer(Driver):
         self.metadata = create_local_meta(None, "BayesOpt")
         self.iter_count = 0
         update_local_meta(self.metadata, (self.iter_count,))
+        self.timings = IterationTimer()
+        self._backend = load_backend(self.options['backend'])(self.options)
 
         # Initial Run
         with problem.root._dircontext:
@@ -85,6 +309,8 @@ class BayesoptOptimizer(Driver):
         con_meta = self.get_constraint_metadata()
         self.cons = list(con_meta)
         self.con_cache = self.get_constraints()
+        self._con_lower, self._con_upper = constraint_bounds(
+            con_meta, self.options['equality_tol'])
 
         self.opt_settings['disp'] = self.options['disp']
 
@@ -95,59 +321,977 @@ class BayesoptOptimizer(Driver):
         bopt_params['n_init_samples'] = self.options['n_init_samples']
         bopt_params['noise'] = self.options['noise']
         bopt_params['surr_name'] = self.options['surr_name']
+        bopt_params['random_seed'] = self.options['random_seed']
+
+
+        # Size Problem, Initial Parameters and Bounds
+        layout = self._layout
+        nparam = layout.size
+        x_init = layout.gather()
+        lower_bounds = layout.lower.copy()
+        upper_bounds = layout.upper.copy()
+
+        self.eval_cache = None
+        if self.options['cache_size'] > 0:
+            span = upper_bounds - lower_bounds
+            self.eval_cache = EvaluationCache(nparam, self.options['cache_size'],
+                                              tol=self.options['cache_tol'],
+                                              scale=np.where(np.isfinite(span), span, 1.0))
+
+        # Observations from earlier studies
+        warm = None
+        if self.options['warm_start']:
+            warm = load_warm_start(self.options['warm_start'], pmeta, self._objs,
+                                   con_meta, lower_bounds, upper_bounds)
+            if self.options['disp']:
+                print('Warm start: %d observations from %s'
+                      % (len(warm.f), self.options['warm_start']))
+
+        self._monitor = ConvergenceMonitor(min_ei=self.options['min_ei'],
+                                           max_stall=self.options['max_stall'],
+                                           target_value=self.options['target_value'],
+                                           max_time=self.options['max_time'],
+                                           max_evaluations=self.options['max_evaluations'])
+        self.history = History(nparam, len(self._con_lower),
+                               max(self.options['n_init_samples'], 1) +
+                               self.options['n_iterations'])
+
+        # Evaluations paid for by an interrupted run
+        resume_dir = self.options['resume_from']
+        resumed = None
+        if resume_dir:
+            resumed = load_checkpoint(resume_dir)
+            if resumed.X.shape[1] != nparam:
+                raise ValueError("Checkpoint in '{}' has {} design variables, "
+                                 "but the problem has {}."
+                                 .format(resume_dir, resumed.X.shape[1], nparam))
+            self.iter_count = len(resumed.f)
+            for i, (x, f, cons) in enumerate(zip(resumed.X, resumed.f, resumed.cons)):
+                violation_i = self._violation(cons)
+                self._monitor.observe(x, f, violation_i <= 0.0)
+                self.history.append(i + 1, x, f, cons, violation_i, time=np.nan)
+            if self.eval_cache is not None:
+                for x, f, cons, unknowns in zip(resumed.X, resumed.f,
+                                                resumed.cons, resumed.unknowns):
+                    self.eval_cache.put(x, f, self._unflatten_cons(cons), unknowns)
+
+        self._checkpoint = None
+        checkpoint_dir = self.options['checkpoint_dir'] or resume_dir
+        if checkpoint_dir:
+            in_place = bool(resume_dir) and \
+                os.path.abspath(checkpoint_dir) == os.path.abspath(resume_dir)
+            layout = {
+                'ndim': nparam,
+                'ncon': len(self._con_lower),
+                'nunknowns': len(problem.root.unknowns.vec),
+                'desvars': self.params,
+            }
+            self._checkpoint = CheckpointWriter(checkpoint_dir, layout,
+                                                self.options['checkpoint_interval'],
+                                                resume=in_place)
+            if resumed is not None and not in_place:
+                for row in zip(resumed.X, resumed.f, resumed.cons, resumed.unknowns):
+                    self._checkpoint.append(*row)
+                self._checkpoint.flush()
+
+            bopt_params['load_save_flag'] = 2
+            bopt_params['save_filename'] = self._checkpoint.path(BAYESOPT_STATE_FILE)
+
+        self._bulk_recorder = None
+        if self.options['record_dir']:
+            self._bulk_recorder = BulkRecorder(self.options['record_dir'],
+                                               recording_layout(self),
+                                               self.options['record_chunk_size'],
+                                               resume=resumed is not None)
+
+        if resumed is not None:
+            bopt_state = os.path.join(resume_dir, BAYESOPT_STATE_FILE)
+            if os.path.exists(bopt_state):
+                bopt_params['load_save_flag'] = 3 if self._checkpoint else 1
+                bopt_params['load_filename'] = bopt_state
+
+        self._vectorized = None
+        if self.options['vectorize']:
+            self._vectorized = VectorizedModel(self, self._layout)
+
+        self._screen = None
+        if self.options['screen_constraints'] and len(self._con_lower):
+            self._screen = ConstraintScreen(self)
 
+        # optimize
+        self._problem = problem
 
-        # Size Problem
-        nparam = 0
-        for param in itervalues(pmeta):
-            nparam += param['size']
-        x_init = np.empty(nparam)
-        i = 0
+        try:
+            if self._backend.needs_driver_loop(self.options):
+                min_value, xout = self._run_batch(lower_bounds, upper_bounds,
+                                                  resumed, warm)
+            else:
+                self._bopt_clock = None
+                self._bopt_best = self._monitor.best_f
+                self._bopt_worst = -np.inf
+                min_value, xout = self._backend.optimize(self._bopt_objfunc, nparam, lower_bounds, upper_bounds, bopt_params)
+                # BayesOpt minimized the penalized objective; report the best
+                # feasible point instead, if there is one.
+                if (self._monitor.stopped or len(self._con_lower)) and \
+                   self._monitor.best_x is not None:
+                    min_value, xout = self._monitor.best_f, self._monitor.best_x
+
+            # Stopping criteria only apply to the global search.
+            stop_reason = self._monitor.reason
+            if self.options['polish']:
+                polished = self._polish(xout, lower_bounds, upper_bounds)
+                if polished is not None and (warm is not None or polished[0] <= min_value):
+                    min_value, xout = polished
+
+            # Run one more iteration, at the computed minimum, to leave the
+            # model in that state.
+            evaluated = np.all(self.history.X == xout, axis=1).any()
+            if warm is not None and not evaluated:
+                # The minimum is an observation of an earlier study, whose
+                # model could differ from this one.
+                min_value = float(self._objfunc(xout))
+            else:
+                self._rerun(xout)
+        finally:
+            if self._checkpoint is not None:
+                self._checkpoint.close()
+                self._checkpoint = None
+            if self._bulk_recorder is not None:
+                self._bulk_recorder.close()
+                self._bulk_recorder = None
 
-        # Initial Parameters
-        lower_bounds = []
-        upper_bounds = []
+        self._problem = None
+        self.result = min_value # TODO: what is this supposed to return?
+        self.exit_flag = 1 # TODO: handle optimization failure?
+        self.stop_reason = stop_reason
 
-        for name, val in iteritems(self.get_desvars()):
-            size = pmeta[name]['size']
-            x_init[i:i+size] = val
-            i += size
+        if self.options['disp']:
+            print('Optimization Complete')
+            if self.stop_reason is not None:
+                print('Stopped early: %s' % self.stop_reason)
+            print('-'*35)
 
-            # Bounds if our optimizer supports them
-            meta_low = pmeta[name]['lower']
-            meta_high = pmeta[name]['upper']
-            for j in range(0, size):
+    def _run_batch(self, lower, upper, resumed=None, warm=None):
+        """ Driver-side optimization loop using the backend's surrogates
+        (see `Surrogates`). After the initial design, each iteration
+        proposes `batch_size` points and evaluates them together, or, with
+        `async_evaluation`, proposes points whenever workers are free. The
+        total number of evaluations matches BayesOpt: `n_init_samples` +
+        `n_iterations`, where observations from a warm start take the place
+        of initial samples.
+
+        Expected improvement is measured against the best feasible value,
+        or the worst value seen until a feasible point is found, and is
+        weighted by the probability that all constraints are met. With
+        `embedding_dim`, the surrogates and the acquisition work in a
+        `HashingEmbedding` of the design space.
 
-                if isinstance(meta_low, np.ndarray):
-                    p_low = meta_low[j]
-                else:
-                    p_low = meta_low
+        Args
+        ----
+        lower : ndarray
+            Lower bounds of the flattened design vector.
+        upper : ndarray
+            Upper bounds of the flattened design vector.
+        resumed : `CheckpointData`, optional
+            Evaluations and surrogate state of an interrupted run to continue.
+        warm : `WarmStartData`, optional
+            Observations of earlier studies to seed the surrogates with.
 
-                if isinstance(meta_high, np.ndarray):
-                    p_high = meta_high[j]
+        Returns
+        -------
+        tuple
+            Best feasible objective value and the design vector where it was
+            found. If no point is feasible, those of the least infeasible one.
+        """
+
+        ndim = len(lower)
+        span = upper - lower
+        batch_size = self.options['batch_size']
+        n_relearn = self.options['n_iter_relearn']
+        n_init = max(self.options['n_init_samples'], 1)
+        seed = self.options['random_seed']
+        rng = np.random.RandomState(seed if seed >= 0 else None)
+
+        embedding = self._make_embedding(ndim, resumed, rng)
+        mdim = ndim if embedding is None else embedding.k
+
+        def design(Z):
+            # Design vectors of points of the surrogates' unit hypercube
+            if embedding is not None:
+                Z = embedding.to_unit(Z)
+            return lower + Z*span
+
+        def observed(X_obs):
+            # Surrogate coordinates of evaluated design vectors, and which
+            # of them lie on the embedding
+            X_unit = (X_obs - lower) / span
+            if embedding is None:
+                return X_unit, np.ones(len(X_unit), dtype=bool)
+            return embedding.from_unit(X_unit), embedding.contains(X_unit)
+
+        def model_gradients(G_new):
+            # Objective gradients from design to surrogate coordinates
+            G_new = G_new*span
+            if embedding is not None:
+                G_new = embedding.gradient(G_new)
+            return G_new
+
+        def update():
+            # Condition the surrogates on the observations they have not
+            # seen. Screened-out points (NaN) only condition the constraint
+            # surrogates; failed evaluations (inf) take the largest value
+            # seen so far, which steers the search away from them. Neither
+            # ran the whole model, so their runtimes are left out: a failure
+            # that looked cheap would draw the search towards failing.
+            finite = np.isfinite(y)
+            f = np.where(np.isposinf(y), np.max(y[finite]) if finite.any() else np.nan, y)
+            costs = (None, None)
+            if surrogates.cost is not None:
+                history = self.history
+                costs = (observed(history.X)[0],
+                         np.where(np.isfinite(history.f), history.cost, np.nan))
+            surrogates.update(X, f, C, G if use_gradients else None, *costs)
+
+        evaluator = self._make_evaluator()
+        asynchronous = self.options['async_evaluation']
+
+        def make_model():
+            return self._backend.make_model(mdim, rng)
+
+        use_gradients = self.options['use_gradients']
+        con_lower, con_upper = self._con_lower, self._con_upper
+        ncon = len(con_lower)
+        surrogates = Surrogates(
+            GradientEnhancedGP(mdim, noise=self.options['noise']) if use_gradients
+            else make_model(),
+            ConstraintModel(make_model, con_lower, con_upper) if ncon else None,
+            CostModel(make_model()) if self.options['cost_aware'] else None)
+        feasibility = surrogates.constraints.probability_of_feasibility if ncon else None
+        expected_cost = surrogates.cost.expected_cost if surrogates.cost else None
+
+        X = np.empty((0, mdim))
+        y = np.empty(0)
+        C = np.empty((0, ncon))
+        # Objective gradients in unit-hypercube coordinates, NaN if unknown
+        G = np.empty((0, mdim))
+        last_relearn = None
+
+        if warm is not None:
+            X, usable = observed(warm.X)
+            X = X[usable]
+            y = warm.f[usable]
+            C = warm.cons[usable]
+            G = np.full(X.shape, np.nan)
+            if self.options['disp'] and not usable.all():
+                print("{0} warm-start observations lie off the embedding and are "
+                      "not used.".format(np.count_nonzero(~usable)))
+        n_warm = len(y)
+        n_total = max(n_init, n_warm) + self.options['n_iterations']
+
+        if resumed is not None:
+            X = np.vstack([X, observed(resumed.X)[0]])
+            y = np.append(y, resumed.f)
+            C = np.vstack([C, resumed.cons.reshape(len(resumed.f), ncon)])
+            G_resumed = np.full((len(resumed.f), mdim), np.nan)
+            if 'gradients' in resumed.state:
+                saved = resumed.state['gradients']
+                G_resumed[:len(saved)] = saved
+            G = np.vstack([G, G_resumed])
+            last_relearn = self._restore_state(resumed.state, surrogates, rng)
+
+        background = self.options['background_relearn']
+        learner = None
+
+        timer = self.timings
+        monitor = self._monitor
+        budget = monitor.remaining_evaluations()
+        try:
+            timer.start_iteration()
+            n_design = n_init - len(y) if budget is None else min(n_init - len(y), budget)
+            if n_design > 0:
+                X_new = latin_hypercube(n_design, mdim, rng)
+                y_new, C_new, G_new = self._evaluate_batch(design(X_new), evaluator,
+                                                           use_gradients)
+                X = np.vstack([X, X_new])
+                y = np.append(y, y_new)
+                C = np.vstack([C, C_new])
+                G = np.vstack([G, model_gradients(G_new) if use_gradients
+                               else np.full(X_new.shape, np.nan)])
+
+            with timer.phase('update'):
+                update()
+            last_save = len(y)
+            while True:
+                n_pending = evaluator.n_pending if asynchronous else 0
+                proposing = len(y) + n_pending < n_total and not monitor.check()
+                if not (proposing or n_pending):
+                    break
+                timer.start_iteration()
+                if learner is not None and learner.done():
+                    with timer.phase('relearn'):
+                        surrogates.adopt(learner.result(), *learned_on)
+                        update()
+                    timer.count('relearns')
+                    learner = None
+
+                relearn_due = last_relearn is None or \
+                    (n_relearn > 0 and len(y) - last_relearn >= n_relearn)
+                in_background = background and last_relearn is not None
+                if relearn_due and not in_background:
+                    with timer.phase('relearn'):
+                        surrogates.learn(rng=rng)
+                    timer.count('relearns')
+                    last_relearn = len(y)
+
+                violations = violation(C, con_lower, con_upper)
+                evaluated = np.isfinite(y)
+                feasible = (violations <= 0.0) & evaluated
+                if feasible.any():
+                    best = np.min(y[feasible])
+                else:
+                    best = np.max(y[evaluated]) if evaluated.any() else 0.0
+                # Best points so far: the least infeasible first, then the lowest
+                ranked = np.lexsort((np.where(evaluated, y, np.inf), violations))
+
+                if not proposing:
+                    q = 0
+                elif asynchronous:
+                    q = min(evaluator.n_workers, n_total - len(y)) - n_pending
+                else:
+                    q = min(batch_size, n_total - len(y))
+                budget = monitor.remaining_evaluations()
+                if budget is not None:
+                    # Points in flight will use up the budget too
+                    q = min(q, budget - n_pending)
+                X_new = np.empty((0, mdim))
+                gp = surrogates.objective
+                if q > 0:
+                    pending = observed(evaluator.pending_points())[0] if n_pending else None
+                    with timer.phase('acquisition'):
+                        X_new = self._backend.propose(gp, q, rng, best=best,
+                                                      feasibility=feasibility,
+                                                      incumbents=X[ranked[:5]],
+                                                      pending=pending,
+                                                      cost=expected_cost)
+                if monitor.min_ei > 0.0 and q > 0:
+                    mean, var = gp.predict(X_new[:1])
+                    ei = expected_improvement(mean, var, best)[0]
+                    if ncon:
+                        ei *= feasibility(X_new[:1])[0]
+                    monitor.observe_acquisition(ei)
+                    if monitor.stopped:
+                        if not n_pending:
+                            break
+                        X_new = X_new[:0]
+
+                if relearn_due and in_background and learner is None:
+                    learner = BackgroundRelearner(surrogates.models(),
+                                                  rng.randint(2**31 - 1))
+                    learned_on = surrogates.n_obs, surrogates.n_costs
+                    last_relearn = len(y)
+
+                if asynchronous:
+                    X_new, y_new, C_new, G_new = self._evaluate_async(
+                        design(X_new), evaluator, use_gradients)
+                    X_new = observed(X_new)[0]
+                else:
+                    y_new, C_new, G_new = self._evaluate_batch(design(X_new), evaluator,
+                                                               use_gradients)
+                if use_gradients:
+                    G_new = model_gradients(G_new)
                 else:
-                    p_high = meta_high
+                    G_new = np.full(X_new.shape, np.nan)
+
+                X = np.vstack([X, X_new])
+                y = np.append(y, y_new)
+                C = np.vstack([C, C_new])
+                G = np.vstack([G, G_new])
+                with timer.phase('update'):
+                    update()
+
+                if self._checkpoint is not None and \
+                   len(y) - last_save >= self._checkpoint.interval:
+                    self._save_state(surrogates, rng, last_relearn,
+                                     G[n_warm:] if use_gradients else None, embedding)
+                    last_save = len(y)
+        finally:
+            if evaluator is not None:
+                evaluator.close()
+            if learner is not None:
+                learner.wait()
+
+        failed = np.isposinf(y)
+        if failed.all():
+            raise RuntimeError("BayesoptOptimizer: every evaluation failed.")
+        violations = np.where(failed, np.inf, violation(C, con_lower, con_upper))
+        feasible = violations <= 0.0
+        if feasible.any():
+            best = np.flatnonzero(feasible)[np.argmin(y[feasible])]
+        else:
+            best = np.argmin(violations)
+        return y[best], design(X[best:best+1])[0]
 
-                lower_bounds.append(p_low)
-                upper_bounds.append(p_high)
+    def _make_embedding(self, ndim, resumed, rng):
+        """ The random embedding the surrogates work in, if `embedding_dim`
+        is below the number of design variables: the one saved in the
+        checkpoint of a resumed run, or a new one, which is saved.
 
-        # optimize
-        self._problem = problem
+        Args
+        ----
+        ndim : int
+            Length of the design vector.
+        resumed : `CheckpointData` or None
+            Interrupted run being continued.
+        rng : `numpy.random.RandomState`
+            Source of a new embedding.
 
-        min_value, xout, error = bayesopt.optimize(self._objfunc, len(lower_bounds), np.asarray(lower_bounds), np.asarray(upper_bounds), bopt_params)
+        Returns
+        -------
+        `HashingEmbedding` or None
+            The embedding, or None for none.
+        """
 
-        # Run one more iteration, at the computed minimum
-        self._objfunc(xout)
+        k = self.options['embedding_dim']
+        if not 0 < k < ndim:
+            return None
+        saved = resumed.state if resumed is not None else {}
+        if 'embedding_index' in saved:
+            if saved['embedding_index'].max() + 1 != k:
+                raise ValueError("Checkpoint in '{0}' was made with a different "
+                                 "embedding_dim.".format(self.options['resume_from']))
+            return HashingEmbedding(ndim, k, index=saved['embedding_index'],
+                                    sign=saved['embedding_sign'])
+        if resumed is not None and len(resumed.f):
+            raise ValueError("Checkpoint in '{0}' was made without "
+                             "embedding_dim.".format(self.options['resume_from']))
+        embedding = HashingEmbedding(ndim, k, rng)
+        if self._checkpoint is not None:
+            self._checkpoint.save_state(embedding_index=embedding.index,
+                                        embedding_sign=embedding.sign)
+        return embedding
+
+    def _make_evaluator(self):
+        """ The workers that evaluate points outside the driver's model,
+        as set by the options, or None to evaluate them in it. """
+
+        queue_dir = self.options['work_queue']
+        if self.options['async_evaluation'] and \
+           (self.options['n_workers'] < 2 and not queue_dir or
+                self._vectorized is not None):
+            raise RuntimeError("BayesoptOptimizer needs n_workers > 1 or a "
+                               "work_queue, and vectorize off, to evaluate "
+                               "asynchronously.")
+        timeout = self.options['evaluation_timeout']
+        isolate = self.options['isolate_evaluations'] or timeout > 0.0
+        if isolate and (queue_dir or self._vectorized is not None):
+            raise RuntimeError("BayesoptOptimizer cannot isolate evaluations "
+                               "with vectorize or a work_queue. Start the "
+                               "work_queue workers with --timeout instead.")
+
+        tolerate = self.options['tolerate_failures']
+        if queue_dir:
+            return FileQueueEvaluator(queue_dir, self.options['heartbeat_timeout'],
+                                      tolerate_failures=tolerate)
+        if self.options['n_workers'] < 2 and not isolate:
+            return None
+        if self.problem_factory is None:
+            raise RuntimeError("BayesoptOptimizer needs a problem_factory "
+                               "to evaluate with n_workers > 1 or in "
+                               "isolation.")
+        if isolate:
+            return IsolatedEvaluator(self.problem_factory, self.options['n_workers'],
+                                     timeout if timeout > 0.0 else None, tolerate)
+        return ProcessPoolEvaluator(self.problem_factory, self.options['n_workers'],
+                                    tolerate)
+
+    def _restore_state(self, state, surrogates, rng):
+        """ Restore the surrogate hyperparameters and random state saved in
+        the checkpoint of an interrupted run.
 
-        self._problem = None
-        self.result = min_value # TODO: what is this supposed to return?
-        self.exit_flag = 1 # TODO: handle optimization failure?
+        Args
+        ----
+        state : dict
+            Arrays saved with `_save_state`.
+        surrogates : `Surrogates`
+            Surrogates of the run, before any observation is added.
+        rng : `numpy.random.RandomState`
+            Random state of the run.
+
+        Returns
+        -------
+        int or None
+            Number of observations at the last relearn, or None if the
+            run had not saved its surrogates yet.
+        """
+
+        if 'lengthscales' not in state:
+            return None
+        surrogates.restore(state)
+        rng.set_state(('MT19937', state['rng_keys'], int(state['rng_pos']), 0, 0.0))
+        return int(state['last_relearn'])
+
+    def _save_state(self, surrogates, rng, last_relearn, gradients=None,
+                    embedding=None):
+        """ Save what a resumed run needs besides the evaluations in the
+        checkpoint.
+
+        Args
+        ----
+        surrogates : `Surrogates`
+            Surrogates of the run.
+        rng : `numpy.random.RandomState`
+            Random state of the run.
+        last_relearn : int
+            Number of observations at the last relearn.
+        gradients : ndarray, optional
+            Objective gradients of the run's evaluations, with
+            `use_gradients`.
+        embedding : `HashingEmbedding`, optional
+            Embedding the surrogates work in.
+        """
 
+        state = surrogates.state()
+        if gradients is not None:
+            state['gradients'] = gradients
+        if embedding is not None:
+            state['embedding_index'] = embedding.index
+            state['embedding_sign'] = embedding.sign
+        rng_state = rng.get_state()
+        self._checkpoint.save_state(last_relearn=last_relearn, rng_keys=rng_state[1],
+                                    rng_pos=rng_state[2], **state)
+
+    def _evaluate_batch(self, points, evaluator=None, gradients=False):
+        """ Evaluate several design points: all at once through the
+        component's `solve_nonlinear_batch` when `vectorize` is set, in a
+        pool of workers if one is given, and one by one otherwise. Every
+        evaluation is recorded.
+
+        Args
+        ----
+        points : ndarray
+            Design vectors to evaluate, one per row.
+        evaluator : `ProcessPoolEvaluator` or `FileQueueEvaluator`, optional
+            Workers to evaluate the points in.
+        gradients : bool, optional
+            Also compute the objective gradient at each point, in this
+            process, with `calc_gradient`.
+
+        Returns
+        -------
+        tuple
+            Objective value at each point, as a list of float, the
+            flattened constraint values at each point, one row per point,
+            and the objective gradients, one row per point, or None if not
+            requested. Points screened out by `screen_constraints` have NaN
+            objective values and gradients; failed evaluations have inf
+            objective values and NaN constraint values and gradients.
+        """
+
+        ncon = len(self._con_lower)
+        grads = np.empty(points.shape) if gradients else None
+        if evaluator is None and self._vectorized is None:
+            values = []
+            cons = np.empty((len(points), ncon))
+            for i, x in enumerate(points):
+                values.append(float(self._objfunc(x, screen=True)))
+                cons[i] = self._flatten_cons(self.con_cache)
+                if gradients:
+                    grads[i] = self._objective_gradient() if np.isfinite(values[i]) \
+                        else np.nan
+            return values, cons, grads
+
+        values = [None] * len(points)
+        flat_cons = np.empty((len(points), ncon))
+        pending = []
+        for i, x in enumerate(points):
+            values[i] = self._cache_lookup(x)
+            if values[i] is None:
+                if self._screen is None or not self._screen_out(x):
+                    pending.append(i)
+                    continue
+                values[i] = np.nan
+            flat_cons[i] = self._flatten_cons(self.con_cache)
+            if gradients:
+                grads[i] = self._objective_gradient() if np.isfinite(values[i]) \
+                    else np.nan
+
+        results = []
+        if pending and self._vectorized is not None:
+            start = wall_time()
+            with self.timings.phase('model'):
+                f_vec, c_vec, u_vec = self._vectorized.evaluate(points[pending])
+            # One call evaluates them all, so each is charged an equal share
+            cost = (wall_time() - start) / len(pending)
+            results = [((f_vec[k], self._unflatten_cons(c_vec[k]), u_vec[k]), cost)
+                       for k in range(len(pending))]
+        elif pending:
+            with self.timings.phase('model'):
+                results = evaluator.evaluate([points[i] for i in pending])
+
+        # Loading each point's state into the model is only needed for the
+        # recorders and gradients; otherwise the last one is enough.
+        restore_each = len(list(self.recorders)) > 0 or gradients
+        last = None
+        for i, (result, cost) in zip(pending, results):
+            if isinstance(result, EvaluationFailure):
+                self.iter_count += 1
+                update_local_meta(self.metadata, (self.iter_count,))
+                self._record_failure(points[i], result.error, cost)
+                values[i] = np.inf
+                flat_cons[i] = self._flatten_cons(self.con_cache)
+                if gradients:
+                    grads[i] = np.nan
+                continue
+            f_new, cons, unknowns = last = result
+            grad = self._finish_evaluation(points[i], f_new, cons, unknowns, cost,
+                                           restore_each, gradients)
+            if gradients:
+                grads[i] = grad
+            values[i] = f_new
+            flat_cons[i] = self._flatten_cons(cons)
+        if last is not None and not restore_each:
+            self._restore_unknowns(last[2])
+
+        return [float(f) for f in values], flat_cons, grads
+
+    def _evaluate_async(self, points, evaluator, gradients=False):
+        """ Submit design points to a worker pool without waiting for them,
+        then collect the evaluations that have finished, of these or of
+        points submitted earlier, waiting for one if there are none. Points
+        found in the cache or screened out finish at once.
+
+        Args
+        ----
+        points : ndarray
+            Design vectors to submit, one per row. May be empty.
+        evaluator : `ProcessPoolEvaluator` or `FileQueueEvaluator`
+            Workers evaluating the points.
+        gradients : bool, optional
+            Also compute the objective gradient at each finished point, in
+            this process, with `calc_gradient`.
+
+        Returns
+        -------
+        tuple
+            Design vectors of the finished points, one per row, their
+            objective values, flattened constraint values and objective
+            gradients (or None if not requested), as in `_evaluate_batch`.
+        """
+
+        ncon = len(self._con_lower)
+        done_x, values, flat_cons, grads = [], [], [], []
+        for x in points:
+            f_new = self._cache_lookup(x)
+            if f_new is None and self._screen is not None and self._screen_out(x):
+                f_new = np.nan
+            if f_new is None:
+                evaluator.submit(x)
+                continue
+            done_x.append(x)
+            values.append(float(f_new))
+            flat_cons.append(self._flatten_cons(self.con_cache))
+            if gradients:
+                grads.append(self._objective_gradient() if np.isfinite(f_new)
+                             else np.full(len(x), np.nan))
+
+        with self.timings.phase('model'):
+            finished = evaluator.wait(block=not done_x)
+
+        restore_each = len(list(self.recorders)) > 0 or gradients
+        last = None
+        for x, result, cost in finished:
+            done_x.append(x)
+            if isinstance(result, EvaluationFailure):
+                self.iter_count += 1
+                update_local_meta(self.metadata, (self.iter_count,))
+                self._record_failure(x, result.error, cost)
+                values.append(np.inf)
+                flat_cons.append(self._flatten_cons(self.con_cache))
+                if gradients:
+                    grads.append(np.full(len(x), np.nan))
+                continue
+            f_new, cons, unknowns = last = result
+            grad = self._finish_evaluation(x, f_new, cons, unknowns, cost,
+                                           restore_each, gradients)
+            values.append(float(f_new))
+            flat_cons.append(self._flatten_cons(cons))
+            if gradients:
+                grads.append(grad)
+        if last is not None and not restore_each:
+            self._restore_unknowns(last[2])
+
+        n, ndim = len(done_x), points.shape[1]
+        return (np.array(done_x).reshape(n, ndim), values,
+                np.array(flat_cons).reshape(n, ncon),
+                np.array(grads).reshape(n, ndim) if gradients else None)
+
+    def _finish_evaluation(self, x_new, f_new, cons, unknowns, cost, restore,
+                           gradient=False):
+        """ Account for a model evaluation run outside the driver's model:
+        count, record and store it.
+
+        Args
+        ----
+        x_new : ndarray
+            Design vector.
+        f_new : float
+            Objective value.
+        cons : dict
+            Constraint values, keyed by constraint name.
+        unknowns : ndarray
+            Root unknowns vector after the evaluation.
+        cost : float
+            Wall-clock time the evaluation took.
+        restore : bool
+            Load `unknowns` into the driver's model first, as the recorders
+            and gradients need.
+        gradient : bool, optional
+            Compute the objective gradient at the point.
+
+        Returns
+        -------
+        ndarray or None
+            Objective gradient, if requested.
+        """
+
+        self.iter_count += 1
+        update_local_meta(self.metadata, (self.iter_count,))
+        self.timings.count('evaluations')
+
+        if restore:
+            self._restore_unknowns(unknowns)
+        grad = self._objective_gradient() if gradient else None
+        self.con_cache = cons
+        self._record_iteration()
+        self._store_evaluation(x_new, f_new, cons, unknowns, cost)
+        return grad
+
+    def _record_failure(self, x_new, error, cost):
+        """ Account for a failed evaluation, in the current iteration: count
+        it, record it as unsuccessful and store it with an inf objective
+        and NaN constraint values, which are also left in the model.
+
+        Args
+        ----
+        x_new : ndarray
+            Design vector.
+        error : str
+            Traceback of the error, or a description of the failure.
+        cost : float
+            Wall-clock time spent on the evaluation.
+        """
+
+        self.timings.count('failures')
         if self.options['disp']:
-            print('Optimization Complete')
-            print('-'*35)
+            print("Evaluation at {0} failed: {1}".format(
+                x_new, error.strip().splitlines()[-1]))
+
+        unknowns = self.root.unknowns
+        for name in self.objs + self.cons:
+            unknowns[name] = np.nan
+        self.con_cache = self.get_constraints()
+        self._record_iteration(error)
+        self._store_evaluation(x_new, np.inf, self.con_cache, unknowns.vec, cost,
+                               total_violation=np.inf)
+
+    def _cache_lookup(self, x_new, screened=True):
+        """ Look up a design point in the evaluation cache. On a hit, the
+        model state and constraint values of the cached evaluation are
+        restored.
 
-    def _objfunc(self, x_new):
+        Args
+        ----
+        x_new : ndarray
+            Design vector.
+        screened : bool, optional
+            Whether a point screened out by `screen_constraints` counts as a
+            hit. If not, only full and failed evaluations do.
+
+        Returns
+        -------
+        float or ndarray or None
+            Cached objective value, or None on a miss.
+        """
+
+        if self.eval_cache is None:
+            return None
+
+        hit = self.eval_cache.get(x_new)
+        if hit is None or (not screened and np.any(np.isnan(hit[0]))):
+            return None
+        self.timings.count('cache_hits')
+
+        f_new, cons, unknowns = hit
+        self._restore_unknowns(unknowns)
+        self.con_cache = cons
+        return f_new
+
+    def _record_iteration(self, error=None):
+        """ Record the current model state with the driver's recorders,
+        adding this iteration's timings when `record_timings` is set. A
+        failed evaluation is recorded as unsuccessful, with its `error` as
+        the message. """
+
+        metadata = self.metadata
+        if error is not None:
+            metadata['success'] = 0
+            metadata['msg'] = error
+        elif self.options['record_timings']:
+            metadata['msg'] = json.dumps(self.timings.current())
+        self.recorders.record_iteration(self.root, metadata)
+        metadata['success'] = 1
+        metadata['msg'] = ''
+
+    def _store_evaluation(self, x_new, f_new, cons, unknowns, cost=np.nan,
+                          total_violation=None):
+        """ Keep a completed model evaluation in the history, the cache,
+        the checkpoint and the bulk recording.
+
+        Args
+        ----
+        x_new : ndarray
+            Design vector.
+        f_new : float or ndarray
+            Objective value.
+        cons : dict
+            Constraint values, keyed by constraint name.
+        unknowns : ndarray
+            Root unknowns vector after the evaluation.
+        cost : float, optional
+            Wall-clock time spent running the model for this evaluation.
+        total_violation : float, optional
+            Total constraint violation, computed from `cons` if not given.
+        """
+
+        flat = self._flatten_cons(cons)
+        if total_violation is None:
+            total_violation = self._violation(flat)
+        self._monitor.observe(x_new, f_new, total_violation <= 0.0)
+        self.history.append(self.iter_count, x_new, f_new, flat, total_violation, cost)
+        if self.eval_cache is not None:
+            self.eval_cache.put(x_new, f_new, cons, unknowns)
+        if self._checkpoint is not None:
+            self._checkpoint.append(x_new, float(f_new), flat, unknowns)
+        if self._bulk_recorder is not None:
+            self._bulk_recorder.record(self.iter_count, x_new, f_new, flat, unknowns)
+
+    def _flatten_cons(self, cons):
+        """ Concatenate constraint values into one flat array. """
+        if not cons:
+            return np.empty(0)
+        return np.concatenate([np.ravel(val) for val in itervalues(cons)])
+
+    def _violation(self, flat):
+        """ Total constraint violation of a flat constraint array. """
+        return float(violation(flat, self._con_lower, self._con_upper))
+
+    def _unflatten_cons(self, flat):
+        """ Split a flat constraint array back into a dict keyed by
+        constraint name. """
+        cons = OrderedDict()
+        i = 0
+        for name, meta in iteritems(self.get_constraint_metadata()):
+            size = meta['size']
+            cons[name] = flat[i:i+size].copy()
+            i += size
+        return cons
+
+    def _rerun(self, x_new):
+        """ Put the model back in its state at a point evaluated earlier in
+        the run: from the cache if it holds the point, or else by running
+        the model again. A new run is recorded with the driver's recorders,
+        but is not a new observation.
+
+        Args
+        ----
+        x_new : ndarray
+            Design vector.
+        """
+
+        if self._cache_lookup(x_new) is not None:
+            return
+
+        system = self.root
+        self._layout.scatter(x_new)
+        self.iter_count += 1
+        update_local_meta(self.metadata, (self.iter_count,))
+        with self.timings.phase('model'):
+            with system._dircontext:
+                system.solve_nonlinear(metadata=self.metadata)
+        self.con_cache = self.get_constraints()
+        self._record_iteration()
+
+    def _restore_unknowns(self, unknowns):
+        """ Load a previously computed unknowns vector into the model and
+        pass it on to the connected params, without running the model.
+
+        Args
+        ----
+        unknowns : ndarray
+            Copy of the root unknowns vector.
+        """
+
+        system = self.root
+        system.unknowns.vec[:] = unknowns
+        for group in system.subgroups(recurse=True, include_self=True):
+            group._transfer_data()
+
+    def _bopt_objfunc(self, x_new):
+        """ Objective callback handed to BayesOpt. Each call starts a new
+        iteration, and the time BayesOpt spent since the previous call is
+        booked as surrogate work: as 'relearn' on the iterations where
+        BayesOpt relearns its kernel parameters, as 'acquisition' otherwise.
+
+        BayesOpt has no notion of constraints, so it is given the objective
+        plus `constraint_penalty` times the total constraint violation. Points
+        screened out by `screen_constraints` take the largest objective
+        value seen so far in place of their own, and so do failed
+        evaluations, without the penalty.
+
+        Args
+        ----
+        x_new : ndarray
+            Array containing parameter values at new design point.
+
+        Returns
+        -------
+        float
+            Penalized objective value at the new design point.
+        """
+
+        # BayesOpt cannot be interrupted from its callback, so once a
+        # stopping criterion fires the remaining iterations return the best
+        # value without running the model.
+        if self._monitor.check():
+            return self._bopt_best
+
+        timer = self.timings
+        timer.start_iteration()
+
+        if self._bopt_clock is not None:
+            wall0, cpu0 = self._bopt_clock
+            n_relearn = self.options['n_iter_relearn']
+            k = len(timer) - 1 - self.options['n_init_samples']
+            if k > 0 and n_relearn > 0 and k % n_relearn == 0:
+                timer.add('relearn', wall_time() - wall0, cpu_time() - cpu0)
+                timer.count('relearns')
+            else:
+                timer.add('acquisition', wall_time() - wall0, cpu_time() - cpu0)
+
+        f_new = float(self._objfunc(x_new, screen=True))
+        failed = np.isposinf(f_new)
+        if np.isfinite(f_new):
+            self._bopt_worst = max(self._bopt_worst, f_new)
+        else:
+            f_new = self._bopt_worst if np.isfinite(self._bopt_worst) else 0.0
+        if len(self._con_lower) and not failed:
+            f_new += self.options['constraint_penalty'] * \
+                self._violation(self._flatten_cons(self.con_cache))
+        self._bopt_best = min(self._bopt_best, float(f_new))
+        self._bopt_clock = (wall_time(), cpu_time())
+        return f_new
+
+    def _objfunc(self, x_new, screen=False):
         """ Function that evaluates and returns the objective function. Model
         is executed here.
 
@@ -155,28 +1299,49 @@ class BayesoptOptimizer(Driver):
         ----
         x_new : ndarray
             Array containing parameter values at new design point.
+        screen : bool, optional
+            Screen the point with `screen_constraints`, if set, before
+            running the whole model.
 
         Returns
         -------
         float
-            Value of the objective function evaluated at the new design point.
+            Value of the objective function evaluated at the new design point,
+            NaN if the point was screened out, or inf if the evaluation failed
+            with `tolerate_failures` set.
         """
 
         system = self.root
         metadata = self.metadata
 
+        f_new = self._cache_lookup(x_new, screened=screen)
+        if f_new is not None:
+            return f_new
+
+        if screen and self._screen is not None and self._screen_out(x_new):
+            return np.nan
+
         # Pass in new parameters
-        i = 0
-        for name, meta in self.get_desvar_metadata().items():
-            size = meta['size']
-            self.set_desvar(name, x_new[i:i+size])
-            i += size
+        self._layout.scatter(x_new)
 
         self.iter_count += 1
         update_local_meta(metadata, (self.iter_count,))
 
-        with system._dircontext:
-            system.solve_nonlinear(metadata=metadata)
+        start = wall_time()
+        error = None
+        with self.timings.phase('model'):
+            with system._dircontext:
+                try:
+                    system.solve_nonlinear(metadata=metadata)
+                except Exception:
+                    if not self.options['tolerate_failures']:
+                        raise
+                    error = traceback.format_exc()
+        cost = wall_time() - start
+        if error is not None:
+            self._record_failure(x_new, error, cost)
+            return np.inf
+        self.timings.count('evaluations')
 
         # Get the objective function evaluations
         for name, obj in self.get_objectives().items():
@@ -187,7 +1352,9 @@ class BayesoptOptimizer(Driver):
 
         # Record after getting obj and constraints to assure it has been
         # gathered in MPI.
-        self.recorders.record_iteration(system, metadata)
+        self._record_iteration()
+
+        self._store_evaluation(x_new, f_new, self.con_cache, system.unknowns.vec, cost)
 
         #print("Functions calculated")
         #print(x_new)
@@ -195,121 +1362,170 @@ class BayesoptOptimizer(Driver):
 
         return f_new
 
-    def _confunc(self, x_new, name, idx):
-        """ Function that returns the value of the constraint function
-        requested in args. Note that this function is called for each
-        constraint, so the model is only run when the objective is evaluated.
+    def _screen_out(self, x_new):
+        """ Run only the subsystems the constraints depend on at a design
+        point. If its total constraint violation exceeds `screen_margin`,
+        the evaluation ends there: it is recorded, cached and checkpointed
+        with a NaN objective, and the other subsystems keep the outputs of
+        the previous evaluation.
 
         Args
         ----
         x_new : ndarray
-            Array containing parameter values at new design point.
-        name : string
-            Name of the constraint to be evaluated.
-        idx : float
-            Contains index into the constraint array.
+            Design vector.
 
         Returns
         -------
-        float
-            Value of the constraint function.
+        bool
+            True if the point was screened out.
         """
 
-        if name.startswith('2bl-'):
-            name = name[4:]
-            dbl_side = True
-        else:
-            dbl_side = False
-
-        cons = self.con_cache
-        meta = self._cons[name]
-
-        # Equality constraints
-        bound = meta['equals']
-        if bound is not None:
-            if isinstance(bound, np.ndarray):
-                bound = bound[idx]
-            return bound - cons[name][idx]
-
-        # Note, scipy defines constraints to be satisfied when positive,
-        # which is the opposite of OpenMDAO.
-        upper = meta['upper']
-        lower = meta['lower']
-        if lower is None or dbl_side:
-            if isinstance(upper, np.ndarray):
-                upper = upper[idx]
-            return upper - cons[name][idx]
-        else:
-            if isinstance(lower, np.ndarray):
-                lower = lower[idx]
-            return cons[name][idx] - lower
+        self._layout.scatter(x_new)
+        start = wall_time()
+        with self.timings.phase('model'):
+            self._screen.run(self.metadata)
+        cost = wall_time() - start
+        cons = self.get_constraints()
+        if self._violation(self._flatten_cons(cons)) <= self.options['screen_margin']:
+            return False
 
-    def _gradfunc(self, x_new):
-        """ Function that evaluates and returns the objective function.
-        Gradients for the constraints are also calculated and cached here.
+        self.iter_count += 1
+        update_local_meta(self.metadata, (self.iter_count,))
+        self.timings.count('screened_out')
+
+        unknowns = self.root.unknowns
+        for name in self.objs:
+            unknowns[name] = np.nan
+        self.con_cache = cons
+        self._record_iteration()
+        self._store_evaluation(x_new, np.nan, cons, unknowns.vec, cost)
+        return True
+
+    def _polish(self, x0, lower, upper):
+        """ Refine a point with a local gradient-based optimizer from SciPy,
+        using the gradients OpenMDAO computes for the model (analytic or
+        finite difference, as the model is set up). Evaluations go through
+        `_objfunc`, so they are cached, recorded and checkpointed like the
+        others.
 
         Args
         ----
-        x_new : ndarray
-            Array containing parameter values at new design point.
+        x0 : ndarray
+            Starting design vector.
+        lower : ndarray
+            Lower bounds of the flattened design vector.
+        upper : ndarray
+            Upper bounds of the flattened design vector.
 
         Returns
         -------
-        ndarray
-            Gradient of objective with respect to parameter array.
+        tuple or None
+            Best feasible objective value evaluated during the polish and
+            its design vector, or None if no evaluated point was feasible.
         """
 
-        grad = self.calc_gradient(self.params, self.objs+self.cons,
-                                  return_format='array')
-        self.grad_cache = grad
-
-        #print("Gradients calculated")
-        #print(x_new)
-        #print(grad[0, :])
-
-        return grad[0, :]
+        budget = self.options['polish_evaluations']
+        start = self.timings.counters['evaluations']
+        state = {'x': None, 'f': None, 'cons': None, 'grad_x': None,
+                 'best_f': np.inf, 'best_x': None}
+
+        def evaluate(x):
+            x = np.clip(x, lower, upper)
+            if state['x'] is None or not np.array_equal(x, state['x']):
+                if self.timings.counters['evaluations'] - start >= budget:
+                    raise _PolishBudgetSpent()
+                self.timings.start_iteration()
+                f = float(self._objfunc(x))
+                if np.isposinf(f):
+                    raise _PolishFailed()
+                cons = self._flatten_cons(self.con_cache)
+                state['x'], state['f'], state['cons'] = x, f, cons
+                if f < state['best_f'] and self._violation(cons) <= 0.0:
+                    state['best_f'], state['best_x'] = f, x.copy()
+            return state['f'], state['cons']
+
+        def jacobian(x):
+            evaluate(x)
+            if state['grad_x'] is None or not np.array_equal(state['x'], state['grad_x']):
+                with self.timings.phase('model'):
+                    self._gradfunc(state['x'])
+                state['grad_x'] = state['x']
+            return self.grad_cache
+
+        # Constraints as SciPy expects them: equalities equal to zero,
+        # inequalities nonnegative.
+        eq_idx, eq_val, ineq_idx, ineq_bound, ineq_sign = [], [], [], [], []
+        i = 0
+        for meta in itervalues(self.get_constraint_metadata()):
+            idx = np.arange(i, i + meta['size'])
+            i += meta['size']
+            if meta['equals'] is not None:
+                eq_idx.append(idx)
+                eq_val.append(np.broadcast_to(meta['equals'], idx.shape))
+                continue
+            for bound, sign in ((meta['lower'], 1.0), (meta['upper'], -1.0)):
+                if bound is not None:
+                    ineq_idx.append(idx)
+                    ineq_bound.append(np.broadcast_to(bound, idx.shape))
+                    ineq_sign.append(np.full(idx.shape, sign))
+
+        constraints = []
+        if eq_idx:
+            eq_idx, eq_val = np.concatenate(eq_idx), np.concatenate(eq_val)
+            constraints.append({
+                'type': 'eq',
+                'fun': lambda x: evaluate(x)[1][eq_idx] - eq_val,
+                'jac': lambda x: jacobian(x)[1:][eq_idx]})
+        if ineq_idx:
+            ineq_idx, ineq_bound = np.concatenate(ineq_idx), np.concatenate(ineq_bound)
+            ineq_sign = np.concatenate(ineq_sign)
+            constraints.append({
+                'type': 'ineq',
+                'fun': lambda x: ineq_sign * (evaluate(x)[1][ineq_idx] - ineq_bound),
+                'jac': lambda x: ineq_sign[:, None] * jacobian(x)[1:][ineq_idx]})
+
+        method = self.options['polish']
+        bounds = [(lo if np.isfinite(lo) else None, hi if np.isfinite(hi) else None)
+                  for lo, hi in zip(lower, upper)]
+        kwargs = {'constraints': constraints} if method == 'SLSQP' else {}
+        try:
+            minimize(lambda x: evaluate(x)[0], np.asarray(x0, dtype=float),
+                     jac=lambda x: jacobian(x)[0], method=method, bounds=bounds,
+                     tol=self.options['polish_tol'],
+                     options={'maxiter': budget}, **kwargs)
+        except (_PolishBudgetSpent, _PolishFailed):
+            pass
+
+        if state['best_x'] is None:
+            return None
+        return state['best_f'], state['best_x']
+
+    def _objective_gradient(self):
+        """ Gradient of the objective with respect to the design vector, at
+        the current model state. """
+
+        with self.timings.phase('model'):
+            return self.calc_gradient(self.params, self.objs,
+                                      return_format='array')[0]
 
-    def _congradfunc(self, x_new, name, idx):
-        """ Function that returns the cached gradient of the constraint
-        function. Note, scipy calls the constraints one at a time, so the
-        gradient is cached when the objective gradient is called.
+    def _gradfunc(self, x_new):
+        """ Function that evaluates and returns the gradient of the objective
+        function at the current model state. Gradients for the constraints
+        are also calculated and cached here.
 
         Args
         ----
         x_new : ndarray
             Array containing parameter values at new design point.
-        name : string
-            Name of the constraint to be evaluated.
-        idx : float
-            Contains index into the constraint array.
 
         Returns
         -------
-        float
-            Gradient of the constraint function wrt all params.
+        ndarray
+            Gradient of objective with respect to parameter array.
         """
 
-        if name.startswith('2bl-'):
-            name = name[4:]
-            dbl_side = True
-        else:
-            dbl_side = False
-
-        grad = self.grad_cache
-        meta = self._cons[name]
-        grad_idx = self.con_idx[name] + idx + 1
-
-        #print("Constraint Gradient returned")
-        #print(x_new)
-        #print(name, idx, grad[grad_idx, :])
-
-        # Equality constraints
-        if meta['equals'] is not None:
-            return -grad[grad_idx, :]
+        grad = self.calc_gradient(self.params, self.objs+self.cons,
+                                  return_format='array')
+        self.grad_cache = grad
 
-        # Note, scipy defines constraints to be satisfied when positive,
-        # which is the opposite of OpenMDAO.
-        if meta['lower'] is None or dbl_side:
-            return -grad[grad_idx, :]
-        else:
-            return grad[grad_idx, :]
+        return grad[0, :]
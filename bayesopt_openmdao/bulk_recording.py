@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+
+"""Buffered recording of evaluations to memory-mappable chunk files.
+
+OpenMDAO recorders write every iteration as it happens, one variable at a
+time. `BulkRecorder` instead copies each evaluation into a row of a
+preallocated NumPy array and, once the array is full, hands it to a
+background thread that saves it as a chunk of a recording directory:
+
+  * `layout.json` - width of a row, and the position of every recorded
+    quantity in it, by group ('iteration', 'desvars', 'objectives',
+    'constraints' and 'unknowns') and name.
+  * `chunk_000000.npy`, `chunk_000001.npy`, ... - float64 arrays of shape
+    (rows, width) in NumPy's .npy format, each written to a temporary file
+    and renamed into place once complete.
+
+Desvars, objectives and constraints are stored as the driver sees them
+(scaled), unknowns in model units. `RecordingReader` memory-maps the
+chunks, so post-processing only reads the columns it asks for.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import glob
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from six import iteritems
+from six.moves import queue
+
+import numpy as np
+
+LAYOUT_FILE = 'layout.json'
+CHUNK_PATTERN = 'chunk_{:06d}.npy'
+
+
+def _chunk_files(directory):
+    return sorted(glob.glob(os.path.join(directory, 'chunk_*.npy')))
+
+
+def recording_layout(driver):
+    """Row layout of a recording of a set-up driver.
+
+    Args
+    ----
+    driver : `Driver`
+        Set-up driver.
+
+    Returns
+    -------
+    dict
+        'columns': for each group, an OrderedDict of [start, stop) column
+        ranges keyed by variable name; 'unknowns_start': column where the
+        root unknowns vector starts; 'width': number of columns.
+    """
+    columns = OrderedDict([('iteration', OrderedDict([('iteration', [0, 1])]))])
+    i = 1
+    for group, meta in (('desvars', driver.get_desvar_metadata()),
+                        ('objectives', OrderedDict(list(iteritems(driver._objs))[:1])),
+                        ('constraints', driver.get_constraint_metadata())):
+        columns[group] = OrderedDict()
+        for name, vmeta in iteritems(meta):
+            columns[group][name] = [i, i + vmeta['size']]
+            i += vmeta['size']
+
+    uvec = driver.root.unknowns
+    columns['unknowns'] = OrderedDict()
+    for name, acc in iteritems(uvec._dat):
+        if acc.slice is not None and not acc.meta.get('pass_by_obj'):
+            start, stop = acc.slice
+            columns['unknowns'][name] = [i + start, i + stop]
+    return {'columns': columns, 'unknowns_start': i, 'width': i + len(uvec.vec)}
+
+
+class BulkRecorder(object):
+    """Collects evaluations in memory and writes them out in chunks from a
+    background thread.
+
+    Args
+    ----
+    directory : str
+        Recording directory. Created if needed.
+
+    layout : dict
+        Row layout, as returned by `recording_layout`.
+
+    chunk_size : int, optional
+        Number of rows per chunk.
+
+    resume : bool, optional
+        If True, keep the chunks already in `directory` and add new ones
+        after them. Otherwise any previous chunks there are deleted.
+    """
+
+    def __init__(self, directory, layout, chunk_size=1000, resume=False):
+        self.directory = directory
+        self.chunk_size = max(chunk_size, 1)
+        self._width = layout['width']
+        self._unknowns_start = layout['unknowns_start']
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        existing = _chunk_files(directory)
+        path = os.path.join(directory, LAYOUT_FILE)
+        if resume and existing:
+            with open(path, 'r') as f:
+                if json.load(f) != json.loads(json.dumps(layout)):
+                    raise ValueError("Recording in '{}' was written for a "
+                                     "different problem.".format(directory))
+            self._next_chunk = int(os.path.basename(existing[-1])[6:12]) + 1
+        else:
+            for name in existing:
+                os.remove(name)
+            with open(path, 'w') as f:
+                json.dump(layout, f)
+            self._next_chunk = 0
+
+        self._buffer = np.empty((self.chunk_size, self._width))
+        self._n = 0
+        self._error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_chunks)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def record(self, iteration, x, f, cons, unknowns):
+        """Add one evaluation.
+
+        Args
+        ----
+        iteration : int
+            Iteration number.
+
+        x : ndarray
+            Design vector.
+
+        f : float or ndarray
+            Objective value(s).
+
+        cons : ndarray
+            Flattened constraint values.
+
+        unknowns : ndarray
+            Root unknowns vector.
+        """
+        if self._error is not None:
+            raise self._error
+        row = self._buffer[self._n]
+        nx, nf = np.size(x), np.size(f)
+        row[0] = iteration
+        row[1:1+nx] = np.ravel(x)
+        row[1+nx:1+nx+nf] = np.ravel(f)
+        row[1+nx+nf:self._unknowns_start] = cons
+        row[self._unknowns_start:] = unknowns
+        self._n += 1
+        if self._n == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Hand the buffered rows to the writer thread."""
+        if self._n == 0:
+            return
+        self._queue.put((self._next_chunk, self._buffer[:self._n]))
+        self._next_chunk += 1
+        self._buffer = np.empty((self.chunk_size, self._width))
+        self._n = 0
+
+    def close(self):
+        """Write out the buffered rows and wait for the writer thread."""
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _write_chunks(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+            index, rows = item
+            path = os.path.join(self.directory, CHUNK_PATTERN.format(index))
+            try:
+                with open(path + '.tmp', 'wb') as f:
+                    np.save(f, rows)
+                os.rename(path + '.tmp', path)
+            except Exception as err:
+                self._error = err
+
+
+class RecordingReader(object):
+    """Memory-mapped view of a recording directory.
+
+    Args
+    ----
+    directory : str
+        Directory written by `BulkRecorder`.
+
+    Attributes
+    ----------
+    columns : dict
+        Column ranges by group and name, as in `recording_layout`.
+
+    chunks : list of ndarray
+        Read-only memory maps of the chunk files, in order.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, LAYOUT_FILE), 'r') as f:
+            self.columns = json.load(f, object_pairs_hook=OrderedDict)['columns']
+        self.chunks = [np.load(name, mmap_mode='r') for name in _chunk_files(directory)]
+
+    def __len__(self):
+        return sum(chunk.shape[0] for chunk in self.chunks)
+
+    def values(self, name, group='unknowns'):
+        """Recorded values of one variable.
+
+        Args
+        ----
+        name : str
+            Variable name, as used by the driver or the root unknowns vector.
+
+        group : str, optional
+            'iteration', 'desvars', 'objectives', 'constraints' or 'unknowns'.
+
+        Returns
+        -------
+        ndarray
+            One row per recorded evaluation, flattened.
+        """
+        start, stop = self.columns[group][name]
+        if not self.chunks:
+            return np.empty((0, stop - start))
+        return np.vstack([chunk[:, start:stop] for chunk in self.chunks])
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+"""Memoization of model evaluations keyed on the design vector."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import OrderedDict
+
+from six import iteritems
+
+import numpy as np
+
+
+class EvaluationCache(object):
+    """Bounded cache of model evaluations with least-recently-used eviction.
+
+    Exact repeats of a design vector are found with a dictionary lookup.
+    When `tol` is positive, a point also matches a stored one if every
+    element differs by at most `tol` times the corresponding `scale`.
+
+    Args
+    ----
+    ndim : int
+        Length of the design vector.
+
+    max_size : int
+        Maximum number of evaluations kept.
+
+    tol : float, optional
+        Matching tolerance, relative to `scale`. 0 only matches exact repeats.
+
+    scale : ndarray, optional
+        Per-element scale for the tolerance, typically the desvar ranges.
+    """
+
+    def __init__(self, ndim, max_size, tol=0.0, scale=None):
+        self.max_size = max_size
+        self.tol = tol
+        if scale is None:
+            scale = np.ones(ndim)
+        self._scale = np.where(np.asarray(scale, dtype=float) > 0.0, scale, 1.0)
+
+        self._keys = np.empty((max_size, ndim))
+        self._entries = [None] * max_size
+        self._n = 0
+        self._exact = {}
+        self._lru = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self._n
+
+    def get(self, x):
+        """Look up a design vector.
+
+        Args
+        ----
+        x : ndarray
+            Design vector.
+
+        Returns
+        -------
+        tuple or None
+            Objective, constraint dict and unknowns vector stored for a
+            matching point, or None if there is no match.
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        slot = self._exact.get(x.tobytes())
+
+        if slot is None and self.tol > 0.0 and self._n > 0:
+            dist = (np.abs(self._keys[:self._n] - x) / self._scale).max(axis=1)
+            nearest = int(np.argmin(dist))
+            if dist[nearest] <= self.tol:
+                slot = nearest
+
+        if slot is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        del self._lru[slot]
+        self._lru[slot] = None
+        return self._entries[slot]
+
+    def put(self, x, f, cons, unknowns):
+        """Store the results of evaluating a design vector.
+
+        Args
+        ----
+        x : ndarray
+            Design vector.
+
+        f : float or ndarray
+            Objective value.
+
+        cons : dict
+            Constraint values, keyed by constraint name.
+
+        unknowns : ndarray
+            Root unknowns vector after the evaluation.
+        """
+        if self.max_size <= 0:
+            return
+
+        x = np.asarray(x, dtype=float).ravel()
+        key = x.tobytes()
+        slot = self._exact.get(key)
+
+        if slot is None:
+            if self._n < self.max_size:
+                slot = self._n
+                self._n += 1
+            else:
+                slot, _ = self._lru.popitem(last=False)
+                del self._exact[self._keys[slot].tobytes()]
+            self._keys[slot] = x
+            self._exact[key] = slot
+        else:
+            del self._lru[slot]
+
+        cons = OrderedDict((name, np.copy(val)) for name, val in iteritems(cons))
+        self._entries[slot] = (np.copy(f), cons, np.copy(unknowns))
+        self._lru[slot] = None
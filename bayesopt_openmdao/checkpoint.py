@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+
+"""Checkpointing of optimization runs so they can be resumed.
+
+A checkpoint directory holds:
+
+  * `layout.json` - sizes of the design vector, constraint vector and
+    unknowns vector, and the desvar names, used to check that a resumed
+    run matches.
+  * `observations.bin` - one row of float64 values per model evaluation:
+    design vector, objective, flattened constraints and unknowns. Rows are
+    only ever appended, so a run that dies loses at most the rows that
+    were still buffered.
+  * `surrogate.npz` - state of the driver-side surrogate, replaced
+    atomically.
+  * `bayesopt_state.dat` - BayesOpt's own state file, when BayesOpt runs
+    the optimization.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+LAYOUT_FILE = 'layout.json'
+OBSERVATIONS_FILE = 'observations.bin'
+SURROGATE_FILE = 'surrogate.npz'
+BAYESOPT_STATE_FILE = 'bayesopt_state.dat'
+
+CheckpointData = namedtuple('CheckpointData', ['X', 'f', 'cons', 'unknowns', 'state'])
+
+
+def _replace(src, dst):
+    """Atomically move `src` over `dst` where the platform allows it."""
+    try:
+        os.replace(src, dst)
+    except AttributeError:
+        # Python 2 on Windows cannot rename over an existing file.
+        if os.name == 'nt' and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def _read_layout(directory):
+    with open(os.path.join(directory, LAYOUT_FILE), 'r') as f:
+        return json.load(f)
+
+
+class CheckpointWriter(object):
+    """Appends evaluations and surrogate state to a checkpoint directory.
+
+    Args
+    ----
+    directory : str
+        Checkpoint directory. Created if needed.
+
+    layout : dict
+        Sizes of the stored vectors: 'ndim', 'ncon' and 'nunknowns', plus
+        the list of 'desvars'.
+
+    interval : int, optional
+        Number of evaluations buffered between appends to disk.
+
+    resume : bool, optional
+        If True, keep the observations already in `directory`. Otherwise
+        any previous observations there are discarded.
+    """
+
+    def __init__(self, directory, layout, interval=10, resume=False):
+        self.directory = directory
+        self.layout = layout
+        self.interval = max(interval, 1)
+        self._width = layout['ndim'] + 1 + layout['ncon'] + layout['nunknowns']
+        self._rows = []
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        path = os.path.join(directory, OBSERVATIONS_FILE)
+        if resume and os.path.exists(path):
+            if _read_layout(directory) != layout:
+                raise ValueError("Checkpoint in '{}' was written for a "
+                                 "different problem.".format(directory))
+        else:
+            with open(path, 'wb'):
+                pass
+            with open(os.path.join(directory, LAYOUT_FILE), 'w') as f:
+                json.dump(layout, f)
+
+    def path(self, name):
+        """Full path of a file in the checkpoint directory."""
+        return os.path.join(self.directory, name)
+
+    def append(self, x, f, cons, unknowns):
+        """Buffer one evaluation, writing the buffer out every `interval`
+        evaluations.
+
+        Args
+        ----
+        x : ndarray
+            Design vector.
+
+        f : float
+            Objective value.
+
+        cons : ndarray
+            Flattened constraint values.
+
+        unknowns : ndarray
+            Root unknowns vector.
+        """
+        row = np.empty(self._width)
+        ndim = self.layout['ndim']
+        ncon = self.layout['ncon']
+        row[:ndim] = np.ravel(x)
+        row[ndim] = f
+        row[ndim+1:ndim+1+ncon] = cons
+        row[ndim+1+ncon:] = unknowns
+        self._rows.append(row)
+
+        if len(self._rows) >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """Append all buffered evaluations to disk."""
+        if not self._rows:
+            return
+        with open(self.path(OBSERVATIONS_FILE), 'ab') as f:
+            np.vstack(self._rows).tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        self._rows = []
+
+    def save_state(self, **arrays):
+        """Replace the stored surrogate state.
+
+        Args
+        ----
+        **arrays : ndarray
+            Named arrays to store.
+        """
+        tmp = self.path(SURROGATE_FILE + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        _replace(tmp, self.path(SURROGATE_FILE))
+
+    def close(self):
+        """Flush any buffered evaluations."""
+        self.flush()
+
+
+def load_checkpoint(directory):
+    """Read back the contents of a checkpoint directory.
+
+    Args
+    ----
+    directory : str
+        Checkpoint directory written by `CheckpointWriter`.
+
+    Returns
+    -------
+    CheckpointData
+        Design vectors, objectives, flattened constraints and unknowns of
+        every stored evaluation, and the surrogate state as a dict (empty
+        if none was saved).
+    """
+    layout = _read_layout(directory)
+    ndim = layout['ndim']
+    ncon = layout['ncon']
+    width = ndim + 1 + ncon + layout['nunknowns']
+
+    data = np.fromfile(os.path.join(directory, OBSERVATIONS_FILE), dtype=float)
+    # Drop a partially written trailing row.
+    nrows = data.size // width
+    data = data[:nrows*width].reshape(nrows, width)
+
+    state = {}
+    path = os.path.join(directory, SURROGATE_FILE)
+    if os.path.exists(path):
+        with np.load(path) as npz:
+            state = dict((name, npz[name]) for name in npz.files)
+
+    return CheckpointData(X=data[:, :ndim], f=data[:, ndim],
+                          cons=data[:, ndim+1:ndim+1+ncon],
+                          unknowns=data[:, ndim+1+ncon:], state=state)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+
+"""Constraint handling for the driver-side optimization loop.
+
+Every scalar element of every constraint is given its own surrogate,
+modelling the raw constraint value. The probability that a point is
+feasible is the product over elements of the probability that the
+modelled value lies within that element's bounds. Equality constraints
+are treated as two-sided constraints of half-width `equality_tol`.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from six import itervalues
+
+import numpy as np
+from scipy.stats import norm
+
+
+def constraint_bounds(con_meta, equality_tol):
+    """Flattened lower and upper bounds of all constraints.
+
+    Args
+    ----
+    con_meta : dict
+        Constraint metadata from `Driver.get_constraint_metadata`.
+
+    equality_tol : float
+        Half-width of the feasible band around an equality target.
+
+    Returns
+    -------
+    tuple of ndarray
+        Lower and upper bounds, -inf or inf where there is no bound.
+    """
+    lower, upper = [], []
+    for meta in itervalues(con_meta):
+        size = meta['size']
+        if meta['equals'] is not None:
+            equals = np.broadcast_to(np.asarray(meta['equals'], dtype=float).ravel(), (size,))
+            lower.append(equals - equality_tol)
+            upper.append(equals + equality_tol)
+            continue
+        for bound, fill, out in ((meta['lower'], -np.inf, lower),
+                                 (meta['upper'], np.inf, upper)):
+            if bound is None:
+                out.append(np.full(size, fill))
+            else:
+                out.append(np.broadcast_to(np.asarray(bound, dtype=float).ravel(), (size,)))
+
+    if not lower:
+        return np.empty(0), np.empty(0)
+    return np.concatenate(lower), np.concatenate(upper)
+
+
+def violation(values, lower, upper):
+    """Total amount by which flattened constraint values leave their bounds.
+
+    Args
+    ----
+    values : ndarray
+        Constraint values, shape (ncon,) or (n, ncon).
+
+    lower, upper : ndarray
+        Bounds from `constraint_bounds`.
+
+    Returns
+    -------
+    float or ndarray
+        Sum of the bound violations, 0 for feasible points and inf where a
+        value is NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    amount = np.maximum(lower - values, 0.0) + np.maximum(values - upper, 0.0)
+    # Values a failed evaluation did not produce count as infinitely violated
+    return np.where(np.isnan(values), np.inf, amount).sum(axis=-1)
+
+
+class ConstraintModel(object):
+    """One surrogate per scalar constraint element, combined into a
+    probability of feasibility.
+
+    Args
+    ----
+    make_model : callable
+        Returns a new, empty surrogate with the `GaussianProcess` interface.
+
+    lower, upper : ndarray
+        Bounds from `constraint_bounds`.
+    """
+
+    def __init__(self, make_model, lower, upper):
+        self.lower = lower
+        self.upper = upper
+        self.models = [make_model() for _ in range(len(lower))]
+
+    def fit(self, X, C):
+        """Condition every constraint surrogate on its column of `C`,
+        leaving out NaN values."""
+        for j, model in enumerate(self.models):
+            ok = ~np.isnan(C[:, j])
+            model.fit(X[ok], C[ok, j])
+
+    def add(self, X, C):
+        """Add observations to every constraint surrogate, leaving out NaN
+        values."""
+        X = np.atleast_2d(X)
+        C = np.atleast_2d(C)
+        for j, model in enumerate(self.models):
+            ok = ~np.isnan(C[:, j])
+            if ok.any():
+                model.add(X[ok], C[ok, j])
+
+    def learn(self, rng=None):
+        """Relearn the hyperparameters of every constraint surrogate."""
+        for model in self.models:
+            model.learn(rng=rng)
+
+    def probability_of_feasibility(self, X):
+        """Probability that each point satisfies all constraints.
+
+        Args
+        ----
+        X : ndarray
+            Query points, shape (m, ndim), in the unit hypercube.
+
+        Returns
+        -------
+        ndarray
+            Probabilities, shape (m,).
+        """
+        pof = np.ones(np.atleast_2d(X).shape[0])
+        for model, lo, hi in zip(self.models, self.lower, self.upper):
+            mean, var = model.predict(X)
+            std = np.sqrt(var)
+            pof *= norm.cdf((hi - mean) / std) - norm.cdf((lo - mean) / std)
+        return pof
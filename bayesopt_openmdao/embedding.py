@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+"""Random low-dimensional embedding of the design space.
+
+Implements the hashing embedding of HeSBO (Nayebi et al., 2019): every
+design dimension is tied to one of `k` embedded dimensions, with a random
+sign, so a point z of the k-dimensional unit hypercube maps to the design
+point with x_i = 0.5 + s_i (z_h(i) - 0.5). The surrogate and the
+acquisition optimization only ever see the k embedded dimensions, so
+their cost does not grow with the number of desvars, and every embedded
+point maps to a point inside the design bounds.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+
+
+class HashingEmbedding(object):
+    """Count-sketch embedding of an `ndim`-dimensional unit hypercube into a
+    `k`-dimensional one.
+
+    Args
+    ----
+    ndim : int
+        Number of design dimensions.
+
+    k : int
+        Number of embedded dimensions.
+
+    rng : `numpy.random.RandomState`, optional
+        Source of the random hashing, unless `index` and `sign` are given.
+
+    index : ndarray, optional
+        Embedded dimension of each design dimension, shape (ndim,).
+
+    sign : ndarray, optional
+        Sign of each design dimension, +1 or -1, shape (ndim,).
+    """
+
+    def __init__(self, ndim, k, rng=None, index=None, sign=None):
+        if rng is None:
+            rng = np.random
+        self.ndim = ndim
+        self.k = k
+        if index is None:
+            # Every embedded dimension gets at least one design dimension.
+            index = rng.permutation(np.arange(ndim) % k)
+            sign = rng.choice([-1.0, 1.0], size=ndim)
+        self.index = np.asarray(index, dtype=int)
+        self.sign = np.asarray(sign, dtype=float)
+        self._counts = np.bincount(self.index, minlength=k).astype(float)
+
+    def to_unit(self, Z):
+        """Map embedded points to the design unit hypercube.
+
+        Args
+        ----
+        Z : ndarray
+            Embedded points, shape (m, k).
+
+        Returns
+        -------
+        ndarray
+            Design points, shape (m, ndim).
+        """
+        Z = np.atleast_2d(Z)
+        return 0.5 + self.sign * (Z[:, self.index] - 0.5)
+
+    def from_unit(self, X):
+        """Least-squares projection of design points onto the embedding.
+
+        Args
+        ----
+        X : ndarray
+            Design points in the unit hypercube, shape (m, ndim).
+
+        Returns
+        -------
+        ndarray
+            Embedded points, shape (m, k).
+        """
+        X = np.atleast_2d(X)
+        Z = np.zeros((X.shape[0], self.k))
+        for i in range(self.ndim):
+            Z[:, self.index[i]] += 0.5 + self.sign[i] * (X[:, i] - 0.5)
+        return np.clip(Z / np.maximum(self._counts, 1.0), 0.0, 1.0)
+
+    def contains(self, X, tol=1e-9):
+        """Whether each design point lies on the embedding.
+
+        Args
+        ----
+        X : ndarray
+            Design points in the unit hypercube, shape (m, ndim).
+
+        tol : float, optional
+            Largest allowed distance in any dimension.
+
+        Returns
+        -------
+        ndarray of bool
+            Shape (m,).
+        """
+        X = np.atleast_2d(X)
+        return np.all(np.abs(self.to_unit(self.from_unit(X)) - X) <= tol, axis=1)
+
+    def gradient(self, G):
+        """Chain rule from design-space to embedded-space gradients.
+
+        Args
+        ----
+        G : ndarray
+            Gradients with respect to the design unit hypercube, shape
+            (m, ndim).
+
+        Returns
+        -------
+        ndarray
+            Gradients with respect to the embedded coordinates, shape (m, k).
+        """
+        G = np.atleast_2d(G)
+        Gz = np.zeros((G.shape[0], self.k))
+        for i in range(self.ndim):
+            Gz[:, self.index[i]] += self.sign[i] * G[:, i]
+        return Gz
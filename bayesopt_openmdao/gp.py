@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+
+"""Gaussian-process surrogate used by the driver-side optimization loop.
+
+The model works on design points that have been normalized to the unit
+hypercube and on standardized objective values, so the default
+hyperparameters and their bounds are meaningful for any problem.
+
+The Cholesky factor of the kernel matrix is kept in a buffer that grows
+geometrically. Adding observations extends the factor with a block
+append, which costs O(n^2) per observation instead of the O(n^3) of a
+full factorization; the factor is only rebuilt from scratch when the
+hyperparameters change (`learn`) or the data is replaced (`fit`).
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import copy
+
+import numpy as np
+from scipy.linalg import cho_solve, solve_triangular
+from scipy.optimize import minimize
+
+# Bounds on the log hyperparameters (unit-cube inputs, standardized outputs).
+_LOG_LENGTHSCALE_BOUNDS = (np.log(1e-3), np.log(1e2))
+_LOG_SIGNAL_VAR_BOUNDS = (np.log(1e-3), np.log(1e3))
+
+# Diagonal jitter used when the kernel matrix is numerically singular.
+_JITTER = 1e-10
+
+
+def _matern52(u):
+    """Matern 5/2 correlation as a function of the scaled squared distance."""
+    s = np.sqrt(5.0 * u)
+    return (1.0 + s + s * s / 3.0) * np.exp(-s)
+
+
+def _matern52_du(u):
+    """Derivative of `_matern52` with respect to the scaled squared distance."""
+    s = np.sqrt(5.0 * u)
+    return -5.0 / 6.0 * (1.0 + s) * np.exp(-s)
+
+
+def _scaled_sqdist(A, B, lengthscales):
+    """Squared distances between the rows of A and B after dividing each
+    dimension by its lengthscale."""
+    A = A / lengthscales
+    B = B / lengthscales
+    u = (A * A).sum(axis=1)[:, None] + (B * B).sum(axis=1)[None, :] \
+        - 2.0 * A.dot(B.T)
+    return np.maximum(u, 0.0)
+
+
+class GaussianProcess(object):
+    """Gaussian process with a constant mean and an ARD Matern 5/2 kernel.
+
+    Args
+    ----
+    ndim : int
+        Number of input dimensions.
+
+    noise : float, optional
+        Observation noise variance, relative to the standardized objective.
+    """
+
+    def __init__(self, ndim, noise=1e-6):
+        self.ndim = ndim
+        self.noise = noise
+        self.lengthscales = np.full(ndim, 0.25)
+        self.signal_var = 1.0
+
+        self.X = np.empty((0, ndim))
+        self.y = np.empty(0)
+        self._y_mean = 0.0
+        self._y_std = 1.0
+        self._L_buf = np.empty((0, 0))
+        self._alpha = None
+
+    @property
+    def n_obs(self):
+        """Number of observations the model is conditioned on."""
+        return self.X.shape[0]
+
+    @property
+    def _L(self):
+        """Lower Cholesky factor of the kernel matrix, a view into the
+        preallocated buffer."""
+        n = self.n_obs
+        return self._L_buf[:n, :n]
+
+    def copy(self):
+        """Return an independent copy of this model."""
+        return copy.deepcopy(self)
+
+    def fit(self, X, y):
+        """Condition the model on a set of observations, keeping the
+        current hyperparameters.
+
+        Args
+        ----
+        X : ndarray
+            Design points, shape (n, ndim), in the unit hypercube.
+
+        y : ndarray
+            Objective values, shape (n,).
+        """
+        self.X = np.array(X, dtype=float).reshape(-1, self.ndim)
+        self.y = np.array(y, dtype=float).ravel()
+        self._factorize()
+
+    def add(self, x, y):
+        """Add one or more observations to the model, extending the existing
+        Cholesky factor instead of recomputing it.
+
+        Args
+        ----
+        x : ndarray
+            Design point(s), shape (ndim,) or (m, ndim).
+
+        y : float or ndarray
+            Objective value(s).
+        """
+        X_new = np.asarray(x, dtype=float).reshape(-1, self.ndim)
+        y_new = np.atleast_1d(y).astype(float).ravel()
+        n = self.n_obs
+        m = X_new.shape[0]
+
+        if n == 0:
+            self.fit(X_new, y_new)
+            return
+
+        L = self._L
+        K12 = self.signal_var * _matern52(_scaled_sqdist(self.X, X_new, self.lengthscales))
+        K22 = self._kernel_matrix(X_new)
+        L21 = solve_triangular(L, K12, lower=True).T
+        L22 = self._cholesky(K22 - L21.dot(L21.T))
+
+        self._reserve(n + m)
+        self._L_buf[n:n+m, :n] = L21
+        self._L_buf[n:n+m, n:n+m] = L22
+        self._L_buf[:n, n:n+m] = 0.0
+
+        self.X = np.vstack([self.X, X_new])
+        self.y = np.concatenate([self.y, y_new])
+        self._alpha = cho_solve((self._L, True), self._standardize(self.y))
+
+    def set_hyperparameters(self, lengthscales, signal_var):
+        """Set the kernel hyperparameters, as learned earlier, and
+        refactorize.
+
+        Args
+        ----
+        lengthscales : ndarray
+            Lengthscale of each input dimension, shape (ndim,).
+
+        signal_var : float
+            Signal variance, relative to the standardized objective.
+        """
+        self.lengthscales = np.array(lengthscales, dtype=float).reshape(self.ndim)
+        self.signal_var = float(signal_var)
+        self._factorize()
+
+    def learn(self, n_restarts=1, rng=None):
+        """Set the kernel hyperparameters by maximizing the log marginal
+        likelihood of the current observations, then refactorize.
+
+        Args
+        ----
+        n_restarts : int, optional
+            Number of additional random starting points for the optimizer.
+
+        rng : `numpy.random.RandomState`, optional
+            Source of the random starting points.
+        """
+        if self.n_obs < 2:
+            return
+
+        if rng is None:
+            rng = np.random
+
+        ys = self._standardize(self.y)
+        bounds = [_LOG_LENGTHSCALE_BOUNDS] * self.ndim + [_LOG_SIGNAL_VAR_BOUNDS]
+
+        starts = [np.append(np.log(self.lengthscales), np.log(self.signal_var))]
+        for _ in range(n_restarts):
+            starts.append(np.append(rng.uniform(np.log(0.05), np.log(2.0), self.ndim), 0.0))
+
+        best_theta, best_nll = None, np.inf
+        for theta0 in starts:
+            theta0 = np.clip(theta0, [b[0] for b in bounds], [b[1] for b in bounds])
+            try:
+                res = minimize(self._neg_log_likelihood, theta0, args=(ys,),
+                               jac=True, method='L-BFGS-B', bounds=bounds)
+            except np.linalg.LinAlgError:
+                continue
+            if res.fun < best_nll:
+                best_theta, best_nll = res.x, res.fun
+
+        if best_theta is not None:
+            self.lengthscales = np.exp(best_theta[:self.ndim])
+            self.signal_var = float(np.exp(best_theta[self.ndim]))
+        self._factorize()
+
+    def predict(self, X):
+        """Posterior mean and variance of the objective.
+
+        Args
+        ----
+        X : ndarray
+            Query points, shape (m, ndim), in the unit hypercube.
+
+        Returns
+        -------
+        tuple of ndarray
+            Mean and variance at each query point, both of shape (m,).
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, self.ndim)
+        if self.n_obs == 0:
+            return (np.full(X.shape[0], self._y_mean),
+                    np.full(X.shape[0], self.signal_var * self._y_std ** 2))
+
+        Ks = self.signal_var * _matern52(_scaled_sqdist(X, self.X, self.lengthscales))
+        mean = Ks.dot(self._alpha)
+        v = solve_triangular(self._L, Ks.T, lower=True)
+        var = np.maximum(self.signal_var - (v * v).sum(axis=0), 1e-12)
+
+        return mean * self._y_std + self._y_mean, var * self._y_std ** 2
+
+    def mean_gradient(self, X):
+        """Gradient of the posterior mean with respect to the query points.
+
+        Args
+        ----
+        X : ndarray
+            Query points, shape (m, ndim), in the unit hypercube.
+
+        Returns
+        -------
+        ndarray
+            Gradients, shape (m, ndim).
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, self.ndim)
+        if self.n_obs == 0:
+            return np.zeros_like(X)
+
+        u = _scaled_sqdist(X, self.X, self.lengthscales)
+        w = 2.0 * self.signal_var * _matern52_du(u) * self._alpha[None, :]
+        inv_l2 = 1.0 / self.lengthscales ** 2
+        # d(mean)/dx_j = sum_i w_i * (x_j - X_ij) / l_j^2
+        grad = (w.sum(axis=1)[:, None] * X - w.dot(self.X)) * inv_l2
+        return grad * self._y_std
+
+    def _standardize(self, y):
+        if y.size > 0:
+            self._y_mean = float(np.mean(y))
+            std = float(np.std(y))
+            self._y_std = std if std > 0.0 else 1.0
+        return (y - self._y_mean) / self._y_std
+
+    def _kernel_matrix(self, X):
+        K = self.signal_var * _matern52(_scaled_sqdist(X, X, self.lengthscales))
+        K[np.diag_indices_from(K)] += self.noise
+        return K
+
+    def _cholesky(self, K):
+        jitter = 0.0
+        while True:
+            try:
+                return np.linalg.cholesky(K + jitter * np.eye(K.shape[0]))
+            except np.linalg.LinAlgError:
+                jitter = _JITTER if jitter == 0.0 else jitter * 10.0
+                if jitter > 1e-2:
+                    raise
+
+    def _reserve(self, n):
+        """Make sure the factor buffer can hold `n` observations, growing it
+        geometrically so appends are amortized."""
+        capacity = self._L_buf.shape[0]
+        if n <= capacity:
+            return
+        capacity = max(n, 2 * capacity, 16)
+        buf = np.zeros((capacity, capacity))
+        old = self._L_buf.shape[0]
+        buf[:old, :old] = self._L_buf
+        self._L_buf = buf
+
+    def _factorize(self):
+        ys = self._standardize(self.y)
+        n = self.n_obs
+        if n == 0:
+            self._alpha = None
+            return
+        self._reserve(n)
+        self._L_buf[:n, :n] = self._cholesky(self._kernel_matrix(self.X))
+        self._alpha = cho_solve((self._L, True), ys)
+
+    def _neg_log_likelihood(self, theta, ys):
+        """Negative log marginal likelihood and its gradient with respect to
+        the log hyperparameters."""
+        lengthscales = np.exp(theta[:self.ndim])
+        signal_var = np.exp(theta[self.ndim])
+        X = self.X
+        n = X.shape[0]
+
+        u = _scaled_sqdist(X, X, lengthscales)
+        K = signal_var * _matern52(u)
+        K[np.diag_indices_from(K)] += self.noise
+        L = self._cholesky(K)
+        alpha = cho_solve((L, True), ys)
+
+        nll = 0.5 * ys.dot(alpha) + np.log(np.diag(L)).sum() + 0.5 * n * np.log(2.0 * np.pi)
+
+        W = np.outer(alpha, alpha) - cho_solve((L, True), np.eye(n))
+        grad = np.empty_like(theta)
+        dk_du = -2.0 * signal_var * _matern52_du(u)
+        for j in range(self.ndim):
+            diff = X[:, j][:, None] - X[:, j][None, :]
+            dK = dk_du * diff * diff / lengthscales[j] ** 2
+            grad[j] = -0.5 * (W * dK).sum()
+        grad[self.ndim] = -0.5 * (W * (K - self.noise * np.eye(n))).sum()
+
+        return nll, grad
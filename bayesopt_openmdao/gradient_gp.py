@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+
+"""Gradient-enhanced Gaussian process.
+
+Conditions the same ARD Matern 5/2 process as `GaussianProcess` on
+objective gradients as well as values, so each evaluation of a
+d-dimensional model contributes d + 1 observations. The Matern 5/2 kernel
+is twice differentiable, which is what the covariance between gradient
+observations needs.
+
+Observations are ordered point by point: the value at a point, followed
+by its gradient if one is known. Points without a gradient (from a warm
+start, a resumed run, or a fantasy in a batch strategy) contribute their
+value only.
+
+Hyperparameters are first learned from the values alone, as in
+`GaussianProcess`, and then refined on the likelihood of all
+observations, as long as there are at most `MAX_LEARN_OBSERVATIONS` of
+them. The refinement has no analytic gradient, so it is skipped for
+large models.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+from scipy.linalg import cho_solve, solve_triangular
+from scipy.optimize import minimize
+
+from bayesopt_openmdao.gp import GaussianProcess, _matern52, _matern52_du, \
+     _LOG_LENGTHSCALE_BOUNDS, _LOG_SIGNAL_VAR_BOUNDS
+
+# Largest number of values and gradient components for which the
+# hyperparameters are refined on the full likelihood.
+MAX_LEARN_OBSERVATIONS = 1500
+
+
+def _matern52_du2(u):
+    """Second derivative of `_matern52` with respect to the scaled squared
+    distance."""
+    return 25.0 / 12.0 * np.exp(-np.sqrt(5.0 * u))
+
+
+class GradientEnhancedGP(GaussianProcess):
+    """Gaussian process conditioned on values and gradients.
+
+    Args
+    ----
+    ndim : int
+        Number of input dimensions.
+
+    noise : float, optional
+        Observation noise variance, relative to the standardized objective,
+        for both values and gradients.
+    """
+
+    def __init__(self, ndim, noise=1e-6):
+        super(GradientEnhancedGP, self).__init__(ndim, noise=noise)
+        self.G = np.empty((0, ndim))
+        # Positions of the observed quantities in the (n, ndim + 1) grid of
+        # values and gradient components, flattened.
+        self._cols = np.empty(0, dtype=int)
+
+    @property
+    def _L(self):
+        k = len(self._cols)
+        return self._L_buf[:k, :k]
+
+    def fit(self, X, y, G=None):
+        """Condition the model on a set of observations, keeping the
+        current hyperparameters.
+
+        Args
+        ----
+        X : ndarray
+            Design points, shape (n, ndim), in the unit hypercube.
+
+        y : ndarray
+            Objective values, shape (n,).
+
+        G : ndarray, optional
+            Objective gradients with respect to the unit-hypercube
+            coordinates, shape (n, ndim). Rows containing NaN, or all rows
+            if omitted, are treated as unknown.
+        """
+        self.X = np.array(X, dtype=float).reshape(-1, self.ndim)
+        self.y = np.array(y, dtype=float).ravel()
+        self.G = self._gradients(G, self.X.shape[0])
+        self._cols = self._columns(0, self.G)
+        self._factorize()
+
+    def add(self, x, y, G=None):
+        """Add one or more observations to the model, extending the existing
+        Cholesky factor instead of recomputing it.
+
+        Args
+        ----
+        x : ndarray
+            Design point(s), shape (ndim,) or (m, ndim).
+
+        y : float or ndarray
+            Objective value(s).
+
+        G : ndarray, optional
+            Objective gradient(s), shape (ndim,) or (m, ndim), as in `fit`.
+        """
+        X_new = np.asarray(x, dtype=float).reshape(-1, self.ndim)
+        y_new = np.atleast_1d(y).astype(float).ravel()
+        G_new = self._gradients(G, X_new.shape[0])
+        n = self.n_obs
+
+        if n == 0:
+            self.fit(X_new, y_new, G_new)
+            return
+
+        local = self._columns(0, G_new)
+        K12 = self._cross(self.X, X_new)[self._cols][:, local]
+        K22 = self._cross(X_new, X_new)[local][:, local]
+        K22[np.diag_indices_from(K22)] += self.noise
+
+        L = self._L
+        k, m = L.shape[0], len(local)
+        L21 = solve_triangular(L, K12, lower=True).T
+        L22 = self._cholesky(K22 - L21.dot(L21.T))
+
+        self._reserve(k + m)
+        self._L_buf[k:k+m, :k] = L21
+        self._L_buf[k:k+m, k:k+m] = L22
+        self._L_buf[:k, k:k+m] = 0.0
+
+        self.X = np.vstack([self.X, X_new])
+        self.y = np.concatenate([self.y, y_new])
+        self.G = np.vstack([self.G, G_new])
+        self._cols = np.concatenate([self._cols, self._columns(n, G_new)])
+        self._alpha = cho_solve((self._L, True), self._observations())
+
+    def learn(self, n_restarts=1, rng=None):
+        """Learn the hyperparameters from the values, then refine them on
+        the likelihood of values and gradients, and refactorize.
+
+        Args
+        ----
+        n_restarts : int, optional
+            Number of additional random starting points for the value-only
+            optimizer.
+
+        rng : `numpy.random.RandomState`, optional
+            Source of the random starting points.
+        """
+        super(GradientEnhancedGP, self).learn(n_restarts=n_restarts, rng=rng)
+        if self.n_obs < 2 or len(self._cols) > MAX_LEARN_OBSERVATIONS \
+           or np.all(np.isnan(self.G)):
+            return
+
+        theta0 = np.append(np.log(self.lengthscales), np.log(self.signal_var))
+        bounds = [_LOG_LENGTHSCALE_BOUNDS] * self.ndim + [_LOG_SIGNAL_VAR_BOUNDS]
+        res = minimize(self._neg_log_likelihood_full, theta0, method='L-BFGS-B',
+                       bounds=bounds)
+        if res.fun < self._neg_log_likelihood_full(theta0):
+            theta0 = res.x
+        self.lengthscales = np.exp(theta0[:self.ndim])
+        self.signal_var = float(np.exp(theta0[self.ndim]))
+        self._factorize()
+
+    def predict(self, X):
+        """Posterior mean and variance of the objective.
+
+        Args
+        ----
+        X : ndarray
+            Query points, shape (m, ndim), in the unit hypercube.
+
+        Returns
+        -------
+        tuple of ndarray
+            Mean and variance at each query point, both of shape (m,).
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, self.ndim)
+        if self.n_obs == 0:
+            return super(GradientEnhancedGP, self).predict(X)
+
+        Ks = self._cross(X, self.X, values_only=True)[:, self._cols]
+        mean = Ks.dot(self._alpha)
+        v = solve_triangular(self._L, Ks.T, lower=True)
+        var = np.maximum(self.signal_var - (v * v).sum(axis=0), 1e-12)
+
+        return mean * self._y_std + self._y_mean, var * self._y_std ** 2
+
+    def mean_gradient(self, X):
+        """Gradient of the posterior mean with respect to the query points.
+
+        Args
+        ----
+        X : ndarray
+            Query points, shape (m, ndim), in the unit hypercube.
+
+        Returns
+        -------
+        ndarray
+            Gradients, shape (m, ndim).
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, self.ndim)
+        if self.n_obs == 0:
+            return np.zeros_like(X)
+
+        # The gradient rows of `_cross(X, self.X)` times the weights, without
+        # forming the value and gradient-by-gradient blocks of all of it.
+        weights = np.zeros(self.n_obs * (self.ndim + 1))
+        weights[self._cols] = self._alpha
+        weights = weights.reshape(self.n_obs, self.ndim + 1)
+        w_value, w_grad = weights[:, 0], weights[:, 1:]
+
+        inv_l2 = 1.0 / self.lengthscales ** 2
+        D = X[:, None, :] - self.X[None, :, :]
+        Dl = D * inv_l2
+        u = (D * Dl).sum(axis=2)
+        du = _matern52_du(u)
+        along = (Dl * w_grad[None, :, :]).sum(axis=2)
+        W = 2.0 * du * w_value[None, :] - 4.0 * _matern52_du2(u) * along
+        grad = (W[:, :, None] * Dl).sum(axis=1) - 2.0 * du.dot(w_grad) * inv_l2
+        return self.signal_var * grad * self._y_std
+
+    def _gradients(self, G, n):
+        if G is None:
+            return np.full((n, self.ndim), np.nan)
+        return np.array(G, dtype=float).reshape(n, self.ndim)
+
+    def _columns(self, start, G):
+        """Flattened grid positions of the observations of points
+        `start`, `start` + 1, ... with gradients `G`."""
+        d1 = self.ndim + 1
+        grid = (start + np.arange(G.shape[0]))[:, None] * d1 + np.arange(d1)[None, :]
+        known = np.hstack([np.ones((G.shape[0], 1), dtype=bool),
+                           np.all(np.isfinite(G), axis=1)[:, None].repeat(self.ndim, axis=1)])
+        return grid[known]
+
+    def _observations(self):
+        """Standardized values and gradients, in observation order."""
+        grid = np.empty((self.n_obs, self.ndim + 1))
+        grid[:, 0] = self._standardize(self.y)
+        grid[:, 1:] = self.G / self._y_std
+        return grid.ravel()[self._cols]
+
+    def _cross(self, A, B, values_only=False, theta=None):
+        """Covariance between the values and gradients at the rows of A and
+        those at the rows of B, shape (len(A) * (ndim + 1), len(B) * (ndim + 1)),
+        or only the rows for the values at A, shape (len(A), len(B) * (ndim + 1)).
+        `theta` overrides the log lengthscales and log signal variance."""
+        na, nb, d = A.shape[0], B.shape[0], self.ndim
+        if theta is None:
+            lengthscales, s2 = self.lengthscales, self.signal_var
+        else:
+            lengthscales, s2 = np.exp(theta[:d]), np.exp(theta[d])
+        inv_l2 = 1.0 / lengthscales ** 2
+        D = A[:, None, :] - B[None, :, :]
+        Dl = D * inv_l2
+        u = (D * Dl).sum(axis=2)
+        du = _matern52_du(u)
+
+        K_top = np.empty((na, nb, d + 1))
+        K_top[:, :, 0] = s2 * _matern52(u)
+        K_top[:, :, 1:] = -2.0 * s2 * du[:, :, None] * Dl
+        if values_only:
+            return K_top.reshape(na, nb * (d + 1))
+
+        K = np.empty((na, d + 1, nb, d + 1))
+        K[:, 0, :, :] = K_top
+        K[:, 1:, :, 0] = (2.0 * s2 * du[:, :, None] * Dl).transpose(0, 2, 1)
+        K_gg = -4.0 * _matern52_du2(u)[:, :, None, None] * Dl[:, :, :, None] * Dl[:, :, None, :] \
+            - 2.0 * du[:, :, None, None] * np.diag(inv_l2)[None, None, :, :]
+        K[:, 1:, :, 1:] = s2 * K_gg.transpose(0, 2, 1, 3)
+        return K.reshape(na * (d + 1), nb * (d + 1))
+
+    def _neg_log_likelihood_full(self, theta):
+        """Negative log marginal likelihood of values and gradients, up to a
+        constant."""
+        K = self._cross(self.X, self.X, theta=theta)[self._cols][:, self._cols]
+        K[np.diag_indices_from(K)] += self.noise
+        try:
+            L = np.linalg.cholesky(K)
+        except np.linalg.LinAlgError:
+            return 1e10
+        obs = self._observations()
+        return 0.5 * obs.dot(cho_solve((L, True), obs)) + np.log(np.diag(L)).sum()
+
+    def _factorize(self):
+        obs = self._observations() if self.n_obs > 0 else None
+        k = len(self._cols)
+        if k == 0:
+            self._alpha = None
+            return
+        K = self._cross(self.X, self.X)[self._cols][:, self._cols]
+        K[np.diag_indices_from(K)] += self.noise
+        self._reserve(k)
+        self._L_buf[:k, :k] = self._cholesky(K)
+        self._alpha = cho_solve((self._L, True), obs)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+"""In-memory history of the evaluations of a run.
+
+Every column lives in a preallocated NumPy array whose capacity doubles
+when it fills up, so appending is amortized O(1), and the attributes
+return views of the filled part without copying. The views are only
+valid until the next append that grows the arrays; copy them to keep
+them longer.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+
+from bayesopt_openmdao.timing import wall_time
+
+
+class History(object):
+    """Design vectors, objective and constraint values, times and costs of
+    the evaluations of a run, in evaluation order.
+
+    Args
+    ----
+    ndim : int
+        Length of the design vector.
+
+    ncon : int
+        Length of the flattened constraint vector.
+
+    capacity : int, optional
+        Number of evaluations allocated for up front.
+
+    Attributes
+    ----------
+    start : float
+        Wall-clock time the history was created at, which `time` is
+        relative to.
+    """
+
+    def __init__(self, ndim, ncon, capacity=64):
+        capacity = max(capacity, 1)
+        self.start = wall_time()
+        self._n = 0
+        self._X = np.empty((capacity, ndim))
+        self._f = np.empty(capacity)
+        self._cons = np.empty((capacity, ncon))
+        self._violation = np.empty(capacity)
+        self._time = np.empty(capacity)
+        self._cost = np.empty(capacity)
+        self._iteration = np.empty(capacity, dtype=int)
+
+    def __len__(self):
+        return self._n
+
+    def append(self, iteration, x, f, cons, violation, cost=np.nan, time=None):
+        """Add one evaluation.
+
+        Args
+        ----
+        iteration : int
+            Iteration number of the evaluation.
+
+        x : ndarray
+            Design vector.
+
+        f : float
+            Objective value, NaN if the model did not compute it.
+
+        cons : ndarray
+            Flattened constraint values.
+
+        violation : float
+            Total constraint violation, 0 if feasible.
+
+        cost : float, optional
+            Wall-clock time spent running the model for this evaluation.
+
+        time : float, optional
+            Seconds since `start` at which the evaluation completed. Defaults
+            to now.
+        """
+        n = self._n
+        if n == len(self._f):
+            self._grow()
+        self._iteration[n] = iteration
+        self._X[n] = np.ravel(x)
+        self._f[n] = np.ravel(f)[0]
+        self._cons[n] = cons
+        self._violation[n] = violation
+        self._cost[n] = cost
+        self._time[n] = wall_time() - self.start if time is None else time
+        self._n = n + 1
+
+    def _grow(self):
+        for name in ('_X', '_f', '_cons', '_violation', '_time', '_cost', '_iteration'):
+            old = getattr(self, name)
+            new = np.empty((2 * old.shape[0],) + old.shape[1:], dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+
+    @property
+    def iteration(self):
+        """Iteration numbers, shape (n,)."""
+        return self._iteration[:self._n]
+
+    @property
+    def X(self):
+        """Design vectors, shape (n, ndim), scaled as the driver sees them."""
+        return self._X[:self._n]
+
+    @property
+    def f(self):
+        """Objective values, shape (n,)."""
+        return self._f[:self._n]
+
+    @property
+    def cons(self):
+        """Flattened constraint values, shape (n, ncon)."""
+        return self._cons[:self._n]
+
+    @property
+    def violation(self):
+        """Total constraint violations, shape (n,)."""
+        return self._violation[:self._n]
+
+    @property
+    def feasible(self):
+        """Whether each evaluation met the constraints, shape (n,)."""
+        return self.violation <= 0.0
+
+    @property
+    def time(self):
+        """Seconds from the start of the run to each evaluation's completion,
+        shape (n,). NaN for evaluations loaded from a checkpoint."""
+        return self._time[:self._n]
+
+    @property
+    def cost(self):
+        """Wall-clock seconds spent in the model by each evaluation, shape
+        (n,), measured in the worker for points evaluated by workers.
+        Points evaluated together with `vectorize` get an equal share of
+        the call. NaN for evaluations loaded from a checkpoint."""
+        return self._cost[:self._n]
+
+    def incumbent(self):
+        """Best feasible objective value after each evaluation.
+
+        Returns
+        -------
+        ndarray
+            Shape (n,), inf until the first feasible evaluation.
+        """
+        f = np.where(self.feasible & np.isfinite(self.f), self.f, np.inf)
+        return np.minimum.accumulate(f) if len(f) else f
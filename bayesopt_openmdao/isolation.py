@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+
+"""Model evaluation in isolated worker processes, with a time limit.
+
+Each worker is a process of its own, connected to the driver by a pipe,
+that builds its own copy of the `Problem` with the user's factory (see
+`parallel`) and evaluates one design point at a time. A model that hangs,
+diverges without end or takes the interpreter down only loses its worker:
+an evaluation still running after `timeout` seconds is abandoned by
+terminating the worker, and a worker that dies is noticed when its pipe
+closes. Either way the point fails and a new worker is started in its
+place, which builds the problem again.
+
+`IsolatedEvaluator` offers the same interface as `ProcessPoolEvaluator`.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import multiprocessing
+import time
+import traceback
+from collections import deque
+
+import numpy as np
+
+from bayesopt_openmdao.layout import DesvarLayout
+from bayesopt_openmdao.parallel import evaluation_outcome, timed_evaluation
+from bayesopt_openmdao.timing import wall_time
+
+try:
+    from multiprocessing.connection import wait as _wait_readable
+except ImportError:
+    # Python 2 has no way to wait on several pipes at once.
+    def _wait_readable(conns, timeout=None):
+        end = None if timeout is None else time.time() + timeout
+        while True:
+            ready = [conn for conn in conns if conn.poll()]
+            if ready or (end is not None and time.time() >= end):
+                return ready
+            time.sleep(0.005)
+
+
+def _isolated_worker(conn, problem_factory):
+    try:
+        problem = problem_factory()
+        problem.setup(check=False)
+        layout = DesvarLayout(problem.driver)
+    except Exception:
+        conn.send(('setup_error', traceback.format_exc()))
+        return
+    conn.send(('ready', None))
+    while True:
+        try:
+            x = conn.recv()
+        except EOFError:
+            return
+        if x is None:
+            return
+        conn.send(('result', timed_evaluation(problem, x, layout)))
+
+
+class _Worker(object):
+    """One worker process, and the point it is evaluating."""
+
+    def __init__(self, problem_factory):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_isolated_worker,
+                                               args=(child_conn, problem_factory))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.tag = None
+        self.started = None
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+class IsolatedEvaluator(object):
+    """Evaluates design points in worker processes that are replaced when
+    an evaluation fails badly or runs out of time.
+
+    Args
+    ----
+    problem_factory : callable
+        Picklable callable returning a new `Problem`, called once in each
+        worker process.
+
+    n_workers : int, optional
+        Number of worker processes.
+
+    timeout : float, optional
+        Seconds an evaluation may run before its worker is terminated.
+        None for no limit.
+
+    tolerate_failures : bool, optional
+        Return failed evaluations as `EvaluationFailure` instead of raising
+        an error.
+    """
+
+    def __init__(self, problem_factory, n_workers=1, timeout=None,
+                 tolerate_failures=False):
+        self.problem_factory = problem_factory
+        self.n_workers = n_workers
+        self.timeout = timeout
+        self.tolerate_failures = tolerate_failures
+        self._workers = [_Worker(problem_factory) for _ in range(n_workers)]
+        self._queue = deque()
+        self._pending = {}
+        self._next_tag = 0
+
+    @property
+    def n_pending(self):
+        """Number of submitted points that have not been collected by
+        `wait` yet."""
+        return len(self._pending)
+
+    def pending_points(self):
+        """Design vectors of the submitted points not collected yet.
+
+        Returns
+        -------
+        ndarray
+            One design vector per row, in submission order.
+        """
+        return np.array([self._pending[tag] for tag in sorted(self._pending)])
+
+    def submit(self, x):
+        """Start evaluating one design point, without waiting for it.
+
+        Args
+        ----
+        x : ndarray
+            Design vector.
+        """
+        self._submit(x)
+
+    def _submit(self, x):
+        x = np.asarray(x, dtype=float)
+        tag = self._next_tag
+        self._next_tag += 1
+        self._pending[tag] = x
+        self._queue.append(tag)
+        self._dispatch()
+        return tag
+
+    def wait(self, block=True):
+        """Collect submitted points that have finished or failed.
+
+        Args
+        ----
+        block : bool, optional
+            If True, wait until at least one point has finished, unless
+            none is pending.
+
+        Returns
+        -------
+        list of tuple
+            For each finished point, in order of completion: its design
+            vector, the result of `evaluate_point` or `EvaluationFailure`,
+            and the wall-clock time its evaluation took in the worker.
+
+        Raises
+        ------
+        RuntimeError
+            If an evaluation failed and failures are not tolerated, or a
+            worker could not build the problem.
+        """
+        return [(x, outcome, cost) for tag, x, outcome, cost in self._collect(block)]
+
+    def evaluate(self, points):
+        """Evaluate design points and wait for all of them.
+
+        Args
+        ----
+        points : iterable of ndarray
+            Design vectors to evaluate.
+
+        Returns
+        -------
+        list of tuple
+            For each point, in the order of `points`: the result of
+            `evaluate_point`, or `EvaluationFailure` if it failed and
+            failures are tolerated, and the wall-clock time its evaluation
+            took in the worker.
+        """
+        tags = [self._submit(x) for x in points]
+        results = {}
+        while len(results) < len(tags):
+            for tag, x, outcome, cost in self._collect(True):
+                results[tag] = (outcome, cost)
+        return [results[tag] for tag in tags]
+
+    def close(self):
+        """Shut down the worker processes, abandoning unfinished points."""
+        for worker in self._workers:
+            if worker.process.is_alive():
+                try:
+                    worker.conn.send(None)
+                except (IOError, OSError):
+                    pass
+        for worker in self._workers:
+            if worker.tag is None:
+                worker.process.join(1.0)
+            worker.kill()
+        self._workers = []
+        self._queue.clear()
+        self._pending = {}
+
+    def _dispatch(self):
+        for worker in self._workers:
+            if not self._queue:
+                return
+            if worker.ready and worker.tag is None:
+                tag = self._queue.popleft()
+                try:
+                    worker.conn.send(self._pending[tag])
+                except (IOError, OSError):
+                    # Died while idle; replaced once its pipe is seen closed
+                    self._queue.appendleft(tag)
+                    worker.ready = False
+                    continue
+                worker.tag = tag
+                worker.started = wall_time()
+
+    def _collect(self, block):
+        done = []
+        while self._pending:
+            timeout = 0.0
+            if block and not done:
+                timeout = self._next_deadline()
+            ready = _wait_readable([worker.conn for worker in self._workers], timeout)
+            for i, worker in enumerate(self._workers):
+                if worker.conn in ready:
+                    try:
+                        kind, message = worker.conn.recv()
+                    except EOFError:
+                        kind, message = 'died', None
+                elif self.timeout is not None and worker.tag is not None and \
+                        wall_time() - worker.started > self.timeout:
+                    kind, message = 'timeout', None
+                else:
+                    continue
+
+                if kind == 'ready':
+                    worker.ready = True
+                elif kind == 'setup_error':
+                    raise RuntimeError("A worker process could not build the "
+                                       "problem:\n{}".format(message))
+                elif kind == 'result':
+                    result, cost, error = message
+                    done.append(self._finish(worker, result, cost, error))
+                else:
+                    worker.kill()
+                    if kind == 'timeout':
+                        error = "Timed out after {} s.".format(self.timeout)
+                    else:
+                        error = "The worker process exited with code {}.".format(
+                            worker.process.exitcode)
+                    if worker.started is None:
+                        raise RuntimeError("A worker process could not build the "
+                                           "problem: {}".format(error))
+                    if worker.tag is not None:
+                        done.append(self._finish(worker, None,
+                                                 wall_time() - worker.started, error))
+                    self._workers[i] = _Worker(self.problem_factory)
+            self._dispatch()
+            if done or not block:
+                break
+        return done
+
+    def _finish(self, worker, result, cost, error):
+        tag = worker.tag
+        worker.tag = None
+        x = self._pending.pop(tag)
+        return tag, x, evaluation_outcome(x, result, error, self.tolerate_failures), cost
+
+    def _next_deadline(self):
+        """Seconds until the earliest running evaluation times out."""
+        if self.timeout is None:
+            return None
+        now = wall_time()
+        left = [worker.started + self.timeout - now
+                for worker in self._workers if worker.tag is not None]
+        return max(min(left), 0.0) if left else None
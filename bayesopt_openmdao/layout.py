@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+"""Precompiled mapping between the flat design vector and the model.
+
+`Driver.set_desvar` looks up metadata, applies the scaler and adder and
+writes one variable at a time. For problems with many small desvars that
+Python overhead dominates each evaluation, so the layout resolves every
+desvar to positions in the root unknowns vector once, after setup, and
+then moves the whole design vector in a single array operation.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import OrderedDict
+
+from six import iteritems
+
+import numpy as np
+
+
+def _expand(value, size):
+    """Broadcast a scalar or array desvar attribute to a flat array."""
+    return np.broadcast_to(np.asarray(value, dtype=float).ravel(), (size,))
+
+
+class DesvarLayout(object):
+    """Positions, scaling and bounds of every element of the design vector.
+
+    Args
+    ----
+    driver : `Driver`
+        Set-up driver whose desvars define the design vector, in order.
+
+    Attributes
+    ----------
+    names : list of str
+        Desvar names in design-vector order.
+
+    slices : OrderedDict
+        Slice of the design vector belonging to each desvar.
+
+    size : int
+        Length of the design vector.
+
+    lower, upper : ndarray
+        Scaled bounds of the design vector.
+    """
+
+    def __init__(self, driver):
+        root = driver.root
+        uvec = root.unknowns
+        meta = driver.get_desvar_metadata()
+
+        self.names = list(meta)
+        self.slices = OrderedDict()
+
+        lower, upper, scaler, adder, idx = [], [], [], [], []
+        direct = root.comm.size == 1
+
+        i = 0
+        for name, dmeta in iteritems(meta):
+            size = dmeta['size']
+            self.slices[name] = slice(i, i + size)
+            i += size
+
+            lower.append(_expand(dmeta['lower'], size))
+            upper.append(_expand(dmeta['upper'], size))
+            scaler.append(_expand(dmeta['scaler'], size))
+            adder.append(_expand(dmeta['adder'], size))
+
+            vslice = uvec._dat[name].slice
+            if vslice is None:
+                direct = False
+                continue
+            positions = np.arange(vslice[0], vslice[1])
+            if 'indices' in dmeta:
+                positions = positions[dmeta['indices']]
+            idx.append(positions)
+
+        self.size = i
+        self.lower = np.concatenate(lower) if lower else np.empty(0)
+        self.upper = np.concatenate(upper) if upper else np.empty(0)
+        self._scaler = np.concatenate(scaler) if scaler else np.empty(0)
+        self._adder = np.concatenate(adder) if adder else np.empty(0)
+        self._unscaled = bool(np.all(self._scaler == 1.0) and np.all(self._adder == 0.0))
+
+        # Remote and pass-by-object desvars (and anything under MPI) go
+        # through the driver one variable at a time.
+        self._driver = driver
+        self._vec = uvec.vec
+        self._index = None
+        if direct:
+            index = np.concatenate(idx) if idx else np.empty(0, dtype=int)
+            if index.size > 0 and np.all(np.diff(index) == 1):
+                # Contiguous desvars are written through a slice view.
+                index = slice(int(index[0]), int(index[-1]) + 1)
+            self._index = index
+
+    def scatter(self, x):
+        """Write a design vector into the model's unknowns.
+
+        Args
+        ----
+        x : ndarray
+            Scaled design vector.
+        """
+        if self._index is None:
+            for name, slc in iteritems(self.slices):
+                self._driver.set_desvar(name, x[slc])
+        elif self._unscaled:
+            self._vec[self._index] = x
+        else:
+            self._vec[self._index] = x / self._scaler - self._adder
+
+    def gather(self):
+        """Read the current design vector from the model's unknowns.
+
+        Returns
+        -------
+        ndarray
+            Scaled design vector.
+        """
+        if self._index is None:
+            desvars = self._driver.get_desvars()
+            return np.concatenate([np.ravel(desvars[name]) for name in self.names])
+        x = np.array(self._vec[self._index], dtype=float)
+        if self._unscaled:
+            return x
+        return (x + self._adder) * self._scaler
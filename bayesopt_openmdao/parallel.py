@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+
+"""Concurrent model evaluation in a pool of worker processes.
+
+Each worker builds its own copy of the `Problem` once, by calling a
+user-supplied factory, and then evaluates design points sent to it by the
+driver. The factory must return a `Problem` configured exactly like the
+one being optimized (same model, desvars, objective and constraints); it
+is called in the worker process and does not need to call `setup`.
+
+Points are either evaluated a batch at a time (`evaluate`), or submitted
+one by one and collected as they finish (`submit` and `wait`), so a free
+worker can be given a new point without waiting for the others.
+
+An evaluation that raises an error either aborts the run, or, with
+`tolerate_failures`, comes back as an `EvaluationFailure` in place of
+its result.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import multiprocessing
+import traceback
+
+from six import itervalues
+from six.moves import queue
+
+import numpy as np
+
+from bayesopt_openmdao.layout import DesvarLayout
+from bayesopt_openmdao.timing import wall_time
+
+# The worker's own copy of the Problem and its desvar layout, built by
+# `_init_worker`.
+_worker_problem = None
+_worker_layout = None
+
+
+def _init_worker(problem_factory):
+    global _worker_problem, _worker_layout
+    problem = problem_factory()
+    problem.setup(check=False)
+    _worker_problem = problem
+    _worker_layout = DesvarLayout(problem.driver)
+
+
+def evaluate_point(problem, x, layout=None):
+    """Run the model of a set-up `Problem` at one design point.
+
+    Args
+    ----
+    problem : `Problem`
+        Problem whose driver declares the desvars, objective and constraints.
+
+    x : ndarray
+        Flattened design vector, in driver desvar order.
+
+    layout : `DesvarLayout`, optional
+        Precompiled layout of the problem's design vector.
+
+    Returns
+    -------
+    tuple
+        Objective value, constraint dict and a copy of the root unknowns
+        vector.
+    """
+    driver = problem.driver
+    root = problem.root
+
+    if layout is None:
+        layout = DesvarLayout(driver)
+    layout.scatter(x)
+
+    with root._dircontext:
+        root.solve_nonlinear()
+
+    f = float(next(itervalues(driver.get_objectives())))
+    return f, driver.get_constraints(), root.unknowns.vec.copy()
+
+
+def timed_evaluation(problem, x, layout=None):
+    """Run `evaluate_point`, timing it and catching any error.
+
+    Returns
+    -------
+    tuple
+        The result of `evaluate_point` (None on error), the wall-clock time
+        it took, until the error if there was one, and the formatted
+        traceback of the error, or None.
+    """
+    start = wall_time()
+    try:
+        result = evaluate_point(problem, x, layout)
+    except Exception:
+        return None, wall_time() - start, traceback.format_exc()
+    return result, wall_time() - start, None
+
+
+class EvaluationFailure(object):
+    """Stands in for the result of an evaluation that failed, when failures
+    are tolerated.
+
+    Args
+    ----
+    error : str
+        Traceback of the error, or a description of the failure.
+    """
+
+    def __init__(self, error):
+        self.error = error
+
+
+def evaluation_outcome(x, result, error, tolerate_failures):
+    """The result of an evaluation, or its failure.
+
+    Args
+    ----
+    x : ndarray
+        Design vector.
+
+    result : tuple or None
+        Result of `evaluate_point`, None if it failed.
+
+    error : str or None
+        Description of the failure, None if there was none.
+
+    tolerate_failures : bool
+        Return failures as `EvaluationFailure` instead of raising them.
+
+    Returns
+    -------
+    tuple or `EvaluationFailure`
+        `result`, or the failure.
+
+    Raises
+    ------
+    RuntimeError
+        If the evaluation failed and failures are not tolerated.
+    """
+    if error is None:
+        return result
+    if tolerate_failures:
+        return EvaluationFailure(error)
+    raise RuntimeError("Evaluation at {} failed in a worker:\n{}".format(x, error))
+
+
+def _evaluate_timed_in_worker(x):
+    # Errors are returned rather than raised, as Python 2 pools have no
+    # error callback.
+    return timed_evaluation(_worker_problem, x, _worker_layout)
+
+
+class ProcessPoolEvaluator(object):
+    """Evaluates batches of design points in a pool of worker processes.
+
+    Args
+    ----
+    problem_factory : callable
+        Picklable callable returning a new `Problem`, called once in each
+        worker.
+
+    n_workers : int
+        Number of worker processes.
+
+    tolerate_failures : bool, optional
+        Return failed evaluations as `EvaluationFailure` instead of raising
+        an error.
+    """
+
+    def __init__(self, problem_factory, n_workers, tolerate_failures=False):
+        self.n_workers = n_workers
+        self.tolerate_failures = tolerate_failures
+        self._pool = multiprocessing.Pool(n_workers, initializer=_init_worker,
+                                          initargs=(problem_factory,))
+        self._finished = queue.Queue()
+        self._pending = {}
+        self._next_tag = 0
+
+    def evaluate(self, points):
+        """Evaluate design points concurrently.
+
+        Args
+        ----
+        points : iterable of ndarray
+            Design vectors to evaluate.
+
+        Returns
+        -------
+        list of tuple
+            For each point, in the order of `points`: the result of
+            `evaluate_point`, or `EvaluationFailure` if it failed and
+            failures are tolerated, and the wall-clock time its evaluation
+            took in the worker.
+        """
+        points = [np.asarray(x, dtype=float) for x in points]
+        outs = self._pool.map(_evaluate_timed_in_worker, points, chunksize=1)
+        return [(evaluation_outcome(x, result, error, self.tolerate_failures), cost)
+                for x, (result, cost, error) in zip(points, outs)]
+
+    @property
+    def n_pending(self):
+        """Number of submitted points that have not been collected by
+        `wait` yet."""
+        return len(self._pending)
+
+    def pending_points(self):
+        """Design vectors of the submitted points not collected yet.
+
+        Returns
+        -------
+        ndarray
+            One design vector per row, in submission order.
+        """
+        return np.array([self._pending[tag] for tag in sorted(self._pending)])
+
+    def submit(self, x):
+        """Start evaluating one design point, without waiting for it.
+
+        Args
+        ----
+        x : ndarray
+            Design vector.
+        """
+        x = np.asarray(x, dtype=float)
+        tag = self._next_tag
+        self._next_tag += 1
+        self._pending[tag] = x
+        self._pool.apply_async(_evaluate_timed_in_worker, (x,),
+                               callback=lambda out: self._finished.put((tag, out)))
+
+    def wait(self, block=True):
+        """Collect submitted points that have finished.
+
+        Args
+        ----
+        block : bool, optional
+            If True, wait until at least one point has finished, unless
+            none is pending.
+
+        Returns
+        -------
+        list of tuple
+            For each finished point, in order of completion: its design
+            vector, the result of `evaluate_point`, and the wall-clock time
+            its evaluation took in the worker.
+
+        Raises
+        ------
+        RuntimeError
+            If the model raised an error in a worker, and failures are not
+            tolerated.
+        """
+        done = []
+        while self._pending:
+            try:
+                tag, (result, cost, error) = self._finished.get(
+                    block=block and not done)
+            except queue.Empty:
+                break
+            x = self._pending.pop(tag)
+            done.append((x, evaluation_outcome(x, result, error, self.tolerate_failures),
+                         cost))
+        return done
+
+    def close(self):
+        """Shut down the worker processes."""
+        self._pool.close()
+        self._pool.join()
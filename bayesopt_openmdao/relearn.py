@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+"""Hyperparameter relearning on a background thread.
+
+Relearning works on copies of the surrogates, so the driver can keep
+proposing points with the current hyperparameters and conditioning the
+originals on new observations while it runs. Most of the work happens in
+NumPy and LAPACK calls, which release the GIL, so it overlaps well with
+models that run in worker processes or outside Python.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import threading
+
+import numpy as np
+
+
+class BackgroundRelearner(object):
+    """Relearns the hyperparameters of copies of some surrogates.
+
+    Args
+    ----
+    models : list
+        Surrogates with the `GaussianProcess` interface. They are copied
+        here, in the calling thread, and are not touched afterwards.
+
+    seed : int
+        Seed for the relearning's own random number generator.
+
+    Attributes
+    ----------
+    n_obs : int
+        Number of observations the copies are conditioned on.
+    """
+
+    def __init__(self, models, seed):
+        self.n_obs = models[0].n_obs
+        self._models = [model.copy() for model in models]
+        self._rng = np.random.RandomState(seed)
+        self._error = None
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        try:
+            for model in self._models:
+                model.learn(rng=self._rng)
+        except Exception as err:
+            self._error = err
+
+    def done(self):
+        """True once relearning has finished."""
+        return not self._thread.is_alive()
+
+    def wait(self):
+        """Block until relearning has finished."""
+        self._thread.join()
+
+    def result(self):
+        """Wait for relearning to finish and return the relearned copies.
+
+        Returns
+        -------
+        list
+            Relearned surrogates, in the order they were given, conditioned
+            on the first `n_obs` observations only.
+        """
+        self.wait()
+        if self._error is not None:
+            raise self._error
+        return self._models
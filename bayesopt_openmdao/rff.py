@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+
+"""Scalable Gaussian-process approximation using random Fourier features.
+
+The Matern 5/2 kernel is replaced by an inner product of `n_features`
+random cosine features, which turns the GP into Bayesian linear regression
+on those features. The model only stores an (n_features x n_features)
+posterior covariance and a few feature-space sums, so adding an
+observation and predicting cost the same however many observations there
+are, and no n x n kernel matrix is ever formed.
+
+Hyperparameters are learned by an exact `GaussianProcess` on a bounded
+subset of the observations, after which the features are redrawn and the
+posterior rebuilt from all observations.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import copy
+
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+
+from bayesopt_openmdao.gp import GaussianProcess
+
+# Largest number of observations used for exact hyperparameter learning.
+MAX_LEARN_POINTS = 300
+
+# Smallest noise variance used, to keep the feature-space posterior well
+# conditioned.
+_MIN_NOISE = 1e-6
+
+
+class RandomFeatureGP(object):
+    """Random-feature approximation of a GP with an ARD Matern 5/2 kernel.
+
+    Supports the same interface as `GaussianProcess`.
+
+    Args
+    ----
+    ndim : int
+        Number of input dimensions.
+
+    noise : float, optional
+        Observation noise variance, relative to the standardized objective.
+
+    n_features : int, optional
+        Number of random features.
+
+    rng : `numpy.random.RandomState`, optional
+        Source of the random features.
+    """
+
+    def __init__(self, ndim, noise=1e-6, n_features=500, rng=None):
+        self.ndim = ndim
+        self.noise = max(noise, _MIN_NOISE)
+        self.n_features = n_features
+        self.lengthscales = np.full(ndim, 0.25)
+        self.signal_var = 1.0
+        self._rng = rng if rng is not None else np.random.RandomState()
+
+        self.X = np.empty((0, ndim))
+        self.y = np.empty(0)
+        self._draw_features()
+        self._reset_posterior()
+
+    @property
+    def n_obs(self):
+        """Number of observations the model is conditioned on."""
+        return self.X.shape[0]
+
+    def copy(self):
+        """Return an independent copy of this model."""
+        return copy.deepcopy(self)
+
+    def fit(self, X, y):
+        """Condition the model on a set of observations, keeping the
+        current hyperparameters and features.
+
+        Args
+        ----
+        X : ndarray
+            Design points, shape (n, ndim), in the unit hypercube.
+
+        y : ndarray
+            Objective values, shape (n,).
+        """
+        self.X = np.array(X, dtype=float).reshape(-1, self.ndim)
+        self.y = np.array(y, dtype=float).ravel()
+        self._reset_posterior()
+        if self.n_obs == 0:
+            return
+
+        phi = self._features(self.X)
+        A = phi.T.dot(phi)
+        A[np.diag_indices_from(A)] += self.noise
+        self._A_inv = cho_solve(cho_factor(A, lower=True), np.eye(self.n_features))
+        self._phi_y = phi.T.dot(self.y)
+        self._phi_sum = phi.sum(axis=0)
+        self._y_sum = self.y.sum()
+        self._y_sqsum = self.y.dot(self.y)
+        self._update_weights()
+
+    def add(self, x, y):
+        """Add one or more observations with Sherman-Morrison updates of the
+        feature-space posterior.
+
+        Args
+        ----
+        x : ndarray
+            Design point(s), shape (ndim,) or (m, ndim).
+
+        y : float or ndarray
+            Objective value(s).
+        """
+        X_new = np.asarray(x, dtype=float).reshape(-1, self.ndim)
+        y_new = np.atleast_1d(y).astype(float).ravel()
+
+        for phi, yi in zip(self._features(X_new), y_new):
+            v = self._A_inv.dot(phi)
+            self._A_inv -= np.outer(v, v) / (1.0 + phi.dot(v))
+            self._phi_y += phi * yi
+            self._phi_sum += phi
+        self._y_sum += y_new.sum()
+        self._y_sqsum += y_new.dot(y_new)
+
+        self.X = np.vstack([self.X, X_new])
+        self.y = np.concatenate([self.y, y_new])
+        self._update_weights()
+
+    def set_hyperparameters(self, lengthscales, signal_var):
+        """Set the kernel hyperparameters, as learned earlier, then redraw
+        the features and rebuild the posterior.
+
+        Args
+        ----
+        lengthscales : ndarray
+            Lengthscale of each input dimension, shape (ndim,).
+
+        signal_var : float
+            Signal variance, relative to the standardized objective.
+        """
+        self.lengthscales = np.array(lengthscales, dtype=float).reshape(self.ndim)
+        self.signal_var = float(signal_var)
+        self._draw_features()
+        self.fit(self.X, self.y)
+
+    def learn(self, n_restarts=1, rng=None):
+        """Learn hyperparameters with an exact GP on at most
+        `MAX_LEARN_POINTS` observations (half of them the best ones, the
+        rest chosen at random), then redraw the features and rebuild the
+        posterior from all observations.
+
+        Args
+        ----
+        n_restarts : int, optional
+            Number of additional random starting points for the optimizer.
+
+        rng : `numpy.random.RandomState`, optional
+            Source of randomness for the subset and the optimizer.
+        """
+        if rng is None:
+            rng = self._rng
+
+        n = self.n_obs
+        if n < 2:
+            return
+
+        if n > MAX_LEARN_POINTS:
+            order = np.argsort(self.y)
+            best = order[:MAX_LEARN_POINTS // 2]
+            rest = rng.choice(order[MAX_LEARN_POINTS // 2:],
+                              MAX_LEARN_POINTS - len(best), replace=False)
+            subset = np.concatenate([best, rest])
+        else:
+            subset = np.arange(n)
+
+        exact = GaussianProcess(self.ndim, noise=self.noise)
+        exact.lengthscales = self.lengthscales
+        exact.signal_var = self.signal_var
+        exact.X = self.X[subset]
+        exact.y = self.y[subset]
+        exact.learn(n_restarts=n_restarts, rng=rng)
+
+        self.set_hyperparameters(exact.lengthscales, exact.signal_var)
+
+    def predict(self, X):
+        """Posterior mean and variance of the objective.
+
+        Args
+        ----
+        X : ndarray
+            Query points, shape (m, ndim), in the unit hypercube.
+
+        Returns
+        -------
+        tuple of ndarray
+            Mean and variance at each query point, both of shape (m,).
+        """
+        phi = self._features(np.asarray(X, dtype=float).reshape(-1, self.ndim))
+        mean = phi.dot(self._w)
+        var = self.noise * (phi.dot(self._A_inv) * phi).sum(axis=1)
+        var = np.maximum(var, 1e-12)
+
+        y_mean, y_std = self._y_stats()
+        return mean * y_std + y_mean, var * y_std ** 2
+
+    def mean_gradient(self, X):
+        """Gradient of the posterior mean with respect to the query points.
+
+        Args
+        ----
+        X : ndarray
+            Query points, shape (m, ndim), in the unit hypercube.
+
+        Returns
+        -------
+        ndarray
+            Gradients, shape (m, ndim).
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, self.ndim)
+        dphi = -self._amplitude * np.sin(X.dot(self._omega.T) + self._phase)
+        return (dphi * self._w[None, :]).dot(self._omega) * self._y_stats()[1]
+
+    def _draw_features(self):
+        """Sample frequencies from the Matern 5/2 spectral density, a
+        multivariate Student-t with 5 degrees of freedom."""
+        m = self.n_features
+        z = self._rng.standard_normal((m, self.ndim))
+        g = self._rng.chisquare(5.0, size=(m, 1))
+        self._omega = z * np.sqrt(5.0 / g) / self.lengthscales
+        self._phase = self._rng.uniform(0.0, 2.0 * np.pi, m)
+        self._amplitude = np.sqrt(2.0 * self.signal_var / m)
+
+    def _features(self, X):
+        return self._amplitude * np.cos(X.dot(self._omega.T) + self._phase)
+
+    def _reset_posterior(self):
+        m = self.n_features
+        self._A_inv = np.eye(m) / self.noise
+        self._phi_y = np.zeros(m)
+        self._phi_sum = np.zeros(m)
+        self._y_sum = 0.0
+        self._y_sqsum = 0.0
+        self._w = np.zeros(m)
+
+    def _y_stats(self):
+        n = self.n_obs
+        if n == 0:
+            return 0.0, 1.0
+        mean = self._y_sum / n
+        var = max(self._y_sqsum / n - mean * mean, 0.0)
+        std = np.sqrt(var)
+        return mean, std if std > 0.0 else 1.0
+
+    def _update_weights(self):
+        """Posterior mean of the feature weights for the standardized
+        objective, from the running feature-space sums."""
+        y_mean, y_std = self._y_stats()
+        self._w = self._A_inv.dot((self._phi_y - y_mean * self._phi_sum) / y_std)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+"""Space-filling designs in the unit hypercube."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+
+
+def latin_hypercube(n, ndim, rng):
+    """Random Latin hypercube design.
+
+    Args
+    ----
+    n : int
+        Number of points.
+
+    ndim : int
+        Number of dimensions.
+
+    rng : `numpy.random.RandomState`
+        Source of randomness.
+
+    Returns
+    -------
+    ndarray
+        Points in the unit hypercube, shape (n, ndim).
+    """
+    points = (rng.uniform(size=(n, ndim)) + np.arange(n)[:, None]) / max(n, 1)
+    for j in range(ndim):
+        points[:, j] = points[rng.permutation(n), j]
+    return points
+
+
+def sobol(n, ndim, rng):
+    """Scrambled Sobol sequence, or a Latin hypercube design if SciPy is too
+    old to provide one.
+
+    Args
+    ----
+    n : int
+        Number of points.
+
+    ndim : int
+        Number of dimensions.
+
+    rng : `numpy.random.RandomState`
+        Source of the scrambling.
+
+    Returns
+    -------
+    ndarray
+        Points in the unit hypercube, shape (n, ndim).
+    """
+    try:
+        from scipy.stats import qmc
+    except ImportError:
+        return latin_hypercube(n, ndim, rng)
+    if n < 1 or ndim > getattr(qmc.Sobol, 'MAXDIM', 1111):
+        return latin_hypercube(n, ndim, rng)
+    # Draw a whole power of two, which keeps the sequence balanced, and use
+    # its first n points.
+    m = int(np.ceil(np.log2(n)))
+    engine = qmc.Sobol(ndim, scramble=True, seed=rng.randint(2**31 - 1))
+    return engine.random_base2(m)[:n]
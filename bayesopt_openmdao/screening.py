@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+"""Evaluation of the constraints alone, ahead of the full model.
+
+When constraints come from cheap components and the objective from an
+expensive one, running only the subsystems the constraints depend on
+tells whether a point is worth the full model. The screen works on the
+subsystems directly under the root group: those that compute a
+constraint, and everything upstream of them through connections, run in
+the root's execution order, and the others are skipped. Structure the
+model so the expensive part sits in subsystems of its own to benefit.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from six import iteritems, itervalues
+
+from openmdao.core.component import Component
+from openmdao.solvers.run_once import RunOnce
+
+
+class ConstraintScreen(object):
+    """Runs the part of a model that the driver's constraints depend on.
+
+    Args
+    ----
+    driver : `Driver`
+        Set-up driver with at least one constraint.
+
+    Raises
+    ------
+    RuntimeError
+        If the root group iterates (its nonlinear solver is not `RunOnce`),
+        or if the constraints depend on every subsystem of the root, so
+        there is nothing to skip.
+    """
+
+    def __init__(self, driver):
+        root = driver.root
+        if not isinstance(root.nl_solver, RunOnce):
+            raise RuntimeError("Constraint screening needs the root group to "
+                               "use the RunOnce solver.")
+        uvec = root.unknowns
+
+        # Subsystems of the root that feed each subsystem of the root
+        upstream = dict((name, set()) for name in root._subsystems)
+        for tgt, (src, _) in iteritems(root.connections):
+            tgt_sys, src_sys = tgt.split('.', 1)[0], src.split('.', 1)[0]
+            if tgt_sys != src_sys:
+                upstream[tgt_sys].add(src_sys)
+
+        needed = set()
+        stack = [uvec._dat[name].meta['pathname'].split('.', 1)[0]
+                 for name in driver.get_constraint_metadata()]
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(upstream[name])
+
+        if len(needed) == len(root._subsystems):
+            raise RuntimeError("The constraints depend on every subsystem of the "
+                               "root group, so screening would run the whole model.")
+
+        self._root = root
+        self.systems = [sub for sub in itervalues(root._subsystems)
+                        if sub.name in needed]
+
+    def run(self, metadata=None):
+        """Run the constraint subsystems once, in execution order, from the
+        current desvar values.
+
+        Args
+        ----
+        metadata : dict, optional
+            Dictionary containing execution metadata (e.g. iteration coordinate).
+        """
+        root = self._root
+        for sub in self.systems:
+            root._transfer_data(sub.name)
+            if sub.is_active():
+                with sub._dircontext:
+                    if isinstance(sub, Component):
+                        sub._sys_solve_nonlinear(sub.params, sub.unknowns, sub.resids)
+                    else:
+                        sub.solve_nonlinear(sub.params, sub.unknowns, sub.resids,
+                                            metadata)
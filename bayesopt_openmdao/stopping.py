@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+"""Stopping criteria that end a run before its evaluation budget is spent."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+
+from bayesopt_openmdao.timing import wall_time
+
+
+class ConvergenceMonitor(object):
+    """Tracks the incumbent and decides when a run should stop.
+
+    A criterion is disabled by leaving it at its default.
+
+    Args
+    ----
+    min_ei : float, optional
+        Stop when the expected improvement of the next proposal falls
+        below this value (objective units).
+
+    max_stall : int, optional
+        Stop after this many evaluations without improving the best
+        feasible value, counted from the first feasible one.
+
+    target_value : float, optional
+        Stop once an objective value at or below this is found.
+
+    max_time : float, optional
+        Stop once this many wall-clock seconds have passed since the
+        monitor was created.
+
+    max_evaluations : int, optional
+        Stop after this many model evaluations.
+
+    Attributes
+    ----------
+    best_f : float
+        Best feasible objective value observed.
+
+    best_x : ndarray or None
+        Design vector where `best_f` was observed.
+
+    reason : str or None
+        Why the run should stop, or None while it should continue.
+    """
+
+    def __init__(self, min_ei=0.0, max_stall=0, target_value=-np.inf,
+                 max_time=0.0, max_evaluations=0):
+        self.min_ei = min_ei
+        self.max_stall = max_stall
+        self.target_value = target_value
+        self.max_time = max_time
+        self.max_evaluations = max_evaluations
+
+        self.best_f = np.inf
+        self.best_x = None
+        self.n_evaluations = 0
+        self.reason = None
+        self._stall = 0
+        self._start = wall_time()
+
+    @property
+    def stopped(self):
+        """True once any criterion has fired."""
+        return self.reason is not None
+
+    def observe(self, x, f, feasible=True):
+        """Account for a completed model evaluation.
+
+        Args
+        ----
+        x : ndarray
+            Design vector.
+
+        f : float
+            Objective value.
+
+        feasible : bool, optional
+            Whether the constraints are satisfied at `x`. Infeasible points
+            never count as an improvement.
+        """
+        self.n_evaluations += 1
+        f = float(f)
+        if feasible and f < self.best_f:
+            self.best_f = f
+            self.best_x = np.array(x, dtype=float)
+            self._stall = 0
+        elif self.best_x is not None:
+            # Stalling only starts once there is a feasible point to improve
+            self._stall += 1
+        self.check()
+
+    def remaining_evaluations(self):
+        """Number of model evaluations left in the `max_evaluations` budget.
+
+        Returns
+        -------
+        int or None
+            Evaluations left, or None without a budget.
+        """
+        if self.max_evaluations <= 0:
+            return None
+        return max(self.max_evaluations - self.n_evaluations, 0)
+
+    def observe_acquisition(self, ei):
+        """Account for the expected improvement of the next proposal.
+
+        Args
+        ----
+        ei : float
+            Expected improvement of the proposed point.
+        """
+        if self.min_ei > 0.0 and ei < self.min_ei and self.reason is None:
+            self.reason = 'expected improvement {:g} below min_ei'.format(ei)
+
+    def check(self):
+        """Evaluate the criteria that do not depend on the surrogate.
+
+        Returns
+        -------
+        bool
+            True if the run should stop.
+        """
+        if self.reason is not None:
+            return True
+
+        if self.best_f <= self.target_value:
+            self.reason = 'target_value reached'
+        elif self.max_stall > 0 and self._stall >= self.max_stall:
+            self.reason = 'no improvement in {} evaluations'.format(self._stall)
+        elif self.max_evaluations > 0 and self.n_evaluations >= self.max_evaluations:
+            self.reason = 'max_evaluations reached'
+        elif self.max_time > 0.0 and wall_time() - self._start >= self.max_time:
+            self.reason = 'max_time reached'
+
+        return self.reason is not None
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+
+"""The surrogates of the driver-side optimization loop, kept together.
+
+A run models the objective, each scalar constraint (`ConstraintModel`)
+and, with `cost_aware`, the evaluation cost (`CostModel`). `Surrogates`
+conditions them on the observations they have not seen yet, relearns
+their hyperparameters, swaps in copies relearned in the background, and
+saves and restores their hyperparameters for checkpoints.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+
+
+class Surrogates(object):
+    """Objective, constraint and cost surrogates of a run.
+
+    Args
+    ----
+    objective : object
+        Surrogate of the objective, with the `GaussianProcess` interface,
+        or a `GradientEnhancedGP`.
+
+    constraints : `ConstraintModel`, optional
+        Surrogates of the constraints, if there are any.
+
+    cost : `CostModel`, optional
+        Surrogate of the evaluation cost, for cost-aware acquisition.
+
+    Attributes
+    ----------
+    n_obs : int
+        Number of observations conditioned on.
+
+    n_costs : int
+        Number of runtimes conditioned on.
+    """
+
+    def __init__(self, objective, constraints=None, cost=None):
+        self.objective = objective
+        self.constraints = constraints
+        self.cost = cost
+        self.n_obs = 0
+        self.n_costs = 0
+
+    def update(self, X, f, C, G=None, X_cost=None, cost=None):
+        """Condition the surrogates on the observations they have not seen:
+        the rows of `X`, `f`, `C` and `G` from `n_obs` on, and of `X_cost`
+        and `cost` from `n_costs` on.
+
+        Args
+        ----
+        X : ndarray
+            Every observed point, shape (n, ndim), in the unit hypercube.
+
+        f : ndarray
+            Objective value at each point, NaN to leave it out of the
+            objective surrogate.
+
+        C : ndarray
+            Flattened constraint values at each point, shape (n, ncon).
+
+        G : ndarray, optional
+            Objective gradients, for a gradient-enhanced objective surrogate.
+
+        X_cost, cost : ndarray, optional
+            Points and runtimes for the cost surrogate, NaN for unknown
+            runtimes.
+        """
+        rows = slice(self.n_obs, None)
+        X_new, f_new = X[rows], f[rows]
+        first = self.n_obs == 0
+        ok = ~np.isnan(f_new)
+        if ok.any():
+            args = (X_new[ok], f_new[ok]) + ((G[rows][ok],) if G is not None else ())
+            if first:
+                self.objective.fit(*args)
+            else:
+                self.objective.add(*args)
+        if self.constraints is not None and len(X_new):
+            if first:
+                self.constraints.fit(X_new, C[rows])
+            else:
+                self.constraints.add(X_new, C[rows])
+        self.n_obs = len(f)
+
+        if self.cost is not None and cost is not None:
+            self.cost.add(X_cost[self.n_costs:], cost[self.n_costs:])
+            self.n_costs = len(cost)
+
+    def learn(self, rng=None):
+        """Relearn the hyperparameters of every surrogate."""
+        self.objective.learn(rng=rng)
+        if self.constraints is not None:
+            self.constraints.learn(rng=rng)
+        if self.cost is not None:
+            self.cost.learn(rng=rng)
+
+    def models(self):
+        """Every surrogate, in the order `adopt` takes them back."""
+        models = [self.objective]
+        if self.constraints is not None:
+            models += self.constraints.models
+        if self.cost is not None:
+            models.append(self.cost.model)
+        return models
+
+    def adopt(self, models, n_obs, n_costs):
+        """Replace the surrogates with copies relearned in the background.
+        The next `update` conditions them on what they have not seen.
+
+        Args
+        ----
+        models : list
+            Relearned copies of `models()`.
+
+        n_obs, n_costs : int
+            Numbers of observations and runtimes the copies are
+            conditioned on.
+        """
+        self.objective = models[0]
+        if self.constraints is not None:
+            self.constraints.models = models[1:1+len(self.constraints.models)]
+        if self.cost is not None:
+            self.cost.model = models[-1]
+        self.n_obs = n_obs
+        self.n_costs = n_costs
+
+    def state(self):
+        """Hyperparameters to save in a checkpoint.
+
+        Returns
+        -------
+        dict
+            Arrays, keyed by name.
+        """
+        state = {'lengthscales': self.objective.lengthscales,
+                 'signal_var': self.objective.signal_var}
+        if self.constraints is not None:
+            models = self.constraints.models
+            state['con_lengthscales'] = np.array([model.lengthscales for model in models])
+            state['con_signal_var'] = np.array([model.signal_var for model in models])
+        if self.cost is not None:
+            state['cost_lengthscales'] = self.cost.model.lengthscales
+            state['cost_signal_var'] = self.cost.model.signal_var
+        return state
+
+    def restore(self, state):
+        """Set the hyperparameters saved by `state`, before any observation
+        is added.
+
+        Args
+        ----
+        state : dict
+            Arrays saved in a checkpoint.
+        """
+        self.objective.set_hyperparameters(state['lengthscales'], state['signal_var'])
+        if self.constraints is not None and 'con_lengthscales' in state:
+            for j, model in enumerate(self.constraints.models):
+                model.set_hyperparameters(state['con_lengthscales'][j],
+                                          state['con_signal_var'][j])
+        if self.cost is not None and 'cost_lengthscales' in state:
+            self.cost.model.set_hyperparameters(state['cost_lengthscales'],
+                                                state['cost_signal_var'])
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+
+"""Per-iteration timing of the phases of an optimization run.
+
+Each iteration is split into phases:
+
+  * `model` - running the model (`solve_nonlinear`), or waiting for the
+    worker processes to do so.
+  * `update` - conditioning the surrogate on new observations.
+  * `relearn` - relearning the surrogate hyperparameters.
+  * `acquisition` - optimizing the acquisition function to pick the next
+    point(s).
+
+Wall-clock and CPU time are kept for each phase. CPU time is that of the
+driver process only, so it does not include work done in worker processes.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    from time import perf_counter as wall_time, process_time as cpu_time
+except ImportError:  # Python 2
+    from time import time as wall_time, clock as cpu_time
+
+PHASES = ('model', 'update', 'relearn', 'acquisition')
+
+COUNTERS = ('evaluations', 'cache_hits', 'relearns', 'screened_out', 'failures')
+
+
+class IterationTimer(object):
+    """Collects wall and CPU time per phase for every iteration, plus run
+    totals of evaluations, cache hits, relearns and points screened out.
+
+    Attributes
+    ----------
+    counters : OrderedDict
+        Totals for the whole run, keyed by the names in `COUNTERS`.
+    """
+
+    def __init__(self):
+        self._rows = []
+        self.counters = OrderedDict((name, 0) for name in COUNTERS)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def start_iteration(self):
+        """Begin timing a new iteration."""
+        row = OrderedDict([('iteration', len(self._rows))])
+        for name in COUNTERS:
+            row[name] = 0
+        for phase in PHASES:
+            row[phase + '_wall'] = 0.0
+            row[phase + '_cpu'] = 0.0
+        self._rows.append(row)
+
+    def current(self):
+        """Timings and counts of the current iteration, as a dict."""
+        if not self._rows:
+            self.start_iteration()
+        return self._rows[-1]
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager adding the time spent in its body to a phase of
+        the current iteration.
+
+        Args
+        ----
+        name : str
+            One of `PHASES`.
+        """
+        wall0, cpu0 = wall_time(), cpu_time()
+        try:
+            yield
+        finally:
+            self.add(name, wall_time() - wall0, cpu_time() - cpu0)
+
+    def add(self, name, wall, cpu):
+        """Add time to a phase of the current iteration.
+
+        Args
+        ----
+        name : str
+            One of `PHASES`.
+
+        wall : float
+            Wall-clock seconds.
+
+        cpu : float
+            CPU seconds.
+        """
+        row = self.current()
+        row[name + '_wall'] += wall
+        row[name + '_cpu'] += cpu
+
+    def count(self, name, n=1):
+        """Increment a counter for the current iteration and the run.
+
+        Args
+        ----
+        name : str
+            One of `COUNTERS`.
+
+        n : int, optional
+            Amount to add.
+        """
+        self.current()[name] += n
+        self.counters[name] += n
+
+    def as_array(self):
+        """All iterations as a NumPy structured array, one record per
+        iteration, with fields `iteration`, the `COUNTERS`, and
+        `<phase>_wall` and `<phase>_cpu` for each of the `PHASES`."""
+        dtype = [('iteration', int)] + [(name, int) for name in COUNTERS]
+        for phase in PHASES:
+            dtype += [(phase + '_wall', float), (phase + '_cpu', float)]
+        return np.array([tuple(row.values()) for row in self._rows], dtype=dtype)
+
+    def totals(self):
+        """Total wall and CPU time per phase over the run.
+
+        Returns
+        -------
+        OrderedDict
+            Maps each phase to a (wall, cpu) tuple.
+        """
+        totals = OrderedDict()
+        for phase in PHASES:
+            totals[phase] = (sum(row[phase + '_wall'] for row in self._rows),
+                             sum(row[phase + '_cpu'] for row in self._rows))
+        return totals
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+"""Evaluation of many design points in a single call of a component.
+
+A component opts in by defining
+
+    def solve_nonlinear_batch(self, params, unknowns):
+
+which is called like `solve_nonlinear`, except that every param and every
+unknown has an extra leading dimension with one entry per design point:
+a scalar variable becomes an array of shape (n,), an array variable of
+shape s becomes an array of shape (n,) + s. The component fills in
+`unknowns` (assigning new arrays to its keys is fine) for all n points.
+
+The objective and all constraints must be outputs of that component, and
+each of its params must be connected either directly to a desvar or to an
+output that does not depend on the desvars (such as an `IndepVarComp`
+that is not a desvar). Params that are not desvars keep their current
+value for every point.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import OrderedDict
+
+from six import iteritems
+
+import numpy as np
+
+from openmdao.components.indep_var_comp import IndepVarComp
+
+
+def _batch_value(values, meta):
+    """Pick a driver variable's indices from batched model values, one row
+    per point, and scale them."""
+    flat = values.reshape(values.shape[0], -1)
+    if 'indices' in meta:
+        flat = flat[:, meta['indices']]
+    return (flat + meta['adder']) * meta['scaler']
+
+
+class VectorizedModel(object):
+    """Evaluates batches of design points through a component's
+    `solve_nonlinear_batch`.
+
+    Args
+    ----
+    driver : `Driver`
+        Set-up driver.
+
+    layout : `DesvarLayout`
+        Precompiled layout of the driver's design vector.
+
+    Raises
+    ------
+    RuntimeError
+        If the model does not fit the protocol described in this module.
+    """
+
+    def __init__(self, driver, layout):
+        root = driver.root
+        uvec = root.unknowns
+        if layout._index is None:
+            raise RuntimeError("Vectorized evaluation needs all desvars to be "
+                               "local arrays of the root unknowns vector.")
+
+        self._driver = driver
+        self._layout = layout
+        self._obj_meta = driver._objs
+        self._con_meta = driver.get_constraint_metadata()
+
+        # The one component that computes the objective and constraints
+        promoted = dict((acc.meta['pathname'], name) for name, acc in iteritems(uvec._dat))
+        owners = set(uvec._dat[name].meta['pathname'].rsplit('.', 1)[0]
+                     for name in list(self._obj_meta) + list(self._con_meta))
+        if len(owners) != 1:
+            raise RuntimeError("Vectorized evaluation needs the objective and "
+                               "constraints to be outputs of a single component, "
+                               "found {}.".format(sorted(owners)))
+        comp = root.find_subsystem(owners.pop())
+        if not hasattr(comp, 'solve_nonlinear_batch'):
+            raise RuntimeError("Component '{}' does not define "
+                               "solve_nonlinear_batch.".format(comp.pathname))
+        self.component = comp
+
+        # Where each param gets its values from
+        self._param_sources = OrderedDict()
+        for name, acc in iteritems(comp.params._dat):
+            meta = acc.meta
+            if meta.get('pass_by_obj'):
+                raise RuntimeError("Param '{}' is passed by object and cannot "
+                                   "be vectorized.".format(meta['pathname']))
+            src, src_indices = root.connections[meta['pathname']]
+            src_name = promoted[src]
+            if src_name in layout.slices and src_indices is None:
+                dmeta = driver.get_desvar_metadata()[src_name]
+                positions = dmeta.get('indices', np.arange(dmeta['size']))
+                self._param_sources[name] = (layout.slices[src_name], positions)
+            elif isinstance(root.find_subsystem(src.rsplit('.', 1)[0]), IndepVarComp) \
+                    and src_name not in layout.slices:
+                self._param_sources[name] = None
+            else:
+                raise RuntimeError("Param '{}' is not connected directly to a "
+                                   "desvar or to a constant.".format(meta['pathname']))
+
+        # Positions of the component's outputs in the root unknowns vector
+        self._outputs = OrderedDict()
+        for name, acc in iteritems(comp.unknowns._dat):
+            if acc.meta.get('pass_by_obj'):
+                continue
+            self._outputs[name] = promoted[acc.meta['pathname']]
+
+    def evaluate(self, points):
+        """Run the model at several design points in one call.
+
+        Args
+        ----
+        points : ndarray
+            Design vectors in the driver's scaled space, one per row.
+
+        Returns
+        -------
+        tuple
+            Objective value at each point, flattened constraint values
+            (one row per point), and the root unknowns vector for each
+            point (one row per point).
+        """
+        comp = self.component
+        layout = self._layout
+        uvec = self._driver.root.unknowns
+        points = np.atleast_2d(points)
+        n = points.shape[0]
+
+        # Design points in model units
+        x_model = points if layout._unscaled else points / layout._scaler - layout._adder
+
+        params = OrderedDict()
+        for name, source in iteritems(self._param_sources):
+            val = comp.params[name]
+            shape = np.shape(val)
+            batch = np.tile(np.ravel(val).astype(float), (n, 1))
+            if source is not None:
+                slc, positions = source
+                batch[:, positions] = x_model[:, slc]
+            params[name] = batch.reshape((n,) + shape)
+
+        unknowns = OrderedDict()
+        for name in self._outputs:
+            val = comp.unknowns[name]
+            unknowns[name] = np.tile(np.ravel(val).astype(float), (n, 1)) \
+                .reshape((n,) + np.shape(val))
+
+        with self._driver.root._dircontext:
+            comp.solve_nonlinear_batch(params, unknowns)
+
+        # Whole-model state at each point
+        U = np.tile(uvec.vec, (n, 1))
+        U[:, layout._index] = x_model
+        outputs = {}
+        for name, promoted in iteritems(self._outputs):
+            values = np.asarray(unknowns[name], dtype=float).reshape(n, -1)
+            start, end = uvec._dat[promoted].slice
+            U[:, start:end] = values
+            outputs[promoted] = values
+
+        obj_name, obj_meta = next(iteritems(self._obj_meta))
+        f = _batch_value(outputs[obj_name], obj_meta)[:, 0]
+        if self._con_meta:
+            cons = np.hstack([_batch_value(outputs[name], meta)
+                              for name, meta in iteritems(self._con_meta)])
+        else:
+            cons = np.empty((n, 0))
+        return f, cons, U
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+"""Observations from earlier studies, used to seed the surrogate.
+
+Two kinds of source are read:
+
+  * Case recorder files (`SqliteRecorder` or `HDF5Recorder`) of earlier
+    runs, read with OpenMDAO's `CaseReader`. Every recorded case that has
+    the unknowns of all current desvars, objectives and constraints is
+    used.
+  * NumPy `.npz` files with one array per variable, keyed by the
+    variable's path name, and one row per observation.
+
+Values are read in model units and converted to the driver's scaled
+design, objective and constraint space using the current metadata, so a
+source only needs to share variable names with the current problem.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import namedtuple
+
+from six import iteritems
+
+import numpy as np
+
+from openmdao.api import CaseReader
+
+WarmStartData = namedtuple('WarmStartData', ['X', 'f', 'cons'])
+
+
+def _driver_value(value, meta):
+    """Flatten a model value, pick the driver's indices and scale it."""
+    flat = np.ravel(np.asarray(value, dtype=float))
+    if 'indices' in meta:
+        flat = flat[meta['indices']]
+    return (flat + meta['adder']) * meta['scaler']
+
+
+def _read_cases(filename):
+    """Unknowns of every successful case in a recorder file."""
+    reader = CaseReader(filename)
+    for i in range(reader.num_cases):
+        case = reader.get_case(i)
+        if case.unknowns is not None and case.success != 0:
+            yield case.unknowns
+
+
+def _read_npz(filename):
+    """One dict of variable values per row of a `.npz` file."""
+    with np.load(filename) as data:
+        arrays = dict((name, data[name]) for name in data.files)
+    n = min(len(val) for val in arrays.values()) if arrays else 0
+    for i in range(n):
+        yield dict((name, val[i]) for name, val in iteritems(arrays))
+
+
+def load_warm_start(filename, desvar_meta, obj_meta, con_meta, lower, upper):
+    """Read earlier observations and map them onto the current problem.
+
+    Observations lacking a current variable, containing non-finite values,
+    or lying outside the current desvar bounds are dropped, as are
+    repeated design points.
+
+    Args
+    ----
+    filename : str
+        Case recorder file, or a `.npz` file.
+
+    desvar_meta, obj_meta, con_meta : dict
+        Desvar, objective and constraint metadata of the driver.
+
+    lower, upper : ndarray
+        Current bounds of the flattened design vector.
+
+    Returns
+    -------
+    `WarmStartData`
+        Design vectors, objective values and flattened constraint values,
+        in the driver's scaled space, one row per observation.
+    """
+    if filename.endswith('.npz'):
+        rows = _read_npz(filename)
+    else:
+        rows = _read_cases(filename)
+
+    obj_name, obj = next(iteritems(obj_meta))
+    ndim = len(lower)
+    ncon = sum(meta['size'] for meta in con_meta.values())
+
+    X, f, C = [], [], []
+    for values in rows:
+        try:
+            x = np.concatenate([_driver_value(values[name], meta)
+                                for name, meta in iteritems(desvar_meta)])
+            y = _driver_value(values[obj_name], obj)[0]
+            c = np.concatenate([_driver_value(values[name], meta)
+                                for name, meta in iteritems(con_meta)] or [np.empty(0)])
+        except KeyError:
+            continue
+        if x.shape != (ndim,) or c.shape != (ncon,):
+            continue
+        if not (np.all(np.isfinite(x)) and np.isfinite(y) and np.all(np.isfinite(c))):
+            continue
+        if np.any(x < lower) or np.any(x > upper):
+            continue
+        X.append(x)
+        f.append(y)
+        C.append(c)
+
+    if not X:
+        return WarmStartData(np.empty((0, ndim)), np.empty(0), np.empty((0, ncon)))
+
+    X = np.array(X)
+    _, keep = np.unique(X, axis=0, return_index=True)
+    keep.sort()
+    return WarmStartData(X[keep], np.array(f)[keep], np.array(C).reshape(len(X), ncon)[keep])
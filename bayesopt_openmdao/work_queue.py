@@ -0,0 +1,481 @@
+#!/usr/bin/env python
+
+"""Model evaluation by workers on any number of hosts, through a work queue
+in a shared directory.
+
+The driver puts each design point in the queue as a file; worker processes,
+started separately on any host that sees the directory (a network file
+system, or the local disk for a single machine), claim points by renaming
+their files, evaluate them on their own copy of the `Problem`, and write
+the results back. Start a worker with
+
+    python -m bayesopt_openmdao.work_queue QUEUE_DIR mymodule:build_problem
+
+where `build_problem` returns a `Problem` configured exactly like the one
+being optimized, as for `problem_factory`. Workers can join or leave at
+any time.
+
+The queue directory holds:
+
+  * `tasks/` - design points waiting for a worker, as .npy files.
+  * `claimed/` - points being evaluated, renamed to end with the id of
+    the worker that claimed them.
+  * `results/` - results as .npz files of plain arrays, collected and
+    deleted by the driver. Nothing in the queue is unpickled, so a
+    writable queue directory cannot run code in the driver.
+  * `workers/` - one heartbeat file per live worker, holding a counter
+    the worker increments every few seconds.
+
+The driver judges heartbeats by when it sees the counters change, not by
+file times, so clocks need not agree across hosts. A point claimed by a
+worker whose heartbeat has not changed for `heartbeat_timeout` seconds is
+put back in `tasks/` for another worker. If the lost worker finishes it
+after all, it finds its claim gone and discards the result. A worker stopped with SIGTERM
+or Ctrl-C puts the point it was evaluating back at once.
+
+Task, claim and result names start with an id of the driver's run, so
+several runs can share a queue. When the driver closes the queue it
+removes its own tasks, claims and results.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import argparse
+import importlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from bayesopt_openmdao.layout import DesvarLayout
+from bayesopt_openmdao.isolation import IsolatedEvaluator
+from bayesopt_openmdao.parallel import EvaluationFailure, evaluation_outcome, \
+     timed_evaluation
+
+TASKS = 'tasks'
+CLAIMED = 'claimed'
+RESULTS = 'results'
+WORKERS = 'workers'
+
+
+def _write_atomic(path, write):
+    """Write a file under a temporary name, hidden from the other side of
+    the queue, and rename it into place."""
+    directory, name = os.path.split(path)
+    tmp = os.path.join(directory, '.' + name + '.tmp')
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.rename(tmp, path)
+
+
+def _write_result(f, out):
+    """Write the output of `timed_evaluation` as an .npz file."""
+    result, cost, error = out
+    arrays = {'cost': cost, 'error': '' if error is None else error}
+    if result is not None:
+        f_value, cons, unknowns = result
+        arrays['f'] = f_value
+        arrays['unknowns'] = unknowns
+        arrays['con_names'] = np.array(list(cons), dtype=np.unicode_)
+        for i, val in enumerate(cons.values()):
+            arrays['con{}'.format(i)] = val
+    np.savez(f, **arrays)
+
+
+def _read_result(path):
+    """Read the output of `timed_evaluation` written by `_write_result`."""
+    with np.load(path, allow_pickle=False) as npz:
+        cost = float(npz['cost'])
+        error = str(npz['error']) or None
+        if 'f' not in npz:
+            return None, cost, error
+        cons = OrderedDict((str(name), npz['con{}'.format(i)])
+                           for i, name in enumerate(npz['con_names']))
+        return (float(npz['f']), cons, npz['unknowns']), cost, error
+
+
+def _visible(directory):
+    return sorted(name for name in os.listdir(directory) if not name.startswith('.'))
+
+
+def _make_dirs(queue_dir):
+    for sub in (TASKS, CLAIMED, RESULTS, WORKERS):
+        path = os.path.join(queue_dir, sub)
+        if not os.path.isdir(path):
+            try:
+                os.makedirs(path)
+            except OSError:
+                # Created concurrently by another process
+                if not os.path.isdir(path):
+                    raise
+
+
+class FileQueueEvaluator(object):
+    """Driver side of the work queue. Offers the same interface as
+    `ProcessPoolEvaluator`.
+
+    Args
+    ----
+    queue_dir : str
+        Queue directory shared with the workers. Created if needed.
+
+    heartbeat_timeout : float, optional
+        Seconds without a heartbeat after which a worker is presumed lost
+        and its points are given to other workers.
+
+    poll_interval : float, optional
+        Seconds between checks of the queue while waiting for results.
+
+    tolerate_failures : bool, optional
+        Return failed evaluations as `EvaluationFailure` instead of raising
+        an error.
+    """
+
+    def __init__(self, queue_dir, heartbeat_timeout=60.0, poll_interval=0.01,
+                 tolerate_failures=False):
+        self.queue_dir = queue_dir
+        self.tolerate_failures = tolerate_failures
+        self.heartbeat_timeout = heartbeat_timeout
+        self.poll_interval = poll_interval
+        _make_dirs(queue_dir)
+
+        # Unique prefix of this run's task names
+        self._run_id = uuid.uuid4().hex[:12]
+        self._next_tag = 0
+        self._pending = {}
+        # Last heartbeat counter of each worker, when it changed, and
+        # whether the worker is presumed alive
+        self._beats = {}
+
+    def _path(self, sub, name=''):
+        return os.path.join(self.queue_dir, sub, name)
+
+    @property
+    def n_workers(self):
+        """Number of live workers, at least 1."""
+        self._check_heartbeats()
+        return max(sum(1 for counter, seen, alive in self._beats.values() if alive), 1)
+
+    @property
+    def n_pending(self):
+        """Number of submitted points that have not been collected by
+        `wait` yet."""
+        return len(self._pending)
+
+    def pending_points(self):
+        """Design vectors of the submitted points not collected yet.
+
+        Returns
+        -------
+        ndarray
+            One design vector per row, in submission order.
+        """
+        return np.array([self._pending[tag] for tag in sorted(self._pending)])
+
+    def submit(self, x):
+        """Put one design point in the queue.
+
+        Args
+        ----
+        x : ndarray
+            Design vector.
+        """
+        self._submit(x)
+
+    def _submit(self, x):
+        x = np.asarray(x, dtype=float)
+        tag = '{}-{:08d}'.format(self._run_id, self._next_tag)
+        self._next_tag += 1
+        self._pending[tag] = x
+        _write_atomic(self._path(TASKS, tag + '.npy'), lambda f: np.save(f, x))
+        return tag
+
+    def wait(self, block=True):
+        """Collect submitted points that have finished, putting back those
+        claimed by lost workers.
+
+        Args
+        ----
+        block : bool, optional
+            If True, wait until at least one point has finished, unless
+            none is pending.
+
+        Returns
+        -------
+        list of tuple
+            For each finished point: its design vector, the result of
+            `evaluate_point`, and the wall-clock time its evaluation took in
+            the worker.
+
+        Raises
+        ------
+        RuntimeError
+            If the model raised an error in a worker, and failures are not
+            tolerated.
+        """
+        return [(x, result, cost) for tag, x, result, cost in self._collect(block)]
+
+    def _collect(self, block):
+        done = []
+        while self._pending:
+            for name in _visible(self._path(RESULTS)):
+                tag = name[:-len('.npz')]
+                if not tag.startswith(self._run_id):
+                    continue
+                path = self._path(RESULTS, name)
+                result, cost, error = _read_result(path)
+                os.remove(path)
+                if tag not in self._pending:
+                    continue  # duplicate of a requeued point
+                x = self._pending.pop(tag)
+                self._remove_claims(tag)
+                done.append((tag, x, evaluation_outcome(x, result, error,
+                                                        self.tolerate_failures), cost))
+            if done or not block:
+                break
+            self._requeue_lost()
+            time.sleep(self.poll_interval)
+        return done
+
+    def evaluate(self, points):
+        """Evaluate design points and wait for all of them.
+
+        Args
+        ----
+        points : iterable of ndarray
+            Design vectors to evaluate.
+
+        Returns
+        -------
+        list of tuple
+            For each point, in the order of `points`: the result of
+            `evaluate_point`, or `EvaluationFailure` if it failed and
+            failures are tolerated, and the wall-clock time its evaluation
+            took in the worker.
+        """
+        tags = []
+        for x in points:
+            tags.append(self._submit(x))
+        results = {}
+        while len(results) < len(tags):
+            for tag, x, result, cost in self._collect(True):
+                results[tag] = (result, cost)
+        return [results[tag] for tag in tags]
+
+    def close(self):
+        """Withdraw this run's points, claimed or not, and discard its
+        uncollected results. Workers evaluating a withdrawn point discard
+        its result when they finish."""
+        for tag in list(self._pending):
+            try:
+                os.remove(self._path(TASKS, tag + '.npy'))
+            except OSError:
+                pass
+        # Claims go before results: a worker removes its claim after writing
+        # the result, so either the result is here already, or the worker
+        # finds its claim gone and removes the result itself.
+        for sub in (CLAIMED, RESULTS):
+            for name in _visible(self._path(sub)):
+                if name.startswith(self._run_id):
+                    try:
+                        os.remove(self._path(sub, name))
+                    except OSError:
+                        pass
+        self._pending = {}
+
+    def _remove_claims(self, tag):
+        for name in _visible(self._path(CLAIMED)):
+            if name.startswith(tag + '.npy.'):
+                try:
+                    os.remove(self._path(CLAIMED, name))
+                except OSError:
+                    pass
+
+    def _check_heartbeats(self):
+        now = time.time()
+        for worker in _visible(self._path(WORKERS)):
+            try:
+                with open(self._path(WORKERS, worker), 'r') as f:
+                    counter = f.read()
+            except (IOError, OSError):
+                continue
+            old = self._beats.get(worker)
+            if old is None or old[0] != counter:
+                self._beats[worker] = (counter, now, True)
+        for worker, (counter, seen, alive) in list(self._beats.items()):
+            if alive and now - seen > self.heartbeat_timeout:
+                self._beats[worker] = (counter, seen, False)
+
+    def _requeue_lost(self):
+        self._check_heartbeats()
+        for name in _visible(self._path(CLAIMED)):
+            task, worker = name.split('.npy.', 1)
+            if task not in self._pending:
+                continue
+            beat = self._beats.get(worker)
+            if beat is None:
+                # Not seen yet: give it a full timeout from now
+                self._beats[worker] = ('', time.time(), True)
+            elif not beat[2]:
+                try:
+                    os.rename(self._path(CLAIMED, name), self._path(TASKS, task + '.npy'))
+                except OSError:
+                    pass
+
+
+def _load_factory(spec):
+    module, _, name = spec.partition(':')
+    return getattr(importlib.import_module(module), name)
+
+
+def run_worker(queue_dir, problem_factory, heartbeat_interval=5.0,
+               poll_interval=0.1, max_idle=0.0, timeout=0.0):
+    """Evaluate points from a work queue until stopped.
+
+    Args
+    ----
+    queue_dir : str
+        Queue directory shared with the driver.
+
+    problem_factory : callable
+        Returns a new `Problem` configured like the one being optimized.
+
+    heartbeat_interval : float, optional
+        Seconds between heartbeats. Must be well below the driver's
+        `heartbeat_timeout`.
+
+    poll_interval : float, optional
+        Seconds between checks of the queue when it is empty.
+
+    max_idle : float, optional
+        Return after this many seconds without work. 0 waits forever.
+
+    timeout : float, optional
+        If positive, run each evaluation in a child process of the worker,
+        which is terminated when the evaluation takes longer than this many
+        seconds. The point then fails.
+    """
+    _make_dirs(queue_dir)
+    isolated = None
+    if timeout > 0.0:
+        isolated = IsolatedEvaluator(problem_factory, 1, timeout, tolerate_failures=True)
+    else:
+        problem = problem_factory()
+        problem.setup(check=False)
+        layout = DesvarLayout(problem.driver)
+
+    worker = '{}-{}-{}'.format(socket.gethostname(), os.getpid(), uuid.uuid4().hex[:6])
+    beat_path = os.path.join(queue_dir, WORKERS, worker)
+    stop = threading.Event()
+
+    def beat():
+        counter = 0
+        while True:
+            counter += 1
+            _write_atomic(beat_path, lambda f: f.write(str(counter).encode()))
+            if stop.wait(heartbeat_interval):
+                return
+
+    heart = threading.Thread(target=beat)
+    heart.daemon = True
+    heart.start()
+
+    tasks = os.path.join(queue_dir, TASKS)
+    idle_since = time.time()
+    # The point being evaluated, as its task name and claimed path
+    claimed = None
+    try:
+        while True:
+            claimed = None
+            for name in _visible(tasks):
+                path = os.path.join(queue_dir, CLAIMED, name + '.' + worker)
+                try:
+                    os.rename(os.path.join(tasks, name), path)
+                except OSError:
+                    continue  # claimed by another worker
+                claimed = name, path
+                break
+
+            if claimed is None:
+                if max_idle > 0.0 and time.time() - idle_since > max_idle:
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            name, path = claimed
+            x = np.load(path, allow_pickle=False)
+            if isolated is None:
+                out = timed_evaluation(problem, x, layout)
+            else:
+                isolated.submit(x)
+                x, result, cost = isolated.wait()[0]
+                if isinstance(result, EvaluationFailure):
+                    out = None, cost, result.error
+                else:
+                    out = result, cost, None
+            tag = name[:-len('.npy')]
+            result_path = os.path.join(queue_dir, RESULTS, tag + '.npz')
+            _write_atomic(result_path, lambda f: _write_result(f, out))
+            claimed = None
+            try:
+                os.remove(path)
+            except OSError:
+                # The claim was withdrawn by the driver, or the point given
+                # to another worker: nobody is waiting for this result
+                try:
+                    os.remove(result_path)
+                except OSError:
+                    pass
+            idle_since = time.time()
+    finally:
+        if claimed is not None:
+            # Give the unfinished point back for another worker
+            name, path = claimed
+            try:
+                os.rename(path, os.path.join(tasks, name))
+            except OSError:
+                pass
+        if isolated is not None:
+            isolated.close()
+        stop.set()
+        heart.join()
+        try:
+            os.remove(beat_path)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Evaluate design points from a BayesoptOptimizer work queue.")
+    parser.add_argument('queue_dir', help="queue directory shared with the driver")
+    parser.add_argument('factory', help="problem factory, as module:function")
+    parser.add_argument('--heartbeat', type=float, default=5.0,
+                        help="seconds between heartbeats (default 5)")
+    parser.add_argument('--poll', type=float, default=0.1,
+                        help="seconds between checks of an empty queue (default 0.1)")
+    parser.add_argument('--max-idle', type=float, default=0.0,
+                        help="exit after this many seconds without work (default: never)")
+    parser.add_argument('--timeout', type=float, default=0.0,
+                        help="fail evaluations that take longer than this many seconds, "
+                        "running each in a child process (default: no limit)")
+    args = parser.parse_args(argv)
+
+    # Leave the queue cleanly when killed, as by a batch scheduler: the
+    # point being evaluated goes back to tasks/ and the heartbeat is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    sys.path.insert(0, os.getcwd())
+    run_worker(args.queue_dir, _load_factory(args.factory), args.heartbeat,
+               args.poll, args.max_idle, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+
+"""Benchmark suite for the BayesOpt driver.
+
+Runs every combination of method, test function, dimension and evaluation
+budget for a number of seeded trials, spread over a pool of processes.
+Each trial reports the best objective found, its regret against the known
+optimum, and its wall-clock time split into time spent in the model and
+time spent in the optimizer.
+
+Results are written as CSV (one row per trial) and JSON (trials plus
+per-configuration medians). Passing the JSON of an earlier run as
+`--baseline` flags configurations whose driver overhead or regret got
+worse, and exits with status 1 if there are any.
+
+Trials run concurrently, each with a single BLAS thread. Overhead times
+still depend on how many trials share the machine, so they are only
+compared with a baseline run with the same `--workers`; each result row
+records the number of workers.
+
+Example:
+
+    python benchmark.py --methods numpy bayesopt --functions rosenbrock ackley \\
+        --dims 2 5 --iterations 50 100 --trials 10 --json results.json
+"""
+
+from __future__ import print_function
+from __future__ import division
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import OrderedDict
+
+# One BLAS and OpenMP thread per trial, so that concurrent trials do not
+# compete for cores. The libraries read these when they are loaded, which
+# for forked pool workers is when this module imports NumPy, before any
+# pool initializer could run.
+for _name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_name, '1')
+
+import numpy as np
+
+from bayesopt_openmdao.bayesopt_optimizer import BayesoptOptimizer
+from bayesopt_openmdao.timing import wall_time
+
+from openmdao.api import IndepVarComp, Component, Problem, Group, ScipyOptimizer
+
+
+def sphere(x):
+    return np.sum(x**2)
+
+
+def rosenbrock(x):
+    return np.sum(100.0*(x[1:] - x[:-1]**2)**2 + (x[:-1] - 1.0)**2)
+
+
+def ackley(x):
+    d = len(x)
+    return -20.0*np.exp(-0.2*np.sqrt(np.sum(x**2)/d)) \
+        - np.exp(np.sum(np.cos(2.0*np.pi*x))/d) + 20.0 + np.e
+
+
+def rastrigin(x):
+    return 10.0*len(x) + np.sum(x**2 - 10.0*np.cos(2.0*np.pi*x))
+
+
+def styblinski_tang(x):
+    return 0.5*np.sum(x**4 - 16.0*x**2 + 5.0*x)
+
+
+# name: (function, lower bound, upper bound, optimum for dimension d)
+FUNCTIONS = OrderedDict([
+    ('sphere', (sphere, -5.0, 5.0, lambda d: 0.0)),
+    ('rosenbrock', (rosenbrock, -5.0, 5.0, lambda d: 0.0)),
+    ('ackley', (ackley, -5.0, 5.0, lambda d: 0.0)),
+    ('rastrigin', (rastrigin, -5.12, 5.12, lambda d: 0.0)),
+    ('styblinski_tang', (styblinski_tang, -5.0, 5.0, lambda d: -39.16616570377142*d)),
+])
+
+METHODS = ['bayesopt', 'numpy', 'rff', 'cobyla']
+
+FIELDS = ['method', 'function', 'dimensions', 'iterations', 'seed',
+          'minimum', 'regret', 'evaluations', 'total_time', 'model_time',
+          'overhead_time', 'workers']
+
+
+class TestFunction(Component):
+    """ Evaluates one of the FUNCTIONS on scalar params x0..x{d-1} and
+    keeps the time spent doing so. """
+
+    def __init__(self, func, dimensions):
+        super(TestFunction, self).__init__()
+
+        self._func = func
+        self._dimensions = dimensions
+        self.model_time = 0.0
+        self.evaluations = 0
+
+        for i in range(self._dimensions):
+            self.add_param('x{0}'.format(i), val=0.0)
+
+        self.add_output('f', shape=1)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        start = wall_time()
+        x = np.array([params['x{0}'.format(i)] for i in range(self._dimensions)])
+        unknowns['f'] = self._func(x)
+        self.model_time += wall_time() - start
+        self.evaluations += 1
+
+
+def build_problem(method, function, dimensions, iterations, seed):
+    func, lower, upper, _ = FUNCTIONS[function]
+
+    top = Problem()
+    root = top.root = Group()
+    root.add('p', TestFunction(func, dimensions))
+
+    if method == 'cobyla':
+        top.driver = ScipyOptimizer()
+        top.driver.options['optimizer'] = 'COBYLA'
+        top.driver.options['maxiter'] = iterations
+        top.driver.options['disp'] = False
+    else:
+        top.driver = BayesoptOptimizer()
+        top.driver.options['backend'] = method
+        top.driver.options['n_iterations'] = iterations - 5
+        top.driver.options['n_iter_relearn'] = 20
+        top.driver.options['n_init_samples'] = 5
+        top.driver.options['n_inner_iterations'] = 1000
+        top.driver.options['noise'] = 1e-10
+        top.driver.options['surr_name'] = 'sGaussianProcessML'
+        top.driver.options['random_seed'] = seed
+        top.driver.options['disp'] = False
+    top.driver.add_objective('p.f')
+
+    # Seeded starting point, used by COBYLA.
+    x_start = np.random.RandomState(seed).uniform(lower, upper, dimensions)
+
+    for i in range(dimensions):
+        componentName = 'p{0}'.format(i)
+        variableName = 'x{0}'.format(i)
+        portName = '{0}.{1}'.format(componentName, variableName)
+        root.add(componentName, IndepVarComp(variableName, float(x_start[i])))
+        root.connect(portName, 'p.{0}'.format(variableName))
+        top.driver.add_desvar(portName, lower=lower, upper=upper)
+
+    top.setup(check=False)
+    return top
+
+
+def run_trial(spec):
+    """ Runs one seeded trial and returns its result row. """
+    method, function, dimensions, iterations, seed = spec
+    top = build_problem(method, function, dimensions, iterations, seed)
+    comp = top.root.p
+
+    start = wall_time()
+    top.run()
+    total = wall_time() - start
+
+    minimum = float(top['p.f'])
+    optimum = FUNCTIONS[function][3](dimensions)
+    return OrderedDict([
+        ('method', method), ('function', function), ('dimensions', dimensions),
+        ('iterations', iterations), ('seed', seed),
+        ('minimum', minimum), ('regret', minimum - optimum),
+        ('evaluations', comp.evaluations), ('total_time', total),
+        ('model_time', comp.model_time),
+        ('overhead_time', total - comp.model_time),
+    ])
+
+
+def summarize(rows):
+    """ Medians per configuration, keyed by 'method/function/dimensions/iterations'. """
+    groups = OrderedDict()
+    for row in rows:
+        key = '{method}/{function}/{dimensions}/{iterations}'.format(**row)
+        groups.setdefault(key, []).append(row)
+
+    summary = OrderedDict()
+    for key, group in groups.items():
+        summary[key] = OrderedDict([
+            ('trials', len(group)),
+            ('median_regret', float(np.median([r['regret'] for r in group]))),
+            ('median_overhead_time', float(np.median([r['overhead_time'] for r in group]))),
+            ('median_model_time', float(np.median([r['model_time'] for r in group]))),
+            ('median_evaluations', float(np.median([r['evaluations'] for r in group]))),
+            ('workers', group[0]['workers']),
+        ])
+    return summary
+
+
+def find_regressions(summary, baseline, tolerance):
+    """ Configurations whose median overhead or regret exceeds the baseline
+    by more than a factor of `tolerance`. Overhead is only compared between
+    runs with the same number of workers. """
+    regressions = []
+    for key, new in summary.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        fields = ['median_regret']
+        if old.get('workers') == new['workers']:
+            fields.insert(0, 'median_overhead_time')
+        for field in fields:
+            # Absolute slack keeps near-zero baselines from flagging noise.
+            limit = old[field] + (tolerance - 1.0)*abs(old[field]) + 1e-6
+            if new[field] > limit:
+                regressions.append((key, field, old[field], new[field]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--methods', nargs='+', default=['numpy', 'bayesopt'], choices=METHODS)
+    parser.add_argument('--functions', nargs='+', default=list(FUNCTIONS), choices=list(FUNCTIONS))
+    parser.add_argument('--dims', nargs='+', type=int, default=[2, 3, 5, 7])
+    parser.add_argument('--iterations', nargs='+', type=int, default=[20, 50, 100])
+    parser.add_argument('--trials', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the first trial')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help='Number of trials run at once. Keep it fixed between '
+                        'runs whose overhead times are compared')
+    parser.add_argument('--csv', default='results.csv')
+    parser.add_argument('--json', default='results.json')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help='Allowed ratio of new to baseline medians')
+    args = parser.parse_args(argv)
+
+    specs = []
+    for iterations in args.iterations:
+        for method in args.methods:
+            for function in args.functions:
+                for dimensions in args.dims:
+                    for trial in range(args.trials):
+                        specs.append((method, function, dimensions, iterations, args.seed + trial))
+
+    rows = []
+    pool = multiprocessing.Pool(args.workers)
+    try:
+        with open(args.csv, 'w') as csvFile:
+            csvWriter = csv.DictWriter(csvFile, FIELDS, lineterminator='\n')
+            csvWriter.writeheader()
+            for row in pool.imap_unordered(run_trial, specs):
+                row['workers'] = args.workers
+                rows.append(row)
+                csvWriter.writerow(row)
+                csvFile.flush()
+                print('{method} {function} d={dimensions} n={iterations} seed={seed}: '
+                      'regret {regret:.4g}, overhead {overhead_time:.3f}s, model {model_time:.3f}s'.format(**row))
+    finally:
+        pool.close()
+        pool.join()
+
+    summary = summarize(rows)
+    with open(args.json, 'w') as jsonFile:
+        json.dump(OrderedDict([('trials', rows), ('summary', summary)]), jsonFile, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['summary']
+        if any(old.get('workers') != args.workers for old in baseline.values()):
+            print('Baseline was run with a different number of workers; '
+                  'only comparing regret.')
+        regressions = find_regressions(summary, baseline, args.tolerance)
+        for key, field, old, new in regressions:
+            print('REGRESSION {0} {1}: {2:.4g} -> {3:.4g}'.format(key, field, old, new))
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@
 from __future__ import print_function
 from __future__ import division
 
+import numpy as np
+
 from bayesopt_openmdao.bayesopt_optimizer import BayesoptOptimizer
 
 from openmdao.api import IndepVarComp, Component, Problem, Group
@@ -36,7 +38,15 @@ class RosenbrockMultiDim(Component):
         unknowns["f"] = r_sum
 
         print("Evaluated function and got", unknowns['f'])
-    
+
+    def solve_nonlinear_batch(self, params, unknowns):
+        """ Same as solve_nonlinear, for many points at once. Used by the
+        driver when its "vectorize" option is set.
+        """
+        x = np.array([params['x{0}'.format(i)] for i in range(self._dimensions)])
+
+        unknowns["f"] = np.sum(100.0 * (x[1:] - x[:-1]**2.0)**2.0 + (x[:-1] - 1)**2.0, axis=0)
+
 def main():
     print("Bayesopt OpenMDAO Optimizer example")
 
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+"""Small problems shared by the driver tests."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import os
+import time
+
+from openmdao.api import IndepVarComp, Component, ExecComp, Problem, Group
+
+from bayesopt_openmdao.bayesopt_optimizer import BayesoptOptimizer
+
+
+class Paraboloid(Component):
+    """ Evaluates the equation f(x,y) = (x-3)^2 + xy + (y+4)^2 - 3 """
+
+    def __init__(self):
+        super(Paraboloid, self).__init__()
+        self.add_param('x', val=0.0)
+        self.add_param('y', val=0.0)
+        self.add_output('f_xy', shape=1)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        x = params['x']
+        y = params['y']
+        unknowns['f_xy'] = (x-3.0)**2 + x*y + (y+4.0)**2 - 3.0
+
+    def linearize(self, params, unknowns, resids):
+        x = params['x']
+        y = params['y']
+        J = {}
+        J['f_xy', 'x'] = 2.0*x - 6.0 + y
+        J['f_xy', 'y'] = 2.0*y + 8.0 + x
+        return J
+
+
+class BatchParaboloid(Paraboloid):
+    """ Paraboloid that can also evaluate many points in one call, and
+    counts the calls. """
+
+    def __init__(self):
+        super(BatchParaboloid, self).__init__()
+        self.batch_sizes = []
+
+    def solve_nonlinear_batch(self, params, unknowns):
+        x = params['x']
+        y = params['y']
+        unknowns['f_xy'] = (x-3.0)**2 + x*y + (y+4.0)**2 - 3.0
+        self.batch_sizes.append(len(x))
+
+
+class FlakyParaboloid(Paraboloid):
+    """ Paraboloid that raises an error for x > 25, hangs for x < -25, and
+    takes the interpreter down for y > 45. """
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        if params['x'] > 25.0:
+            raise ValueError("x is too large")
+        if params['x'] < -25.0:
+            time.sleep(60.0)
+        if params['y'] > 45.0:
+            os._exit(1)
+        super(FlakyParaboloid, self).solve_nonlinear(params, unknowns, resids)
+
+
+def paraboloid(constrained=False, batch=False, flaky=False, **options):
+    """The paraboloid on [-50, 50]^2 under a `BayesoptOptimizer` with the
+    numpy backend and the given options, not set up. Also usable as a
+    `problem_factory`.
+
+    With `constrained`, x + y <= -5 is imposed through the output `con.c`.
+    With `batch`, the paraboloid is a `BatchParaboloid`, and with `flaky`
+    a `FlakyParaboloid`.
+    """
+    top = Problem()
+    root = top.root = Group()
+    root.add('p1', IndepVarComp('x', 3.0))
+    root.add('p2', IndepVarComp('y', -4.0))
+    if batch:
+        root.add('p', BatchParaboloid())
+    elif flaky:
+        root.add('p', FlakyParaboloid())
+    else:
+        root.add('p', Paraboloid())
+    root.connect('p1.x', 'p.x')
+    root.connect('p2.y', 'p.y')
+
+    top.driver = BayesoptOptimizer()
+    top.driver.options['backend'] = 'numpy'
+    top.driver.options['disp'] = False
+    for name, value in options.items():
+        top.driver.options[name] = value
+    top.driver.add_desvar('p1.x', lower=-50, upper=50)
+    top.driver.add_desvar('p2.y', lower=-50, upper=50)
+    top.driver.add_objective('p.f_xy')
+
+    if constrained:
+        root.add('con', ExecComp('c = x + y'))
+        root.connect('p1.x', 'con.x')
+        root.connect('p2.y', 'con.y')
+        top.driver.add_constraint('con.c', upper=-5.0)
+    return top
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""Tests of asynchronous evaluation in a pool of worker processes."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.parallel import ProcessPoolEvaluator
+
+from problems import paraboloid
+
+
+def _f(x):
+    return (x[0]-3.0)**2 + x[0]*x[1] + (x[1]+4.0)**2 - 3.0
+
+
+class TestProcessPoolEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = ProcessPoolEvaluator(paraboloid, 2)
+
+    def tearDown(self):
+        self.evaluator.close()
+
+    def test_submit_and_wait(self):
+        points = np.array([[1.0, 2.0], [3.0, -4.0], [0.0, 0.0]])
+        for x in points:
+            self.evaluator.submit(x)
+        self.assertEqual(self.evaluator.n_pending, 3)
+        np.testing.assert_array_equal(self.evaluator.pending_points(), points)
+
+        done = []
+        while self.evaluator.n_pending:
+            done.extend(self.evaluator.wait())
+        self.assertEqual(len(done), 3)
+        self.assertEqual(self.evaluator.wait(), [])
+        for x, (f, cons, unknowns), cost in done:
+            self.assertAlmostEqual(f, _f(x))
+            self.assertGreaterEqual(cost, 0.0)
+
+    def test_evaluate(self):
+        points = [np.array([1.0, 2.0]), np.array([3.0, -4.0])]
+        outcomes = self.evaluator.evaluate(points)
+        self.assertEqual([result[0] for result, cost in outcomes],
+                         [_f(x) for x in points])
+
+
+class TestAsynchronousRun(unittest.TestCase):
+
+    def _run(self, **options):
+        top = paraboloid(random_seed=0, async_evaluation=True, **options)
+        top.driver.problem_factory = paraboloid
+        top.setup(check=False)
+        top.run()
+        return top
+
+    def test_asynchronous_run(self):
+        top = self._run(n_iterations=8, n_init_samples=4, n_workers=2)
+        history = top.driver.history
+        self.assertEqual(len(history), 12)
+        # No point is proposed while it is still being evaluated
+        self.assertEqual(len(np.unique(history.X, axis=0)), 12)
+        np.testing.assert_allclose(history.f, [_f(x) for x in history.X])
+        self.assertEqual(top['p.f_xy'], np.min(history.f))
+
+    def test_needs_workers(self):
+        self.assertRaises(RuntimeError, self._run, n_iterations=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+"""Tests of batch proposals and their evaluation in a process pool."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.batch import BATCH_STRATEGIES, propose_batch, _penalty
+from bayesopt_openmdao.gp import GaussianProcess
+
+from problems import paraboloid
+
+
+def _objective(X):
+    # The paraboloid of `problems`, on the unit square
+    x, y = 100.0*X[:, 0] - 50.0, 100.0*X[:, 1] - 50.0
+    return (x - 3.0)**2 + x*y + (y + 4.0)**2 - 3.0
+
+
+def _fitted_gp(seed):
+    rng = np.random.RandomState(seed)
+    X = rng.uniform(size=(10, 2))
+    gp = GaussianProcess(2)
+    gp.fit(X, _objective(X))
+    gp.learn(rng=np.random.RandomState(0))
+    return gp
+
+
+class TestLocalPenalty(unittest.TestCase):
+
+    def test_excludes_ball_around_worse_center(self):
+        # Predicted 2 above the best value with a Lipschitz constant of 10,
+        # the center rules out a ball of radius 0.2 around it
+        center = np.array([[0.5, 0.5]])
+        mean, var, best = np.array([3.0]), np.array([0.01]), 1.0
+        X = np.array([[0.5, 0.5], [0.7, 0.5], [0.5, 0.9]])
+        penalty = _penalty(X, center, mean, var, 10.0, best)
+        self.assertLess(penalty[0], 1e-10)
+        self.assertAlmostEqual(penalty[1], 0.5)
+        self.assertGreater(penalty[2], 1.0 - 1e-10)
+
+    def test_center_better_than_best_is_not_excluded(self):
+        center = np.array([[0.5, 0.5]])
+        penalty = _penalty(center, center, np.array([0.0]), np.array([0.01]), 10.0, 1.0)
+        self.assertGreater(penalty[0], 0.5)
+
+    def test_points_lie_outside_exclusion_radii(self):
+        # Each point must lie outside the ball of radius (mean - best) / L
+        # around the pending points and the points selected before it
+        for seed in range(6):
+            gp = _fitted_gp(seed)
+            pending = gp.X[np.argsort(gp.y)[:3]] + 0.01
+            batch = propose_batch(gp, 4, 'local_penalization', 500,
+                                  np.random.RandomState(1), pending=pending)
+            # The Lipschitz estimate is the first use of the random state
+            sample = np.random.RandomState(1).uniform(size=(500, 2))
+            lipschitz = np.max(np.linalg.norm(gp.mean_gradient(sample), axis=1))
+            centers = np.vstack([pending, batch])
+            radii = (gp.predict(centers)[0] - np.min(gp.y)) / lipschitz
+            for i in range(len(pending), len(centers)):
+                dist = np.linalg.norm(centers[:i] - centers[i], axis=1)
+                self.assertTrue(np.all(dist >= radii[:i]), "seed %d" % seed)
+
+
+class TestProposeBatch(unittest.TestCase):
+
+    def test_strategies_propose_distinct_points(self):
+        # The kriging believer can legitimately repeat a point whose
+        # predicted value is the best
+        gp = _fitted_gp(0)
+        for strategy in ('constant_liar', 'local_penalization'):
+            batch = propose_batch(gp, 4, strategy, 500, np.random.RandomState(1))
+            self.assertEqual(batch.shape, (4, 2))
+            self.assertTrue(np.all((batch >= 0.0) & (batch <= 1.0)))
+            dist = np.linalg.norm(batch[:, None, :] - batch[None, :, :], axis=2)
+            self.assertGreater(np.min(dist[np.triu_indices(4, 1)]), 1e-3, strategy)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            propose_batch(_fitted_gp(0), 2, 'thompson', 100, np.random.RandomState(1))
+
+
+class TestBatchRun(unittest.TestCase):
+
+    def test_process_pool(self):
+        for strategy in BATCH_STRATEGIES:
+            top = paraboloid(n_iterations=8, n_init_samples=4, random_seed=0,
+                             batch_size=4, batch_strategy=strategy, n_workers=2)
+            top.driver.problem_factory = paraboloid
+            top.setup(check=False)
+            top.run()
+            history = top.driver.history
+            self.assertEqual(len(history), 12)
+            self.assertEqual(top['p.f_xy'], np.min(history.f))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""Tests of bulk recording to chunk files."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+from bayesopt_openmdao.bulk_recording import BulkRecorder, RecordingReader
+
+from problems import paraboloid
+
+# Columns: iteration, x (2), f, g (1), then 3 unknowns: u (2) and v (1)
+LAYOUT = {
+    'columns': OrderedDict([
+        ('iteration', OrderedDict([('iteration', [0, 1])])),
+        ('desvars', OrderedDict([('x', [1, 3])])),
+        ('objectives', OrderedDict([('f', [3, 4])])),
+        ('constraints', OrderedDict([('g', [4, 5])])),
+        ('unknowns', OrderedDict([('u', [5, 7]), ('v', [7, 8])])),
+    ]),
+    'unknowns_start': 5,
+    'width': 8,
+}
+
+
+class TestBulkRecording(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        rng = np.random.RandomState(0)
+        self.X = rng.uniform(size=(11, 2))
+        self.f = rng.uniform(size=11)
+        self.g = rng.uniform(size=(11, 1))
+        self.unknowns = rng.uniform(size=(11, 3))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _record(self, recorder, rows):
+        for i in rows:
+            recorder.record(i + 1, self.X[i], self.f[i], self.g[i], self.unknowns[i])
+
+    def test_round_trip(self):
+        recorder = BulkRecorder(self.dir, LAYOUT, chunk_size=4)
+        self._record(recorder, range(11))
+        recorder.close()
+
+        reader = RecordingReader(self.dir)
+        self.assertEqual(len(reader), 11)
+        self.assertEqual(len(reader.chunks), 3)
+        np.testing.assert_array_equal(reader.values('iteration', 'iteration').ravel(),
+                                      np.arange(1, 12))
+        np.testing.assert_array_equal(reader.values('x', 'desvars'), self.X)
+        np.testing.assert_array_equal(reader.values('f', 'objectives').ravel(), self.f)
+        np.testing.assert_array_equal(reader.values('g', 'constraints'), self.g)
+        np.testing.assert_array_equal(reader.values('u'), self.unknowns[:, :2])
+        np.testing.assert_array_equal(reader.values('v'), self.unknowns[:, 2:])
+
+    def test_resume_adds_chunks(self):
+        recorder = BulkRecorder(self.dir, LAYOUT, chunk_size=4)
+        self._record(recorder, range(6))
+        recorder.close()
+        recorder = BulkRecorder(self.dir, LAYOUT, chunk_size=4, resume=True)
+        self._record(recorder, range(6, 11))
+        recorder.close()
+
+        reader = RecordingReader(self.dir)
+        np.testing.assert_array_equal(reader.values('x', 'desvars'), self.X)
+
+    def test_new_recording_deletes_chunks(self):
+        recorder = BulkRecorder(self.dir, LAYOUT, chunk_size=4)
+        self._record(recorder, range(6))
+        recorder.close()
+        BulkRecorder(self.dir, LAYOUT).close()
+        reader = RecordingReader(self.dir)
+        self.assertEqual(len(reader), 0)
+        self.assertEqual(reader.values('u').shape, (0, 2))
+
+
+class TestRecordedRun(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_records_every_evaluation(self):
+        top = paraboloid(n_iterations=4, n_init_samples=3, random_seed=0,
+                         record_dir=self.dir, record_chunk_size=2)
+        top.setup(check=False)
+        top.run()
+        history = top.driver.history
+
+        reader = RecordingReader(self.dir)
+        X = np.column_stack([reader.values('p1.x', 'desvars'),
+                             reader.values('p2.y', 'desvars')])
+        self.assertEqual(len(reader), 7)
+        self.assertEqual(len(reader.chunks), 4)
+        np.testing.assert_array_equal(X, history.X)
+        np.testing.assert_array_equal(reader.values('p.f_xy', 'objectives').ravel(),
+                                      history.f)
+
+
+if __name__ == "__main__":
+    unittest.main()
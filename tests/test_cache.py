@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+"""Tests of the evaluation cache."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+from bayesopt_openmdao.cache import EvaluationCache
+
+from problems import paraboloid
+
+
+def _put(cache, x, f):
+    cache.put(np.asarray(x, dtype=float), f, OrderedDict([('c', np.array([f]))]),
+              np.array([f, 2*f]))
+
+
+class TestEvaluationCache(unittest.TestCase):
+
+    def test_exact_hit_returns_copies(self):
+        cache = EvaluationCache(2, 4)
+        cons = OrderedDict([('c', np.array([1.0]))])
+        cache.put(np.array([0.5, 1.0]), 3.0, cons, np.array([1.0, 2.0]))
+        cons['c'][0] = 99.0
+        f, cached_cons, unknowns = cache.get(np.array([0.5, 1.0]))
+        self.assertEqual(f, 3.0)
+        self.assertEqual(cached_cons['c'][0], 1.0)
+        np.testing.assert_array_equal(unknowns, [1.0, 2.0])
+        self.assertIsNone(cache.get(np.array([0.5, 1.0 + 1e-12])))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = EvaluationCache(1, 3)
+        for i in range(3):
+            _put(cache, [i], float(i))
+        # Using 0 makes 1 the least recently used
+        self.assertIsNotNone(cache.get(np.array([0.0])))
+        _put(cache, [3], 3.0)
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get(np.array([1.0])))
+        for i in (0, 2, 3):
+            self.assertEqual(cache.get(np.array([float(i)]))[0], float(i))
+
+    def test_overwrite_does_not_evict(self):
+        cache = EvaluationCache(1, 2)
+        _put(cache, [0], 0.0)
+        _put(cache, [1], 1.0)
+        _put(cache, [0], 5.0)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(np.array([0.0]))[0], 5.0)
+        self.assertEqual(cache.get(np.array([1.0]))[0], 1.0)
+
+    def test_tolerance_is_relative_to_scale(self):
+        cache = EvaluationCache(2, 4, tol=1e-3, scale=np.array([1.0, 100.0]))
+        _put(cache, [0.5, 50.0], 1.0)
+        self.assertIsNotNone(cache.get(np.array([0.5005, 50.05])))
+        self.assertIsNone(cache.get(np.array([0.502, 50.0])))
+        self.assertIsNone(cache.get(np.array([0.5, 50.2])))
+
+    def test_tolerance_picks_nearest(self):
+        cache = EvaluationCache(1, 4, tol=0.1)
+        _put(cache, [0.0], 0.0)
+        _put(cache, [0.15], 1.0)
+        self.assertEqual(cache.get(np.array([0.09]))[0], 1.0)
+
+    def test_disabled(self):
+        cache = EvaluationCache(1, 0)
+        _put(cache, [0], 0.0)
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get(np.array([0.0])))
+
+
+class TestDriverCache(unittest.TestCase):
+
+    def _run(self, **options):
+        top = paraboloid(n_iterations=4, n_init_samples=3, random_seed=0, **options)
+        top.setup(check=False)
+        top.run()
+        return top.driver
+
+    def test_off_by_default(self):
+        driver = self._run()
+        self.assertIsNone(driver.eval_cache)
+        self.assertEqual(driver.timings.counters['cache_hits'], 0)
+
+    def test_final_evaluation_is_a_hit(self):
+        driver = self._run(cache_size=10)
+        self.assertEqual(len(driver.eval_cache), 7)
+        self.assertEqual(driver.timings.counters['cache_hits'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
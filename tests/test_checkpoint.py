@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""Tests of checkpoint writing and loading."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.checkpoint import OBSERVATIONS_FILE, CheckpointWriter, \
+     load_checkpoint
+
+from problems import paraboloid
+
+LAYOUT = {'ndim': 2, 'ncon': 1, 'nunknowns': 3, 'desvars': ['p1.x', 'p2.y']}
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        rng = np.random.RandomState(0)
+        self.X = rng.uniform(size=(7, 2))
+        self.f = rng.uniform(size=7)
+        self.cons = rng.uniform(size=(7, 1))
+        self.unknowns = rng.uniform(size=(7, 3))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _write(self, writer, rows):
+        for i in rows:
+            writer.append(self.X[i], self.f[i], self.cons[i], self.unknowns[i])
+
+    def test_round_trip(self):
+        writer = CheckpointWriter(self.dir, LAYOUT, interval=3)
+        self._write(writer, range(7))
+        writer.save_state(lengthscales=np.array([0.1, 0.2]), last_relearn=4)
+        # Only full intervals are on disk until closed
+        self.assertEqual(len(load_checkpoint(self.dir).f), 6)
+        writer.close()
+
+        data = load_checkpoint(self.dir)
+        np.testing.assert_array_equal(data.X, self.X)
+        np.testing.assert_array_equal(data.f, self.f)
+        np.testing.assert_array_equal(data.cons, self.cons)
+        np.testing.assert_array_equal(data.unknowns, self.unknowns)
+        np.testing.assert_array_equal(data.state['lengthscales'], [0.1, 0.2])
+        self.assertEqual(int(data.state['last_relearn']), 4)
+
+    def test_truncated_trailing_row_is_dropped(self):
+        writer = CheckpointWriter(self.dir, LAYOUT, interval=1)
+        self._write(writer, range(4))
+        writer.close()
+        path = os.path.join(self.dir, OBSERVATIONS_FILE)
+        with open(path, 'ab') as f:
+            # Part of a row, as left by a run killed while writing
+            np.arange(3, dtype=float).tofile(f)
+
+        data = load_checkpoint(self.dir)
+        self.assertEqual(len(data.f), 4)
+        np.testing.assert_array_equal(data.X, self.X[:4])
+        np.testing.assert_array_equal(data.unknowns, self.unknowns[:4])
+        self.assertEqual(data.state, {})
+
+    def test_resume_appends(self):
+        writer = CheckpointWriter(self.dir, LAYOUT, interval=1)
+        self._write(writer, range(3))
+        writer.close()
+        writer = CheckpointWriter(self.dir, LAYOUT, interval=1, resume=True)
+        self._write(writer, range(3, 7))
+        writer.close()
+        np.testing.assert_array_equal(load_checkpoint(self.dir).f, self.f)
+
+    def test_resume_checks_layout(self):
+        CheckpointWriter(self.dir, LAYOUT).close()
+        other = dict(LAYOUT, ncon=2)
+        with self.assertRaises(ValueError):
+            CheckpointWriter(self.dir, other, resume=True)
+
+    def test_new_run_discards_observations(self):
+        writer = CheckpointWriter(self.dir, LAYOUT, interval=1)
+        self._write(writer, range(3))
+        writer.close()
+        CheckpointWriter(self.dir, LAYOUT).close()
+        self.assertEqual(len(load_checkpoint(self.dir).f), 0)
+
+
+class TestResume(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _run(self, n_iterations, **options):
+        top = paraboloid(n_iterations=n_iterations, n_init_samples=4, random_seed=0,
+                         **options)
+        top.setup(check=False)
+        top.run()
+        return top.driver
+
+    def test_resume_skips_saved_evaluations(self):
+        first = self._run(6, checkpoint_dir=self.dir, checkpoint_interval=3)
+        self.assertEqual(len(load_checkpoint(self.dir).f), 10)
+
+        resumed = self._run(12, resume_from=self.dir)
+        self.assertEqual(len(resumed.history), 16)
+        self.assertEqual(resumed.timings.counters['evaluations'], 6)
+        np.testing.assert_array_equal(resumed.history.X[:10], first.history.X)
+        self.assertEqual(len(load_checkpoint(self.dir).f), 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
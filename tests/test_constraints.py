@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+"""Tests of constraint handling in the driver-side loop."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+from bayesopt_openmdao.constraints import ConstraintModel, constraint_bounds, \
+     violation
+from bayesopt_openmdao.gp import GaussianProcess
+from bayesopt_openmdao.stopping import ConvergenceMonitor
+
+from problems import paraboloid
+
+
+class TestConstraintBounds(unittest.TestCase):
+
+    def test_bounds_and_violation(self):
+        con_meta = OrderedDict([
+            ('a', {'size': 2, 'lower': None, 'upper': 1.0, 'equals': None}),
+            ('b', {'size': 1, 'lower': None, 'upper': None, 'equals': 3.0}),
+        ])
+        lower, upper = constraint_bounds(con_meta, 0.1)
+        np.testing.assert_array_equal(lower, [-np.inf, -np.inf, 2.9])
+        np.testing.assert_array_equal(upper, [1.0, 1.0, 3.1])
+        self.assertEqual(violation([0.0, 1.5, 3.0], lower, upper), 0.5)
+        np.testing.assert_allclose(violation([[0.0, 0.0, 3.5], [0.0, np.nan, 3.0]],
+                                             lower, upper), [0.4, np.inf])
+
+
+class TestConstraintModel(unittest.TestCase):
+
+    def test_probability_of_feasibility(self):
+        X = np.linspace(0.0, 1.0, 11)[:, None]
+        model = ConstraintModel(lambda: GaussianProcess(1), np.array([-np.inf]),
+                                np.array([0.5]))
+        model.fit(X, X)
+        pof = model.probability_of_feasibility(np.array([[0.1], [0.9]]))
+        self.assertGreater(pof[0], 0.99)
+        self.assertLess(pof[1], 0.01)
+
+
+class TestConstrainedRun(unittest.TestCase):
+
+    def _run(self, **options):
+        top = paraboloid(constrained=True, n_init_samples=5, random_seed=0, **options)
+        top.setup(check=False)
+        top.run()
+        return top
+
+    def test_constrained_run(self):
+        top = self._run(n_iterations=15)
+        history = top.driver.history
+        self.assertEqual(len(history), 20)
+        self.assertLessEqual(top['con.c'], -5.0)
+        self.assertEqual(top['p.f_xy'], np.min(history.f[history.feasible]))
+
+    def test_max_stall_waits_for_a_feasible_point(self):
+        # The first three samples of this seed's initial design are
+        # infeasible. Counted as a stall, they would end the run right after
+        # the initial design.
+        top = self._run(n_iterations=30, max_stall=3)
+        self.assertFalse(top.driver.history.feasible[:3].any())
+        self.assertGreater(len(top.driver.history), 5)
+        self.assertLessEqual(top['con.c'], -5.0)
+
+
+class TestConvergenceMonitor(unittest.TestCase):
+
+    def test_stall_counts_from_first_feasible_point(self):
+        monitor = ConvergenceMonitor(max_stall=2)
+        for f in (5.0, 4.0, 3.0):
+            monitor.observe(np.zeros(1), f, feasible=False)
+        self.assertFalse(monitor.stopped)
+        monitor.observe(np.zeros(1), 10.0)
+        monitor.observe(np.zeros(1), 1.0, feasible=False)
+        self.assertFalse(monitor.stopped)
+        monitor.observe(np.zeros(1), 11.0)
+        self.assertTrue(monitor.stopped)
+
+
+if __name__ == "__main__":
+    unittest.main()
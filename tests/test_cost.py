@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+"""Tests of the evaluation cost model and cost-aware acquisition."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.cost import CostModel
+from bayesopt_openmdao.gp import GaussianProcess
+from bayesopt_openmdao.rff import RandomFeatureGP
+from bayesopt_openmdao.surrogates import Surrogates
+
+from problems import paraboloid
+
+
+class TestCostModel(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = rng.uniform(size=(12, 2))
+        # Runtimes from 1 ms to 1 s, growing along the first axis
+        self.cost = 10.0 ** (3.0*self.X[:, 0] - 3.0)
+
+    def test_noise_reaches_random_features(self):
+        model = CostModel(RandomFeatureGP(2, noise=1e-6, rng=np.random.RandomState(1)))
+        model.add(self.X, self.cost)
+        noisy = RandomFeatureGP(2, noise=0.05, rng=np.random.RandomState(1))
+        noisy.fit(self.X, np.log(self.cost))
+        X_test = np.random.RandomState(2).uniform(size=(5, 2))
+        for a, b in zip(model.model.predict(X_test), noisy.predict(X_test)):
+            np.testing.assert_allclose(a, b, rtol=1e-6, atol=1e-8)
+
+    def test_expected_cost(self):
+        model = CostModel(GaussianProcess(2))
+        model.add(self.X[:1], self.cost[:1])
+        np.testing.assert_array_equal(model.expected_cost(self.X[:3]), np.ones(3))
+        # Unknown runtimes are left out
+        model.add(self.X[1:], np.where(np.arange(11) == 3, np.nan, self.cost[1:]))
+        self.assertEqual(model.n_obs, 11)
+        cheap, dear = model.expected_cost(np.array([[0.0, 0.5], [1.0, 0.5]]))
+        self.assertLess(cheap, 1.0)
+        self.assertGreater(dear, 1.0)
+
+    def test_state_restores_hyperparameters(self):
+        surrogates = Surrogates(GaussianProcess(2), cost=CostModel(GaussianProcess(2)))
+        surrogates.update(self.X, np.zeros(12), np.empty((12, 0)),
+                          X_cost=self.X, cost=self.cost)
+        surrogates.learn(rng=np.random.RandomState(0))
+        state = surrogates.state()
+
+        restored = Surrogates(GaussianProcess(2), cost=CostModel(GaussianProcess(2)))
+        restored.restore(state)
+        np.testing.assert_array_equal(restored.cost.model.lengthscales,
+                                      surrogates.cost.model.lengthscales)
+        self.assertEqual(restored.cost.model.signal_var,
+                         surrogates.cost.model.signal_var)
+
+
+class TestCostAwareRun(unittest.TestCase):
+
+    def test_cost_aware_run(self):
+        top = paraboloid(n_iterations=6, n_init_samples=4, random_seed=0,
+                         cost_aware=True)
+        top.setup(check=False)
+        top.run()
+        history = top.driver.history
+        self.assertEqual(len(history), 10)
+        self.assertTrue(np.all(history.cost >= 0.0))
+        self.assertEqual(top['p.f_xy'], np.min(history.f))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+"""Tests of the random embedding of the design space."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.embedding import HashingEmbedding
+
+from problems import paraboloid
+
+
+class TestHashingEmbedding(unittest.TestCase):
+
+    def setUp(self):
+        self.embedding = HashingEmbedding(7, 3, np.random.RandomState(0))
+        self.Z = np.random.RandomState(1).uniform(size=(10, 3))
+
+    def test_every_embedded_dimension_is_used(self):
+        np.testing.assert_array_equal(np.sort(np.unique(self.embedding.index)),
+                                      [0, 1, 2])
+
+    def test_round_trip(self):
+        X = self.embedding.to_unit(self.Z)
+        self.assertTrue(np.all((X >= 0.0) & (X <= 1.0)))
+        np.testing.assert_allclose(self.embedding.from_unit(X), self.Z)
+        self.assertTrue(self.embedding.contains(X).all())
+        # Every embedded dimension has several design dimensions, so moving
+        # one of them alone leaves the embedding
+        X[0, 0] += 0.1 if X[0, 0] < 0.5 else -0.1
+        self.assertFalse(self.embedding.contains(X)[0])
+
+    def test_gradient_is_chain_rule(self):
+        # For f(x) = c.x, the gradient with respect to z is that of c.x(z)
+        c = np.random.RandomState(2).normal(size=7)
+        Gz = self.embedding.gradient(c[None, :])
+        step = 1e-6
+        for j in range(3):
+            dZ = np.zeros(3)
+            dZ[j] = step
+            fd = (self.embedding.to_unit(self.Z[:1] + dZ).dot(c) -
+                  self.embedding.to_unit(self.Z[:1] - dZ).dot(c)) / (2*step)
+            self.assertAlmostEqual(Gz[0, j], fd[0], places=5)
+
+
+class TestEmbeddedRun(unittest.TestCase):
+
+    def test_points_lie_on_embedding(self):
+        top = paraboloid(n_iterations=5, n_init_samples=3, random_seed=0,
+                         embedding_dim=1)
+        top.setup(check=False)
+        top.run()
+        history = top.driver.history
+        self.assertEqual(len(history), 8)
+        # With one embedded dimension, x and y are tied: each is either
+        # the same point of [-50, 50] or its mirror image.
+        self.assertTrue(np.allclose(np.abs(history.X[:, 0]),
+                                    np.abs(history.X[:, 1])))
+        self.assertEqual(float(top['p.f_xy']), np.min(history.f))
+
+
+if __name__ == "__main__":
+    unittest.main()
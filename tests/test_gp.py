@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+"""Tests of the Gaussian process surrogates."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.gp import GaussianProcess
+from bayesopt_openmdao.gradient_gp import GradientEnhancedGP
+
+
+def _branin(X):
+    x, y = 15.0*X[:, 0] - 5.0, 15.0*X[:, 1]
+    return (y - 5.1/(4*np.pi**2)*x**2 + 5/np.pi*x - 6)**2 + 10*(1 - 1/(8*np.pi))*np.cos(x) + 10
+
+
+class TestGaussianProcess(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = rng.uniform(size=(12, 2))
+        self.y = _branin(self.X)
+        self.X_test = rng.uniform(size=(20, 2))
+
+    def _models(self, make):
+        full = make()
+        full.lengthscales = np.array([0.3, 0.2])
+        full.fit(self.X, self.y)
+        incremental = make()
+        incremental.lengthscales = full.lengthscales
+        incremental.fit(self.X[:5], self.y[:5])
+        incremental.add(self.X[5], self.y[5])
+        incremental.add(self.X[6:], self.y[6:])
+        return full, incremental
+
+    def test_add_matches_fit(self):
+        full, incremental = self._models(lambda: GaussianProcess(2))
+        for a, b in zip(full.predict(self.X_test), incremental.predict(self.X_test)):
+            np.testing.assert_allclose(a, b, rtol=1e-6, atol=1e-8)
+
+    def test_add_to_empty_model(self):
+        model = GaussianProcess(2)
+        model.add(self.X, self.y)
+        full = GaussianProcess(2)
+        full.fit(self.X, self.y)
+        np.testing.assert_allclose(model.predict(self.X_test)[0],
+                                   full.predict(self.X_test)[0])
+
+    def test_mean_gradient_matches_finite_differences(self):
+        model = GaussianProcess(2)
+        model.fit(self.X, self.y)
+        model.learn(rng=np.random.RandomState(1))
+        step = 1e-6
+        fd = np.empty_like(self.X_test)
+        for j in range(2):
+            dX = np.zeros(2)
+            dX[j] = step
+            fd[:, j] = (model.predict(self.X_test + dX)[0] -
+                        model.predict(self.X_test - dX)[0]) / (2*step)
+        np.testing.assert_allclose(model.mean_gradient(self.X_test), fd,
+                                   rtol=1e-4, atol=1e-4)
+
+    def test_interpolates_observations(self):
+        model = GaussianProcess(2)
+        model.fit(self.X, self.y)
+        mean, var = model.predict(self.X)
+        np.testing.assert_allclose(mean, self.y, rtol=1e-3, atol=1e-3)
+        self.assertTrue(np.all(var < 1e-2 * np.var(self.y)))
+
+
+class TestGradientEnhancedGP(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = rng.uniform(size=(8, 2))
+        self.y = np.sin(3*self.X[:, 0]) + self.X[:, 1]**2
+        self.G = np.column_stack([3*np.cos(3*self.X[:, 0]), 2*self.X[:, 1]])
+        # Some points without a gradient, as from a warm start
+        self.G[[2, 6]] = np.nan
+        self.X_test = rng.uniform(size=(15, 2))
+
+    def test_add_matches_fit(self):
+        full = GradientEnhancedGP(2)
+        full.lengthscales = np.array([0.4, 0.5])
+        full.fit(self.X, self.y, self.G)
+        incremental = GradientEnhancedGP(2)
+        incremental.lengthscales = full.lengthscales
+        incremental.fit(self.X[:3], self.y[:3], self.G[:3])
+        incremental.add(self.X[3], self.y[3], self.G[3])
+        incremental.add(self.X[4:], self.y[4:], self.G[4:])
+        for a, b in zip(full.predict(self.X_test), incremental.predict(self.X_test)):
+            np.testing.assert_allclose(a, b, rtol=1e-6, atol=1e-8)
+
+    def test_fits_gradients(self):
+        model = GradientEnhancedGP(2)
+        model.fit(self.X, self.y, self.G)
+        known = ~np.isnan(self.G).any(axis=1)
+        np.testing.assert_allclose(model.mean_gradient(self.X[known]),
+                                   self.G[known], rtol=1e-2, atol=1e-2)
+
+    def test_mean_gradient_matches_finite_differences(self):
+        model = GradientEnhancedGP(2)
+        model.lengthscales = np.array([0.4, 0.5])
+        model.signal_var = 1.5
+        model.fit(self.X, self.y, self.G)
+        step = 1e-6
+        fd = np.empty_like(self.X_test)
+        for j in range(2):
+            dX = np.zeros(2)
+            dX[j] = step
+            fd[:, j] = (model.predict(self.X_test + dX)[0] -
+                        model.predict(self.X_test - dX)[0]) / (2*step)
+        np.testing.assert_allclose(model.mean_gradient(self.X_test), fd,
+                                   rtol=1e-4, atol=1e-4)
+
+
+if __name__ == "__main__":
+    unittest.main()
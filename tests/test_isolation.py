@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+"""Tests of failed evaluations and of evaluation in isolated processes."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import functools
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.isolation import IsolatedEvaluator
+from bayesopt_openmdao.parallel import EvaluationFailure
+
+from problems import paraboloid
+
+flaky_paraboloid = functools.partial(paraboloid, flaky=True)
+
+
+class TestIsolatedEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = IsolatedEvaluator(flaky_paraboloid, 2, timeout=0.5,
+                                           tolerate_failures=True)
+
+    def tearDown(self):
+        self.evaluator.close()
+
+    def test_failures(self):
+        points = [np.array([30.0, 0.0]), np.array([-30.0, 0.0]),
+                  np.array([0.0, 50.0]), np.array([1.0, 2.0])]
+        outcomes = self.evaluator.evaluate(points)
+        errors = [outcome.error for outcome, cost in outcomes[:3]]
+        self.assertIn("x is too large", errors[0])
+        self.assertIn("Timed out", errors[1])
+        self.assertIn("exited with code 1", errors[2])
+        (f, cons, unknowns), cost = outcomes[3]
+        self.assertEqual(f, 39.0)
+
+        # Workers were replaced and still evaluate
+        (f, cons, unknowns), cost = self.evaluator.evaluate([np.array([3.0, -4.0])])[0]
+        self.assertEqual(f, -15.0)
+
+    def test_failures_not_tolerated(self):
+        self.evaluator.tolerate_failures = False
+        self.assertRaises(RuntimeError, self.evaluator.evaluate,
+                          [np.array([30.0, 0.0])])
+
+
+class TestFailedEvaluations(unittest.TestCase):
+
+    def _run(self, **options):
+        top = flaky_paraboloid(n_iterations=6, n_init_samples=6, random_seed=0,
+                               tolerate_failures=True, **options)
+        top.driver.problem_factory = flaky_paraboloid
+        top.setup(check=False)
+        top.run()
+        return top
+
+    def test_tolerated_in_isolation(self):
+        top = self._run(evaluation_timeout=0.5)
+        history = top.driver.history
+        failed = np.isinf(history.f)
+        self.assertEqual(len(history), 12)
+        self.assertTrue(failed.any())
+        self.assertEqual(top.driver.timings.counters['failures'], failed.sum())
+        self.assertEqual(top['p.f_xy'], np.min(history.f))
+        self.assertTrue(np.isfinite(top['p.f_xy']))
+
+    def test_not_tolerated(self):
+        top = flaky_paraboloid(n_iterations=6, n_init_samples=6, random_seed=0,
+                               evaluation_timeout=0.5)
+        top.driver.problem_factory = flaky_paraboloid
+        top.setup(check=False)
+        self.assertRaises(RuntimeError, top.run)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+"""Tests of the local gradient-based polish."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from problems import paraboloid
+
+
+def _run(**options):
+    top = paraboloid(n_init_samples=4, random_seed=0, **options)
+    top.setup(check=False)
+    top.run()
+    return top
+
+
+class TestPolish(unittest.TestCase):
+
+    def test_reaches_unconstrained_minimum(self):
+        top = _run(n_iterations=4, polish='L-BFGS-B')
+        self.assertAlmostEqual(float(top['p.f_xy']), -27.0 - 1.0/3.0, places=4)
+        self.assertAlmostEqual(float(top['p.x']), 20.0/3.0, places=3)
+        self.assertAlmostEqual(float(top['p.y']), -22.0/3.0, places=3)
+        self.assertEqual(top.driver.result, float(top['p.f_xy']))
+
+    def test_respects_constraints(self):
+        top = _run(n_iterations=4, polish='SLSQP', constrained=True)
+        # Minimum of the paraboloid on x + y = -5, at x = 4.5
+        self.assertAlmostEqual(float(top['p.f_xy']), -13.25, places=4)
+        self.assertLessEqual(float(top['con.c']), -5.0 + 1e-6)
+
+    def test_evaluation_budget(self):
+        top = _run(n_iterations=4, polish='SLSQP', polish_evaluations=3)
+        self.assertLessEqual(len(top.driver.history), 8 + 3)
+        self.assertLessEqual(float(top['p.f_xy']),
+                             np.min(top.driver.history.f[:8]))
+
+    def test_runs_after_early_stop(self):
+        top = _run(n_iterations=10, polish='L-BFGS-B', max_evaluations=6)
+        self.assertEqual(top.driver.stop_reason, 'max_evaluations reached')
+        self.assertGreater(len(top.driver.history), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
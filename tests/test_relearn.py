@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+"""Tests of relearning hyperparameters in the background."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.gp import GaussianProcess
+from bayesopt_openmdao.relearn import BackgroundRelearner
+
+from problems import paraboloid
+
+
+class _Broken(GaussianProcess):
+
+    def learn(self, n_restarts=1, rng=None):
+        raise ValueError('broken')
+
+
+class TestBackgroundRelearner(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = rng.uniform(size=(15, 2))
+        self.model = GaussianProcess(2)
+        self.model.fit(self.X, np.sin(5*self.X[:, 0]) + self.X[:, 1])
+
+    def test_learns_copies(self):
+        learner = BackgroundRelearner([self.model], 3)
+        relearned, = learner.result()
+        self.assertTrue(learner.done())
+        self.assertEqual(learner.n_obs, 15)
+        self.assertIsNot(relearned, self.model)
+        np.testing.assert_array_equal(self.model.lengthscales, [0.25, 0.25])
+
+        expected = self.model.copy()
+        expected.learn(rng=np.random.RandomState(3))
+        np.testing.assert_allclose(relearned.lengthscales, expected.lengthscales)
+
+    def test_error_is_raised_on_result(self):
+        broken = _Broken(2)
+        broken.fit(self.X, self.X[:, 0])
+        learner = BackgroundRelearner([broken], 3)
+        with self.assertRaises(ValueError):
+            learner.result()
+
+
+class TestBackgroundRelearnRun(unittest.TestCase):
+
+    def test_run(self):
+        top = paraboloid(n_iterations=12, n_init_samples=4, random_seed=0,
+                         n_iter_relearn=3, background_relearn=True)
+        top.setup(check=False)
+        top.run()
+        driver = top.driver
+        self.assertEqual(len(driver.history), 16)
+        self.assertGreater(driver.timings.counters['relearns'], 1)
+        self.assertEqual(top['p.f_xy'], np.min(driver.history.f))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+"""Tests of the random-feature Gaussian process."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.gp import GaussianProcess
+from bayesopt_openmdao.rff import RandomFeatureGP
+from bayesopt_openmdao.surrogates import Surrogates
+
+
+def _model(n_features=100):
+    return RandomFeatureGP(2, n_features=n_features, rng=np.random.RandomState(1))
+
+
+class TestRandomFeatureGP(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = rng.uniform(size=(1000, 2))
+        self.y = np.sin(6*self.X[:, 0]) + self.X[:, 1]**2
+        self.X_test = np.vstack([rng.uniform(size=(20, 2)), self.X[-20:]])
+
+    def test_add_matches_fit(self):
+        # Sherman-Morrison updates from the prior precision I / noise, one
+        # observation at a time, must not drift from a direct solve
+        full = _model()
+        full.fit(self.X, self.y)
+        incremental = _model()
+        for i in range(0, len(self.y), 7):
+            incremental.add(self.X[i:i+7], self.y[i:i+7])
+        mean, var = full.predict(self.X_test)
+        mean_inc, var_inc = incremental.predict(self.X_test)
+        np.testing.assert_allclose(mean_inc, mean, rtol=1e-6, atol=1e-6)
+        np.testing.assert_allclose(var_inc, var, rtol=1e-6)
+        np.testing.assert_allclose(incremental._A_inv, incremental._A_inv.T, atol=1e-9)
+        self.assertGreater(np.linalg.eigvalsh(incremental._A_inv).min(), 0.0)
+
+    def test_set_hyperparameters_redraws_features(self):
+        model = _model(n_features=1000)
+        model.fit(self.X[:50], self.y[:50])
+        model.set_hyperparameters([0.05, 2.0], 3.0)
+        # Frequencies scale with the inverse lengthscales
+        ratio = np.std(model._omega[:, 0]) / np.std(model._omega[:, 1])
+        self.assertGreater(ratio, 20.0)
+        self.assertLess(ratio, 80.0)
+        self.assertAlmostEqual(np.sum(model._features(self.X[:1])**2) / 3.0, 1.0,
+                               delta=0.2)
+
+    def test_restore_redraws_features(self):
+        learned = _model()
+        learned.fit(self.X[:60], self.y[:60])
+        learned.learn(rng=np.random.RandomState(2))
+
+        surrogates = Surrogates(_model())
+        surrogates.restore({'lengthscales': learned.lengthscales,
+                            'signal_var': learned.signal_var})
+        surrogates.update(self.X[:60], self.y[:60], np.empty((60, 0)))
+        restored = surrogates.objective
+        scale = np.std(restored._omega, axis=0) * learned.lengthscales
+        default = np.std(_model()._omega, axis=0) * 0.25
+        np.testing.assert_allclose(scale, default, rtol=0.3)
+
+
+class TestSetHyperparameters(unittest.TestCase):
+
+    def test_exact_gp_refactorizes(self):
+        rng = np.random.RandomState(0)
+        X = rng.uniform(size=(10, 2))
+        y = X.sum(axis=1)
+        model = GaussianProcess(2)
+        model.fit(X, y)
+        model.set_hyperparameters([0.5, 0.7], 2.0)
+        fresh = GaussianProcess(2)
+        fresh.lengthscales = np.array([0.5, 0.7])
+        fresh.signal_var = 2.0
+        fresh.fit(X, y)
+        X_test = rng.uniform(size=(5, 2))
+        for a, b in zip(model.predict(X_test), fresh.predict(X_test)):
+            np.testing.assert_allclose(a, b)
+
+
+if __name__ == "__main__":
+    unittest.main()
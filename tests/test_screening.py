@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+"""Tests of screening points on the constraints before the full model."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.screening import ConstraintScreen
+
+from problems import paraboloid
+
+
+class TestConstraintScreen(unittest.TestCase):
+
+    def test_runs_only_constraint_subsystems(self):
+        top = paraboloid(constrained=True)
+        top.setup(check=False)
+        screen = ConstraintScreen(top.driver)
+        names = [sub.name for sub in screen.systems]
+        self.assertEqual(sorted(names), ['con', 'p1', 'p2'])
+        self.assertEqual(names[-1], 'con')
+
+        top['p1.x'] = 10.0
+        top['p2.y'] = 1.0
+        screen.run()
+        self.assertEqual(top['con.c'], 11.0)
+        # The paraboloid did not run
+        self.assertEqual(top['p.f_xy'], 0.0)
+
+    def test_nothing_to_skip(self):
+        top = paraboloid()
+        top.driver.add_constraint('p.f_xy', upper=0.0)
+        top.setup(check=False)
+        self.assertRaises(RuntimeError, ConstraintScreen, top.driver)
+
+
+class TestScreenedRun(unittest.TestCase):
+
+    def test_screened_points(self):
+        top = paraboloid(constrained=True, n_iterations=10, n_init_samples=5,
+                         random_seed=0, screen_constraints=True)
+        top.setup(check=False)
+        top.run()
+        history = top.driver.history
+        counters = top.driver.timings.counters
+        screened = np.isnan(history.f)
+
+        self.assertEqual(len(history), 15)
+        self.assertTrue(screened.any())
+        self.assertEqual(counters['screened_out'], screened.sum())
+        self.assertEqual(counters['evaluations'], (~screened).sum())
+        self.assertFalse(history.feasible[screened].any())
+        self.assertLessEqual(top['con.c'], -5.0)
+        self.assertEqual(top['p.f_xy'], np.min(history.f[history.feasible]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+"""Tests of the stopping criteria and run budgets."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.stopping import ConvergenceMonitor
+
+from problems import paraboloid
+
+
+def _run(**options):
+    top = paraboloid(random_seed=0, **options)
+    top.driver.problem_factory = paraboloid
+    top.setup(check=False)
+    top.run()
+    return top.driver
+
+
+class TestBudgets(unittest.TestCase):
+
+    def test_max_evaluations_with_batches(self):
+        driver = _run(n_iterations=20, n_init_samples=3, batch_size=4,
+                      max_evaluations=10)
+        self.assertEqual(len(driver.history), 10)
+        self.assertEqual(driver.stop_reason, 'max_evaluations reached')
+
+    def test_max_evaluations_asynchronous(self):
+        driver = _run(n_iterations=20, n_init_samples=3, async_evaluation=True,
+                      n_workers=3, max_evaluations=9)
+        self.assertEqual(len(driver.history), 9)
+        self.assertEqual(driver.stop_reason, 'max_evaluations reached')
+
+    def test_max_evaluations_cuts_initial_design(self):
+        driver = _run(n_iterations=5, n_init_samples=6, max_evaluations=4)
+        self.assertEqual(len(driver.history), 4)
+
+    def test_max_time(self):
+        driver = _run(n_iterations=20, n_init_samples=3, max_time=1e-6)
+        self.assertEqual(len(driver.history), 3)
+        self.assertEqual(driver.stop_reason, 'max_time reached')
+
+    def test_target_value(self):
+        driver = _run(n_iterations=20, n_init_samples=3, target_value=1e6)
+        self.assertEqual(len(driver.history), 3)
+        self.assertEqual(driver.stop_reason, 'target_value reached')
+
+    def test_full_budget_has_no_reason(self):
+        driver = _run(n_iterations=3, n_init_samples=3)
+        self.assertEqual(len(driver.history), 6)
+        self.assertIsNone(driver.stop_reason)
+
+
+class TestConvergenceMonitor(unittest.TestCase):
+
+    def test_remaining_evaluations(self):
+        self.assertIsNone(ConvergenceMonitor().remaining_evaluations())
+        monitor = ConvergenceMonitor(max_evaluations=3)
+        for f in (3.0, 2.0):
+            monitor.observe(np.zeros(1), f)
+        self.assertEqual(monitor.remaining_evaluations(), 1)
+        self.assertFalse(monitor.stopped)
+        monitor.observe(np.zeros(1), 1.0)
+        self.assertEqual(monitor.remaining_evaluations(), 0)
+        self.assertTrue(monitor.stopped)
+
+    def test_min_ei(self):
+        monitor = ConvergenceMonitor(min_ei=0.1)
+        monitor.observe_acquisition(0.5)
+        self.assertFalse(monitor.stopped)
+        monitor.observe_acquisition(0.05)
+        self.assertTrue(monitor.stopped)
+
+
+if __name__ == "__main__":
+    unittest.main()
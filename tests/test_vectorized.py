@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+"""Tests of vectorized evaluation through solve_nonlinear_batch."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+from problems import paraboloid
+
+
+def _run(**options):
+    top = paraboloid(batch=True, n_iterations=6, n_init_samples=4, random_seed=0,
+                     batch_size=3, **options)
+    top.setup(check=False)
+    top.run()
+    return top
+
+
+class TestVectorizedRun(unittest.TestCase):
+
+    def test_matches_point_by_point(self):
+        vectorized = _run(vectorize=True)
+        pointwise = _run()
+        np.testing.assert_allclose(vectorized.driver.history.X, pointwise.driver.history.X)
+        np.testing.assert_allclose(vectorized.driver.history.f, pointwise.driver.history.f)
+        self.assertEqual(vectorized['p.f_xy'], pointwise['p.f_xy'])
+        self.assertEqual(pointwise.root.p.batch_sizes, [])
+
+    def test_one_call_per_batch(self):
+        top = _run(vectorize=True)
+        self.assertEqual(top.root.p.batch_sizes, [4, 3, 3])
+        # Points of a call share its runtime
+        cost = top.driver.history.cost
+        np.testing.assert_allclose(cost[:4], cost[0])
+        np.testing.assert_allclose(cost[4:7], cost[4])
+        # The final state is that of the best point
+        self.assertEqual(top['p.f_xy'], np.min(top.driver.history.f))
+        self.assertEqual(top['p.f_xy'], (top['p.x']-3.0)**2 + top['p.x']*top['p.y'] +
+                         (top['p.y']+4.0)**2 - 3.0)
+
+    def test_needs_batch_method(self):
+        top = paraboloid(n_iterations=2, n_init_samples=2, vectorize=True)
+        top.setup(check=False)
+        with self.assertRaises(RuntimeError):
+            top.run()
+
+
+if __name__ == "__main__":
+    unittest.main()
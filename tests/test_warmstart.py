@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+"""Tests of warm starts from earlier studies."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import os
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+from openmdao.api import SqliteRecorder
+
+from bayesopt_openmdao.warmstart import load_warm_start
+
+from problems import paraboloid
+
+META = OrderedDict([('p1.x', {'adder': 0.0, 'scaler': 1.0}),
+                    ('p2.y', {'adder': 1.0, 'scaler': 2.0})])
+OBJ = OrderedDict([('p.f_xy', {'adder': 0.0, 'scaler': 1.0})])
+
+
+class TestLoadWarmStart(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_npz_filters_and_scales(self):
+        path = os.path.join(self.dir, 'earlier.npz')
+        np.savez(path, **{
+            'p1.x': [0.0, 1.0, 1.0, 9.0, 2.0],
+            'p2.y': [0.0, 1.0, 1.0, 0.0, 1.0],
+            'p.f_xy': [5.0, 4.0, 4.0, 3.0, np.nan],
+        })
+        warm = load_warm_start(path, META, OBJ, OrderedDict(),
+                               np.array([-5.0, -5.0]), np.array([5.0, 5.0]))
+        # Out of bounds, NaN and repeated rows are dropped
+        np.testing.assert_array_equal(warm.X, [[0.0, 2.0], [1.0, 4.0]])
+        np.testing.assert_array_equal(warm.f, [5.0, 4.0])
+        self.assertEqual(warm.cons.shape, (2, 0))
+
+    def test_missing_variable(self):
+        path = os.path.join(self.dir, 'earlier.npz')
+        np.savez(path, **{'p1.x': [0.0], 'p.f_xy': [1.0]})
+        warm = load_warm_start(path, META, OBJ, OrderedDict(),
+                               np.array([-5.0, -5.0]), np.array([5.0, 5.0]))
+        self.assertEqual(len(warm.f), 0)
+
+
+class TestWarmStartRun(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_from_recorder(self):
+        path = os.path.join(self.dir, 'earlier.db')
+        top = paraboloid(constrained=True, n_iterations=6, n_init_samples=4,
+                         random_seed=0)
+        top.driver.add_recorder(SqliteRecorder(path))
+        top.setup(check=False)
+        top.run()
+        top.cleanup()
+        earlier = top.driver.history
+
+        top = paraboloid(constrained=True, n_iterations=5, n_init_samples=4,
+                         random_seed=1, warm_start=path)
+        top.setup(check=False)
+        top.run()
+        history = top.driver.history
+        # The observations replace the initial design. If the best point is
+        # one of them, it is evaluated once more at the end.
+        from_earlier = float(top['p.f_xy']) not in history.f[:5]
+        self.assertEqual(len(history), 5 + from_earlier)
+        best = min(np.min(earlier.f[earlier.feasible]), np.min(history.f[history.feasible]))
+        self.assertAlmostEqual(float(top['p.f_xy']), best)
+        self.assertLessEqual(top['con.c'], -5.0)
+
+    def test_fills_initial_design(self):
+        path = os.path.join(self.dir, 'earlier.npz')
+        np.savez(path, **{'p1.x': [40.0, -40.0], 'p2.y': [40.0, 40.0],
+                          'p.f_xy': [4902.0, 2182.0]})
+        top = paraboloid(n_iterations=3, n_init_samples=5, random_seed=0,
+                         warm_start=path)
+        top.setup(check=False)
+        top.run()
+        # Three initial samples complete the design
+        self.assertEqual(len(top.driver.history), 3 + 3)
+        self.assertLess(top['p.f_xy'], 2182.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+"""Tests of evaluation through a work queue in a shared directory."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from bayesopt_openmdao.work_queue import FileQueueEvaluator, run_worker, \
+     CLAIMED, RESULTS, TASKS
+
+from problems import paraboloid
+
+
+def _f(x):
+    return (x[0]-3.0)**2 + x[0]*x[1] + (x[1]+4.0)**2 - 3.0
+
+
+class TestWorkQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.workers = []
+
+    def tearDown(self):
+        for worker in self.workers:
+            worker.join()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _start_worker(self, max_idle=0.5):
+        worker = threading.Thread(target=run_worker, args=(self.dir, paraboloid),
+                                  kwargs={'heartbeat_interval': 0.1,
+                                          'poll_interval': 0.01,
+                                          'max_idle': max_idle})
+        worker.start()
+        self.workers.append(worker)
+
+    def _files(self, sub):
+        return os.listdir(os.path.join(self.dir, sub))
+
+    def test_evaluate(self):
+        evaluator = FileQueueEvaluator(self.dir)
+        self._start_worker()
+        points = [np.array([1.0, 2.0]), np.array([3.0, -4.0])]
+        outcomes = evaluator.evaluate(points)
+        evaluator.close()
+        for x, ((f, cons, unknowns), cost) in zip(points, outcomes):
+            self.assertEqual(f, _f(x))
+            self.assertEqual(list(cons), [])
+            self.assertGreaterEqual(cost, 0.0)
+        for sub in (TASKS, CLAIMED, RESULTS):
+            self.assertEqual(self._files(sub), [])
+
+    def test_results_are_not_pickled(self):
+        evaluator = FileQueueEvaluator(self.dir)
+        evaluator.submit(np.array([1.0, 2.0]))
+        self._start_worker()
+        while not self._files(RESULTS):
+            time.sleep(0.01)
+        name = self._files(RESULTS)[0]
+        self.assertTrue(name.endswith('.npz'))
+        with np.load(os.path.join(self.dir, RESULTS, name), allow_pickle=False) as npz:
+            self.assertEqual(float(npz['f']), _f([1.0, 2.0]))
+        evaluator.close()
+
+    def test_close_removes_run_files(self):
+        evaluator = FileQueueEvaluator(self.dir)
+        other = FileQueueEvaluator(self.dir)
+        for x in ([1.0, 2.0], [3.0, 4.0]):
+            evaluator.submit(np.array(x))
+        other.submit(np.array([0.0, 0.0]))
+        # A point claimed by a worker that has not finished it, and the
+        # result of one that did after the driver stopped waiting
+        tasks = sorted(name for name in self._files(TASKS)
+                       if name.startswith(evaluator._run_id))
+        os.rename(os.path.join(self.dir, TASKS, tasks[0]),
+                  os.path.join(self.dir, CLAIMED, tasks[0] + '.host-1-abc'))
+        open(os.path.join(self.dir, RESULTS, tasks[1][:-4] + '.npz'), 'w').close()
+
+        evaluator.close()
+        for sub in (TASKS, CLAIMED, RESULTS):
+            self.assertFalse([name for name in self._files(sub)
+                              if name.startswith(evaluator._run_id)])
+        # The other run's point is left alone
+        self.assertEqual(len(self._files(TASKS)), 1)
+        other.close()
+
+    def test_driver_run(self):
+        top = paraboloid(n_iterations=4, n_init_samples=3, random_seed=0,
+                         work_queue=self.dir)
+        self._start_worker(max_idle=1.0)
+        top.setup(check=False)
+        top.run()
+        history = top.driver.history
+        self.assertEqual(len(history), 7)
+        np.testing.assert_allclose(history.f, [_f(x) for x in history.X])
+        for sub in (TASKS, CLAIMED, RESULTS):
+            self.assertEqual(self._files(sub), [])
+
+
+if __name__ == "__main__":
+    unittest.main()